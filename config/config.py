@@ -6,6 +6,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+# Local cache shared by all test runs (driver index, snapshot metadata, ...)
+CACHE_DIR = os.getenv(
+    "WAP_TESTING_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "opennet-wap-testing")
+)
+
+
 @dataclass
 class BrowserConfig:
     """Browser configuration for mobile testing."""
@@ -14,12 +21,38 @@ class BrowserConfig:
     platform: str = "iOS"  # iOS or Android
     headless: bool = False
     window_size: tuple = (375, 812)  # iPhone 14 Pro dimensions
-    implicit_wait: int = 10
+    implicit_wait: int = 0  # Non-zero costs two extra commands per explicit wait
     page_load_timeout: int = 30
     script_timeout: int = 30
     use_real_device: bool = False  # Use real emulator/simulator instead of browser emulation
     automation_name: str = "XCUITest"  # XCUITest for iOS, UiAutomator2 for Android
     appium_server_url: str = "http://localhost:4723"  # Appium server URL
+    connection_pool_size: int = 4  # Keep-alive connections per driver (per worker)
+    connection_connect_timeout: float = 10  # Seconds to open a command connection
+    connection_read_timeout: float = 120  # Seconds to wait for a command response
+    compress_transport: bool = False  # Request gzip-compressed command responses
+    driver_pool: bool = False  # Reuse warm drivers between tests
+    driver_pool_size: int = 1  # Idle drivers kept warm per worker
+    driver_max_uses: int = 20  # Evict a pooled driver after this many tests
+    driver_prefetch: int = 0  # Sessions built ahead in the background (0 disables prefetching)
+    emulator_snapshot: Optional[str] = "chrome_ready"  # Quickboot snapshot name, None for cold boot
+    emulator_reset: str = "session"  # session (new session per test) or snapshot (restore per test)
+    appium_ports: Optional[dict] = None  # Worker-unique systemPort, chromedriverPort, mjpegServerPort, wdaLocalPort
+    emulator_console_port: Optional[int] = None  # Preferred console port, serial emulator-<port>
+    network_profile: Optional[str] = None  # NETWORK_PROFILES name, overrides the device preset's profile
+    lean_mode: bool = False  # Block third-party/heavy requests in Chrome emulation
+    lean_block: tuple = ("ads", "analytics", "media")  # LEAN_BLOCKLISTS categories blocked in lean mode
+    lean_extra_patterns: tuple = ()  # Additional URL patterns blocked in lean mode
+    replay_mode: Optional[str] = None  # "record" or "replay" traffic through the local replay proxy
+    replay_archive: str = "recordings/default"  # Replay archive directory
+    replay_latency_ms: int = 0  # Delay added to each replayed response
+    replay_bandwidth_kbps: Optional[int] = None  # Throughput cap for replayed responses
+    replay_ignored_params: tuple = ("_", "t", "nonce")  # Query parameters ignored when matching requests
+    user_data_dir: Optional[str] = None  # Explicit Chrome profile directory
+    warm_profile: bool = False  # Start Chrome sessions from a copy of a warm profile template
+    warm_profile_url: Optional[str] = None  # Landing page visited while warming the template
+    warm_profile_max_mb: int = 200  # Size limit of the template (and Chrome's disk cache)
+    warm_profile_max_age_hours: float = 24  # Templates older than this are rebuilt
 
 
 @dataclass
@@ -28,42 +61,100 @@ class TestConfig:
     base_url: str = os.getenv("BASE_URL", "https://m.twitch.tv/")
     screenshot_on_failure: bool = True
     screenshot_dir: str = "reports/screenshots"
+    artifact_dir: str = "reports/artifacts"  # Failure bundles (screenshot, source, URL, logs, UI dump)
+    artifact_budget: float = 10  # Seconds allowed for collecting failure artifacts
     video_recording: bool = False
     max_retries: int = 3
     retry_delay: int = 2
 
 
+# Core Web Vitals budgets (ms, CLS unitless), Google's "good" thresholds
+DEFAULT_PERFORMANCE_BUDGET = {
+    "lcp": 2500,
+    "fcp": 1800,
+    "cls": 0.1,
+    "inp": 200,
+    "total_blocking_time": 200,
+}
+
+
+# Network/CPU throttling profiles applied through CDP (Chrome only)
+NETWORK_PROFILES = {
+    "slow3g": {"latency_ms": 400, "download_kbps": 400, "upload_kbps": 400, "cpu_slowdown": 4},
+    "fast3g": {"latency_ms": 150, "download_kbps": 1600, "upload_kbps": 750, "cpu_slowdown": 4},
+    "4g": {"latency_ms": 60, "download_kbps": 9000, "upload_kbps": 1500, "cpu_slowdown": 2},
+    "flaky": {"latency_ms": 300, "download_kbps": 1000, "upload_kbps": 500, "packet_loss": 5,
+              "cpu_slowdown": 4},
+    "offline": {"offline": True},
+}
+
+
+# Lean mode blocklists (Network.setBlockedURLs patterns, '*' wildcards).
+# typical_kb estimates the transfer avoided per blocked request for reporting.
+# "media" also requires a user gesture for autoplay, "images" also disables images.
+LEAN_BLOCKLISTS = {
+    "ads": {
+        "patterns": ["*doubleclick.net*", "*googlesyndication.com*", "*amazon-adsystem.com*",
+                     "*adservice.google.*", "*imasdk.googleapis.com*"],
+        "typical_kb": 30,
+    },
+    "analytics": {
+        "patterns": ["*google-analytics.com*", "*googletagmanager.com*", "*scorecardresearch.com*",
+                     "*spade.twitch.tv*", "*countess.twitch.tv*", "*sentry.io*"],
+        "typical_kb": 5,
+    },
+    "media": {
+        "patterns": ["*.ttvnw.net/*", "*.m3u8*", "*.mp4*", "*.webm*"],
+        "typical_kb": 500,
+    },
+    "images": {
+        "patterns": ["*static-cdn.jtvnw.net/*-thumbnail-*", "*static-cdn.jtvnw.net/previews-ttv/*"],
+        "typical_kb": 40,
+    },
+}
+
+
 # Device presets for common mobile devices
 DEVICE_PRESETS = {
     "iPhone 14 Pro": {
         "platform": "iOS",
         "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
         "viewport": {"width": 390, "height": 844},
-        "pixel_ratio": 3
+        "pixel_ratio": 3,
+        "performance_budget": DEFAULT_PERFORMANCE_BUDGET,
+        "network_profile": "4g"
     },
     "iPhone SE": {
         "platform": "iOS",
         "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
         "viewport": {"width": 375, "height": 667},
-        "pixel_ratio": 2
+        "pixel_ratio": 2,
+        "performance_budget": {**DEFAULT_PERFORMANCE_BUDGET, "lcp": 3000, "fcp": 2200, "inp": 300, "total_blocking_time": 400},
+        "network_profile": "fast3g"
     },
     "iPad Pro": {
         "platform": "iOS",
         "user_agent": "Mozilla/5.0 (iPad; CPU OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
         "viewport": {"width": 1024, "height": 1366},
-        "pixel_ratio": 2
+        "pixel_ratio": 2,
+        "performance_budget": DEFAULT_PERFORMANCE_BUDGET,
+        "network_profile": "4g"
     },
     "Samsung Galaxy S21": {
         "platform": "Android",
         "user_agent": "Mozilla/5.0 (Linux; Android 11; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.120 Mobile Safari/537.36",
         "viewport": {"width": 360, "height": 800},
-        "pixel_ratio": 3
+        "pixel_ratio": 3,
+        "performance_budget": {**DEFAULT_PERFORMANCE_BUDGET, "total_blocking_time": 300},
+        "network_profile": "4g"
     },
     "Pixel 6": {
         "platform": "Android",
         "user_agent": "Mozilla/5.0 (Linux; Android 12; Pixel 6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.45 Mobile Safari/537.36",
         "viewport": {"width": 412, "height": 915},
-        "pixel_ratio": 2.625
+        "pixel_ratio": 2.625,
+        "performance_budget": {**DEFAULT_PERFORMANCE_BUDGET, "total_blocking_time": 300},
+        "network_profile": "4g"
     },
 }
 
@@ -0,0 +1,322 @@
+"""
+Warm Chrome profile templates.
+A user-data-dir is warmed once (landing page visited, HTTP cache and service
+workers populated) and kept in the local cache; every Chrome session then
+starts from its own copy of it. Copies use copy-on-write reflinks where the
+filesystem supports them (btrfs, XFS, APFS) and fall back to a plain copy.
+Hardlinks are not used: Chrome rewrites its SQLite/LevelDB files in place,
+which would modify the shared template.
+"""
+from typing import Callable, List, Optional
+import atexit
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import weakref
+
+from config.config import CACHE_DIR, BrowserConfig
+from drivers.chromedriver_resolver import detect_chrome_major_version
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "template.json"
+
+# Per-process state that must not be copied into sessions
+EXCLUDED = {
+    "SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile",
+    "Crash Reports", "BrowserMetrics", "GrShaderCache", "GraphiteDawnCache", "ShaderCache",
+}
+
+# Win32 constants used to check for running processes
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_ACCESS_DENIED = 5
+STILL_ACTIVE = 259
+
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of the regular files below path."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _prune(path: str) -> None:
+    for root, dirs, files in os.walk(path):
+        for name in [d for d in dirs if d in EXCLUDED]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            dirs.remove(name)
+        for name in files:
+            if name in EXCLUDED:
+                try:
+                    os.remove(os.path.join(root, name))
+                except OSError:
+                    pass
+
+
+def copy_tree(source: str, destination: str) -> str:
+    """
+    Copy a directory, cloning file extents where the filesystem allows.
+
+    Returns:
+        Copy method used: "reflink" (every file cloned copy-on-write) or "copy"
+    """
+    if sys.platform.startswith("linux"):
+        # Not --reflink=auto: it silently copies in full where cloning is unsupported
+        command = ["cp", "-a", "--reflink=always", source, destination]
+    elif sys.platform == "darwin":
+        command = ["cp", "-cR", source, destination]
+    else:
+        command = None
+    if command:
+        try:
+            subprocess.run(command, capture_output=True, check=True, timeout=120)
+            return "reflink"
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Cloning {source} not supported, copying instead: {e}")
+            shutil.rmtree(destination, ignore_errors=True)
+    shutil.copytree(source, destination, symlinks=True)
+    return "copy"
+
+
+def _pid_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        return _windows_pid_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _windows_pid_alive(pid: int) -> bool:
+    # os.kill(pid, 0) would send CTRL_C_EVENT on Windows
+    import ctypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return True
+        return code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class ChromeProfileManager:
+    """Builds warm profile templates and hands out per-session copies."""
+
+    def __init__(self, root: Optional[str] = None, max_size_mb: int = 200, max_age_hours: float = 24,
+                 retry_after_minutes: float = 30):
+        """
+        Initialize manager.
+
+        Args:
+            root: Directory holding templates and session copies
+            max_size_mb: Templates larger than this are discarded (sessions then start cold)
+            max_age_hours: Templates older than this are rebuilt
+            retry_after_minutes: A failed or oversized build is not retried for this long
+        """
+        self.root = root or os.path.join(CACHE_DIR, "chrome-profiles")
+        self.clones_dir = os.path.join(self.root, "clones")
+        self.max_size_mb = max_size_mb
+        self.max_age_hours = max_age_hours
+        self.retry_after_minutes = retry_after_minutes
+        self._clones: List[str] = []
+        self._owners: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def template_path(self, config: BrowserConfig, url: str) -> str:
+        """Template directory for a device preset, landing URL and Chrome version."""
+        key = json.dumps([config.device_name, url, detect_chrome_major_version()])
+        return os.path.join(self.root, "template-" + hashlib.sha1(key.encode()).hexdigest()[:12])
+
+    def _is_fresh(self, path: str) -> bool:
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return time.time() - meta.get("created", 0) < self.max_age_hours * 3600
+
+    def _recently_failed(self, path: str) -> bool:
+        try:
+            age = time.time() - os.path.getmtime(path + ".failed")
+        except OSError:
+            return False
+        return age < self.retry_after_minutes * 60
+
+    def _build_failed(self, path: str, building: str) -> None:
+        """Discard a build and leave a marker so no worker retries it for a while."""
+        shutil.rmtree(building, ignore_errors=True)
+        with open(path + ".failed", "w") as f:
+            f.write(str(time.time()))
+
+    def ensure_template(self, config: BrowserConfig, url: str,
+                        warm: Callable[[str], None]) -> Optional[str]:
+        """
+        Return the warm template, building it first if missing or expired.
+
+        Only one process builds a template; other xdist workers wait for it.
+        After a failed or oversized build every worker starts cold until
+        retry_after_minutes have passed.
+
+        Args:
+            config: Browser configuration the template is built for
+            url: Landing page visited while warming
+            warm: Callable running Chrome on the given user-data-dir
+
+        Returns:
+            Template directory, or None if it could not be built within the size limit
+        """
+        path = self.template_path(config, url)
+        if self._is_fresh(path):
+            return path
+        if self._recently_failed(path):
+            return None
+        with file_lock(path + ".lock"):
+            if self._is_fresh(path):
+                return path
+            if self._recently_failed(path):
+                return None
+            building = f"{path}.building-{os.getpid()}"
+            shutil.rmtree(building, ignore_errors=True)
+            started = time.monotonic()
+            try:
+                warm(building)
+            except Exception as e:
+                logger.warning(f"Could not warm a Chrome profile for {url}: {e}")
+                self._build_failed(path, building)
+                return None
+            _prune(building)
+            size = directory_size(building)
+            if size > self.max_size_mb * 1048576:
+                logger.warning(
+                    f"Warm profile is {size / 1048576:.0f} MB (limit {self.max_size_mb} MB), not using it"
+                )
+                self._build_failed(path, building)
+                return None
+            with open(os.path.join(building, META_FILE), "w") as f:
+                json.dump({"url": url, "device": config.device_name, "created": time.time(), "size": size}, f)
+            # Copies hold a shared lock on it, so none is reading the old template here
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(building, path)
+            if os.path.exists(path + ".failed"):
+                os.remove(path + ".failed")
+            logger.info(
+                f"Warm Chrome profile built in {time.monotonic() - started:.1f}s "
+                f"({size / 1048576:.1f} MB): {path}"
+            )
+        return path
+
+    def clone(self, template: str) -> str:
+        """
+        Copy a template for one Chrome session.
+
+        The copy is taken under a shared lock on the template: copies run
+        concurrently, while a rebuild (exclusive lock) waits for them and
+        cannot delete files while they are being copied.
+
+        Returns:
+            Path of the session's user-data-dir
+        """
+        worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+        destination = os.path.join(self.clones_dir, f"{worker}-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(self.clones_dir, exist_ok=True)
+        started = time.monotonic()
+        with file_lock(template + ".lock", shared=True):
+            method = copy_tree(template, destination)
+        logger.debug(f"Profile copy ({method}) in {(time.monotonic() - started) * 1000:.0f}ms: {destination}")
+        with self._lock:
+            self._clones.append(destination)
+        return destination
+
+    def attach(self, driver, path: str) -> None:
+        """Release the copy at path when driver is released."""
+        with self._lock:
+            self._owners[driver] = path
+
+    def release_for(self, driver) -> None:
+        """Delete the copy used by driver, if any."""
+        with self._lock:
+            path = self._owners.pop(driver, None)
+        if path:
+            self.release(path)
+
+    def release(self, path: str) -> None:
+        """Delete a session copy."""
+        with self._lock:
+            if path in self._clones:
+                self._clones.remove(path)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def release_all(self) -> None:
+        """Delete every copy handed out by this process."""
+        with self._lock:
+            clones, self._clones = self._clones, []
+        for path in clones:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def sweep(self) -> int:
+        """
+        Delete copies left behind by processes that no longer run.
+
+        Returns:
+            Number of copies deleted
+        """
+        removed = 0
+        try:
+            names = os.listdir(self.clones_dir)
+        except OSError:
+            return 0
+        for name in names:
+            try:
+                pid = int(name.rsplit("-", 2)[1])
+            except (IndexError, ValueError):
+                continue
+            if not _pid_alive(pid):
+                shutil.rmtree(os.path.join(self.clones_dir, name), ignore_errors=True)
+                removed += 1
+        if removed:
+            logger.info(f"Removed {removed} stale Chrome profile copies")
+        return removed
+
+
+_manager: Optional[ChromeProfileManager] = None
+_manager_lock = threading.Lock()
+
+
+def profile_manager(config: BrowserConfig) -> ChromeProfileManager:
+    """Process-wide profile manager; stale copies are swept on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ChromeProfileManager(
+                max_size_mb=config.warm_profile_max_mb, max_age_hours=config.warm_profile_max_age_hours
+            )
+            _manager.sweep()
+            atexit.register(_manager.release_all)
+        return _manager
+
+
+def release_profile(driver) -> None:
+    """Delete the profile copy of a quit driver (no-op without warm profiles)."""
+    if _manager is not None:
+        _manager.release_for(driver)
@@ -0,0 +1,205 @@
+"""
+Offline, cached chromedriver resolution.
+Maps the local Chrome major version to a chromedriver binary through an
+on-disk index shared by all xdist workers, so driver creation only touches
+the network the first time a Chrome version is seen.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+from config.config import CACHE_DIR as DEFAULT_CACHE_DIR
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("CHROMEDRIVER_CACHE_DIR", DEFAULT_CACHE_DIR)
+INDEX_FILE = "chromedriver_index.json"
+
+CHROME_BINARIES = {
+    "darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "linux": [
+        "google-chrome",
+        "google-chrome-stable",
+        "chromium",
+        "chromium-browser",
+    ],
+    "win32": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    ],
+}
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+(?:\.\d+)?")
+
+
+def _run_version(binary: str) -> Optional[str]:
+    """Return the version reported by `binary --version`, if any."""
+    try:
+        result = subprocess.run(
+            [binary, "--version"], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = VERSION_PATTERN.search(result.stdout)
+    return match.group(0) if match else None
+
+
+def _major(version: Optional[str]) -> Optional[str]:
+    return version.split(".")[0] if version else None
+
+
+@lru_cache(maxsize=None)
+def detect_chrome_major_version() -> Optional[str]:
+    """
+    Detect the major version of the locally installed Chrome (once per process).
+
+    Returns:
+        Major version string (e.g. "120") or None if Chrome was not found
+    """
+    binary = os.getenv("CHROME_BINARY")
+    platform = "linux" if sys.platform.startswith("linux") else sys.platform
+    candidates = [binary] if binary else CHROME_BINARIES.get(platform, [])
+
+    for candidate in candidates:
+        version = _run_version(candidate)
+        if version:
+            logger.info(f"Detected Chrome {version} ({candidate})")
+            return _major(version)
+
+    logger.warning("Could not detect local Chrome version")
+    return None
+
+
+class ChromeDriverResolver:
+    """Resolves chromedriver paths through a lock-protected on-disk index."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, offline: Optional[bool] = None):
+        """
+        Initialize resolver.
+
+        Args:
+            cache_dir: Directory holding the index and its lock file
+            offline: Never download drivers (default: CHROMEDRIVER_OFFLINE env var)
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.lock_path = self.index_path + ".lock"
+        if offline is None:
+            offline = os.getenv("CHROMEDRIVER_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+
+    def resolve(self) -> str:
+        """
+        Resolve the chromedriver path for the local Chrome.
+
+        Resolution order: CHROMEDRIVER_PATH env var, the on-disk index,
+        local binaries with a matching version, then a one-time download.
+
+        Returns:
+            Path to a chromedriver executable
+
+        Raises:
+            FileNotFoundError: If no driver is available and downloading is disabled
+        """
+        override = os.getenv("CHROMEDRIVER_PATH")
+        if override:
+            return override
+
+        major = detect_chrome_major_version()
+        if major:
+            cached = self._lookup(major)
+            if cached:
+                return cached
+
+        # Only one worker resolves a missing entry, the others reuse its result
+        with file_lock(self.lock_path):
+            index = self._read_index()
+            if major and self._usable(index.get(major)):
+                return index[major]
+
+            path = self._find_local(major) or self._download(major)
+            if major:
+                index[major] = path
+                self._write_index(index)
+                logger.info(f"Cached chromedriver for Chrome {major}: {path}")
+            return path
+
+    def _lookup(self, major: str) -> Optional[str]:
+        with file_lock(self.lock_path):
+            path = self._read_index().get(major)
+        return path if self._usable(path) else None
+
+    def _read_index(self) -> Dict[str, str]:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: Dict[str, str]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _usable(path: Optional[str]) -> bool:
+        return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+    @staticmethod
+    def _local_candidates() -> List[str]:
+        name = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+        candidates = []
+        on_path = shutil.which(name)
+        if on_path:
+            candidates.append(on_path)
+        # Drivers previously downloaded by webdriver-manager
+        wdm_root = os.getenv("WDM_LOCAL_PATH", os.path.join(os.path.expanduser("~"), ".wdm"))
+        candidates.extend(
+            sorted(glob.glob(os.path.join(wdm_root, "drivers", "chromedriver", "**", name),
+                             recursive=True), reverse=True)
+        )
+        return candidates
+
+    def _find_local(self, major: Optional[str]) -> Optional[str]:
+        if not major:
+            return None
+        for candidate in self._local_candidates():
+            if self._usable(candidate) and _major(_run_version(candidate)) == major:
+                logger.info(f"Found local chromedriver for Chrome {major}: {candidate}")
+                return candidate
+        return None
+
+    def _download(self, major: Optional[str]) -> str:
+        if self.offline:
+            raise FileNotFoundError(
+                f"No cached chromedriver for Chrome {major or 'unknown'} and downloads are disabled. "
+                f"Set CHROMEDRIVER_PATH or run once online to populate {self.index_path}"
+            )
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        logger.info(f"Downloading chromedriver for Chrome {major or 'unknown'}")
+        return ChromeDriverManager().install()
+
+
+@lru_cache(maxsize=None)
+def resolve_chromedriver() -> str:
+    """
+    Resolve the chromedriver path once per process.
+
+    Returns:
+        Path to a chromedriver executable
+    """
+    return ChromeDriverResolver().resolve()
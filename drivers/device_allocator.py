@@ -0,0 +1,141 @@
+"""
+Device allocator for parallel xdist workers.
+Gives each worker its own device (held through a file lock for the worker's
+lifetime) plus worker-unique Appium ports and emulator console port, so
+workers do not fight over one emulator.
+"""
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import logging
+import os
+import re
+import time
+
+from config.config import CACHE_DIR
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Base ports; each worker adds its index
+SYSTEM_PORT_BASE = 8200  # UiAutomator2 server (Appium recommends 8200-8299)
+CHROMEDRIVER_PORT_BASE = 9515
+MJPEG_SERVER_PORT_BASE = 7810
+WDA_LOCAL_PORT_BASE = 8100  # WebDriverAgent (iOS)
+CONSOLE_PORT_BASE = 5554  # Android emulator console, serial emulator-<port>
+
+
+def worker_index(worker_id: Optional[str] = None) -> int:
+    """
+    Numeric index of the current xdist worker.
+
+    Args:
+        worker_id: xdist worker id such as "gw3" (default: PYTEST_XDIST_WORKER)
+
+    Returns:
+        Worker index, 0 when not running under xdist
+    """
+    worker_id = worker_id or os.getenv("PYTEST_XDIST_WORKER", "master")
+    match = re.search(r"(\d+)$", worker_id)
+    return int(match.group(1)) if match else 0
+
+
+@dataclass
+class DeviceAllocation:
+    """Device and ports reserved for one worker."""
+    device_name: str
+    worker_index: int
+    exclusive: bool
+    ports: Dict[str, int] = field(default_factory=dict)
+    console_port: Optional[int] = None
+
+    @property
+    def serial(self) -> Optional[str]:
+        """Preferred adb serial for an emulator started by this worker."""
+        return f"emulator-{self.console_port}" if self.console_port else None
+
+
+class DeviceAllocator:
+    """Allocates devices to xdist workers through per-device file locks."""
+
+    def __init__(self, devices: Sequence[str], lock_dir: Optional[str] = None):
+        """
+        Initialize allocator.
+
+        Args:
+            devices: Device names (keys of REAL_DEVICE_CONFIGS) available to the run
+            lock_dir: Directory holding the per-device lock files
+        """
+        if not devices:
+            raise ValueError("DeviceAllocator needs at least one device")
+        self.devices: List[str] = list(devices)
+        self.lock_dir = lock_dir or os.path.join(CACHE_DIR, "device_locks")
+        self._locks = ExitStack()
+        self.allocation: Optional[DeviceAllocation] = None
+
+    def allocate(self, worker_id: Optional[str] = None, timeout: float = 0) -> DeviceAllocation:
+        """
+        Reserve a device for the current worker.
+
+        Devices are tried starting at the worker's index so workers spread
+        across the list. If every device stays locked for `timeout` seconds
+        the worker shares a device, still with its own ports.
+
+        Args:
+            worker_id: xdist worker id (default: PYTEST_XDIST_WORKER)
+            timeout: Seconds to wait for a free device before sharing
+
+        Returns:
+            DeviceAllocation for the worker
+        """
+        index = worker_index(worker_id)
+        count = len(self.devices)
+        order = [self.devices[(index + offset) % count] for offset in range(count)]
+        deadline = time.monotonic() + timeout
+
+        while True:
+            for device_name in order:
+                lock_path = os.path.join(self.lock_dir, self._lock_name(device_name))
+                acquired = self._locks.enter_context(file_lock(lock_path, blocking=False))
+                if acquired:
+                    return self._build(device_name, index, exclusive=True)
+                # Release the failed attempt's file descriptor right away
+                self._locks.close()
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.5)
+
+        device_name = order[0]
+        logger.warning(
+            f"No free device for worker {index}, sharing {device_name} with another worker"
+        )
+        return self._build(device_name, index, exclusive=False)
+
+    def release(self) -> None:
+        """Release the device lock held by this worker."""
+        self._locks.close()
+        self.allocation = None
+
+    def _build(self, device_name: str, index: int, exclusive: bool) -> DeviceAllocation:
+        allocation = DeviceAllocation(
+            device_name=device_name,
+            worker_index=index,
+            exclusive=exclusive,
+            ports={
+                "systemPort": SYSTEM_PORT_BASE + index,
+                "chromedriverPort": CHROMEDRIVER_PORT_BASE + index,
+                "mjpegServerPort": MJPEG_SERVER_PORT_BASE + index,
+                "wdaLocalPort": WDA_LOCAL_PORT_BASE + index,
+            },
+            console_port=CONSOLE_PORT_BASE + 2 * self.devices.index(device_name),
+        )
+        logger.info(
+            f"Worker {index} allocated {device_name} "
+            f"({'exclusive' if exclusive else 'shared'}, ports {allocation.ports})"
+        )
+        self.allocation = allocation
+        return allocation
+
+    @staticmethod
+    def _lock_name(device_name: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", device_name) + ".lock"
@@ -1,25 +1,40 @@
 """
 Driver factory for creating mobile web drivers.
 Supports both browser emulation and real device/emulator testing.
+
+Backend modules (Selenium browsers, Appium, webdriver-manager) are imported
+inside the create_* methods, so a worker only loads the backend that
+create_driver selects.
 """
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.safari.service import Service as SafariService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.safari.options import Options as SafariOptions
-from webdriver_manager.chrome import ChromeDriverManager
-from appium import webdriver as appium_webdriver
-from appium.options.ios import XCUITestOptions
-from appium.options.android import UiAutomator2Options
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
+import dataclasses
 import logging
 import subprocess
 import time
 
 from config.config import BrowserConfig, DEVICE_PRESETS, REAL_DEVICE_CONFIGS
+from drivers.chrome_profile import profile_manager, release_profile
+from drivers.chromedriver_resolver import resolve_chromedriver
+from drivers.emulator_boot import EmulatorBootManager
+from drivers.emulator_snapshots import SnapshotManager
+from drivers.implicit_wait import ImplicitWaitManager
+from drivers.lean_mode import blocked_patterns, enable_request_blocking, lean_arguments, lean_prefs
+from drivers.replay_proxy import ANDROID_HOST_ALIAS, proxy_arguments, replay_proxy
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from appium import webdriver as appium_webdriver
 
 logger = logging.getLogger(__name__)
 
+# Resolves once the page's service worker is active (or after arguments[0] ms)
+SERVICE_WORKER_READY_SCRIPT = """
+var done = arguments[arguments.length - 1];
+if (!navigator.serviceWorker) { done(false); return; }
+var timer = setTimeout(function () { done(false); }, arguments[0]);
+navigator.serviceWorker.ready.then(function () { clearTimeout(timer); done(true); });
+"""
+
 
 class DriverFactory:
     """Factory class for creating WebDriver instances configured for mobile testing."""
@@ -64,58 +79,36 @@ class DriverFactory:
             raise
     
     @staticmethod
-    def start_android_emulator(avd_name: str) -> None:
+    def start_android_emulator(avd_name: str, timeout: int = 180,
+                               snapshot: Optional[str] = None,
+                               port: Optional[int] = None) -> str:
         """
-        Start an Android emulator.
+        Start an Android emulator (or reuse it if already running).
         
         Args:
             avd_name: Name of the AVD to start
+            timeout: Maximum seconds to wait for the boot to complete
+            snapshot: Quickboot snapshot to warm-boot from (created on first
+                cold boot). None forces a cold boot.
+            port: Preferred console port if the emulator has to be started
+            
+        Returns:
+            adb serial of the emulator (e.g. "emulator-5554")
         """
         try:
-            # Check if emulator is already running
-            result = subprocess.run(
-                ["adb", "devices"], capture_output=True, text=True
-            )
-            
-            if avd_name not in result.stdout:
-                logger.info(f"Starting Android emulator: {avd_name}")
-                
-                # Use full path to emulator
-                import os
-                emulator_path = os.path.expanduser("~/Library/Android/sdk/emulator/emulator")
-                
-                # Start emulator in background
-                subprocess.Popen(
-                    [emulator_path, "-avd", avd_name, "-no-snapshot-load"],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
+            if snapshot:
+                result = SnapshotManager(snapshot_name=snapshot).boot(
+                    avd_name, timeout=timeout, port=port
                 )
-                
-                # Wait for emulator to be ready
-                logger.info("Waiting for emulator to boot...")
-                max_wait = 120  # 2 minutes
-                start_time = time.time()
-                
-                while time.time() - start_time < max_wait:
-                    result = subprocess.run(
-                        ["adb", "shell", "getprop", "sys.boot_completed"],
-                        capture_output=True, text=True
-                    )
-                    if "1" in result.stdout:
-                        logger.info(f"Android emulator ready: {avd_name}")
-                        time.sleep(5)  # Additional wait for stability
-                        return
-                    time.sleep(5)
-                
-                raise TimeoutError(f"Emulator {avd_name} failed to start within {max_wait} seconds")
             else:
-                logger.info(f"Android emulator already running: {avd_name}")
+                result = EmulatorBootManager().boot(avd_name, timeout=timeout, port=port)
+            return result.serial
         except Exception as e:
             logger.error(f"Failed to start Android emulator: {e}")
             raise
     
     @staticmethod
-    def create_appium_ios_driver(config: BrowserConfig) -> appium_webdriver.Remote:
+    def create_appium_ios_driver(config: BrowserConfig) -> "appium_webdriver.Remote":
         """
         Create Appium driver for iOS simulator.
         
@@ -125,6 +118,10 @@ class DriverFactory:
         Returns:
             Appium WebDriver instance for iOS
         """
+        from appium import webdriver as appium_webdriver
+        from appium.options.ios import XCUITestOptions
+        from drivers.remote_connection import tune_connection
+        
         device_config = REAL_DEVICE_CONFIGS.get(config.device_name)
         
         if not device_config:
@@ -150,20 +147,29 @@ class DriverFactory:
         options.set_capability("newCommandTimeout", 300)
         options.set_capability("connectHardwareKeyboard", True)
         
+        # Worker-unique ports so parallel sessions do not collide
+        ports = config.appium_ports or {}
+        for capability in ("wdaLocalPort", "mjpegServerPort"):
+            if capability in ports:
+                options.set_capability(capability, ports[capability])
+        
         logger.info(f"Creating Appium iOS driver for {config.device_name}")
         driver = appium_webdriver.Remote(
             config.appium_server_url,
             options=options
         )
         
+        # Persistent keep-alive connection pool for commands
+        tune_connection(driver, config)
+        
         # Set timeouts
-        driver.implicitly_wait(config.implicit_wait)
+        ImplicitWaitManager.for_new_session(driver, config.implicit_wait)
         
         logger.info(f"Appium iOS driver created for {config.device_name}")
         return driver
     
     @staticmethod
-    def create_appium_android_driver(config: BrowserConfig) -> appium_webdriver.Remote:
+    def create_appium_android_driver(config: BrowserConfig) -> "appium_webdriver.Remote":
         """
         Create Appium driver for Android emulator.
         
@@ -173,6 +179,10 @@ class DriverFactory:
         Returns:
             Appium WebDriver instance for Android
         """
+        from appium import webdriver as appium_webdriver
+        from appium.options.android import UiAutomator2Options
+        from drivers.remote_connection import tune_connection
+        
         device_config = REAL_DEVICE_CONFIGS.get(config.device_name)
         
         if not device_config:
@@ -180,8 +190,11 @@ class DriverFactory:
         
         # Start emulator if not running
         avd_name = device_config.get("avd")
+        serial = None
         if avd_name:
-            DriverFactory.start_android_emulator(avd_name)
+            serial = DriverFactory.start_android_emulator(
+                avd_name, snapshot=config.emulator_snapshot, port=config.emulator_console_port
+            )
         
         # Configure Appium options for Android
         options = UiAutomator2Options()
@@ -193,6 +206,8 @@ class DriverFactory:
         
         if avd_name:
             options.avd = avd_name
+        if serial:
+            options.udid = serial
         
         # Additional capabilities
         options.set_capability("newCommandTimeout", 300)
@@ -209,20 +224,34 @@ class DriverFactory:
         options.set_capability("ensureWebviewsHavePages", True)
         options.set_capability("nativeWebScreenshot", True)
         
+        # Route browser traffic through the record/replay proxy on the host
+        if config.replay_mode:
+            proxy = replay_proxy(config)
+            options.set_capability("appium:chromeOptions", {"args": proxy_arguments(proxy, ANDROID_HOST_ALIAS)})
+        
+        # Worker-unique ports so parallel sessions do not collide
+        ports = config.appium_ports or {}
+        for capability in ("systemPort", "chromedriverPort", "mjpegServerPort"):
+            if capability in ports:
+                options.set_capability(capability, ports[capability])
+        
         logger.info(f"Creating Appium Android driver for {config.device_name}")
         driver = appium_webdriver.Remote(
             config.appium_server_url,
             options=options
         )
         
+        # Persistent keep-alive connection pool for commands
+        tune_connection(driver, config)
+        
         # Set timeouts
-        driver.implicitly_wait(config.implicit_wait)
+        ImplicitWaitManager.for_new_session(driver, config.implicit_wait)
         
         logger.info(f"Appium Android driver created for {config.device_name}")
         return driver
     
     @staticmethod
-    def create_chrome_driver(config: BrowserConfig) -> webdriver.Chrome:
+    def create_chrome_driver(config: BrowserConfig) -> "webdriver.Chrome":
         """
         Create Chrome WebDriver configured for mobile emulation.
         
@@ -232,6 +261,11 @@ class DriverFactory:
         Returns:
             Configured Chrome WebDriver instance
         """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from drivers.remote_connection import tune_connection
+        
         chrome_options = ChromeOptions()
         
         # Get device preset if available
@@ -262,20 +296,57 @@ class DriverFactory:
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        # Keep all console messages for failure artifacts (and network events in lean mode)
+        logging_prefs = {'browser': 'ALL'}
+        if config.lean_mode:
+            logging_prefs['performance'] = 'ALL'
+        chrome_options.set_capability('goog:loggingPrefs', logging_prefs)
         
         # Performance optimizations
         prefs = {
             "profile.default_content_setting_values.notifications": 2,
             "profile.default_content_settings.popups": 0,
         }
+        if config.lean_mode:
+            patterns = blocked_patterns(config)
+            prefs.update(lean_prefs(config))
+            for argument in lean_arguments(config):
+                chrome_options.add_argument(argument)
         chrome_options.add_experimental_option("prefs", prefs)
         
-        # Create driver
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Record or replay all traffic through the local proxy
+        if config.replay_mode:
+            for argument in proxy_arguments(replay_proxy(config)):
+                chrome_options.add_argument(argument)
+        
+        # Start from a copy of the warm profile template, or an explicit profile
+        user_data_dir = config.user_data_dir
+        profile_copy = None
+        if user_data_dir is None and config.warm_profile:
+            profile_copy = user_data_dir = DriverFactory.warm_profile_copy(config)
+        if user_data_dir:
+            chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+            chrome_options.add_argument(f'--disk-cache-size={config.warm_profile_max_mb * 1048576 // 2}')
+        
+        # Create driver (chromedriver path is resolved once and cached on disk)
+        service = ChromeService(resolve_chromedriver())
+        try:
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        except Exception:
+            if profile_copy:
+                profile_manager(config).release(profile_copy)
+            raise
+        if profile_copy:
+            profile_manager(config).attach(driver, profile_copy)
+        
+        # Persistent keep-alive connection pool for commands
+        tune_connection(driver, config)
+        
+        if config.lean_mode:
+            enable_request_blocking(driver, patterns)
         
         # Set timeouts
-        driver.implicitly_wait(config.implicit_wait)
+        ImplicitWaitManager.for_new_session(driver, config.implicit_wait)
         driver.set_page_load_timeout(config.page_load_timeout)
         driver.set_script_timeout(config.script_timeout)
         
@@ -283,7 +354,41 @@ class DriverFactory:
         return driver
     
     @staticmethod
-    def create_safari_driver(config: BrowserConfig) -> webdriver.Safari:
+    def warm_profile_copy(config: BrowserConfig) -> Optional[str]:
+        """
+        Copy the warm profile template for a new Chrome session.
+        
+        The template is built on first use by visiting config.warm_profile_url.
+        
+        Args:
+            config: BrowserConfig instance with browser settings
+            
+        Returns:
+            Path of the session's user-data-dir, or None to start with a fresh profile
+        """
+        if not config.warm_profile_url:
+            logger.debug("No warm_profile_url configured, starting with a fresh profile")
+            return None
+        manager = profile_manager(config)
+        template = manager.ensure_template(
+            config, config.warm_profile_url, lambda path: DriverFactory._warm_profile(config, path)
+        )
+        return manager.clone(template) if template else None
+    
+    @staticmethod
+    def _warm_profile(config: BrowserConfig, user_data_dir: str) -> None:
+        """Run Chrome on user_data_dir until the landing page and its service worker are loaded."""
+        warm_config = dataclasses.replace(config, warm_profile=False, user_data_dir=user_data_dir)
+        driver = DriverFactory.create_chrome_driver(warm_config)
+        try:
+            driver.get(config.warm_profile_url)
+            driver.execute_async_script(SERVICE_WORKER_READY_SCRIPT, 5000)
+        finally:
+            # A clean shutdown flushes the cache index to disk
+            driver.quit()
+    
+    @staticmethod
+    def create_safari_driver(config: BrowserConfig) -> "webdriver.Safari":
         """
         Create Safari WebDriver configured for mobile emulation.
         
@@ -293,6 +398,11 @@ class DriverFactory:
         Returns:
             Configured Safari WebDriver instance
         """
+        from selenium import webdriver
+        from selenium.webdriver.safari.options import Options as SafariOptions
+        from selenium.webdriver.safari.service import Service as SafariService
+        from drivers.remote_connection import tune_connection
+        
         safari_options = SafariOptions()
         
         # Safari-specific options
@@ -305,8 +415,11 @@ class DriverFactory:
         # Set window size for mobile simulation
         driver.set_window_size(config.window_size[0], config.window_size[1])
         
+        # Persistent keep-alive connection pool for commands
+        tune_connection(driver, config)
+        
         # Set timeouts
-        driver.implicitly_wait(config.implicit_wait)
+        ImplicitWaitManager.for_new_session(driver, config.implicit_wait)
         driver.set_page_load_timeout(config.page_load_timeout)
         driver.set_script_timeout(config.script_timeout)
         
@@ -320,7 +433,7 @@ class DriverFactory:
         return driver
     
     @staticmethod
-    def create_driver(config: BrowserConfig) -> Union[webdriver.Remote, appium_webdriver.Remote]:
+    def create_driver(config: BrowserConfig) -> Union["webdriver.Remote", "appium_webdriver.Remote"]:
         """
         Create appropriate WebDriver based on configuration.
         
@@ -354,7 +467,7 @@ class DriverFactory:
             raise ValueError(f"Unsupported browser: {browser}. Use 'chrome' or 'safari'")
     
     @staticmethod
-    def quit_driver(driver: Optional[webdriver.Remote]) -> None:
+    def quit_driver(driver: Optional["webdriver.Remote"]) -> None:
         """
         Safely quit the WebDriver.
         
@@ -367,3 +480,4 @@ class DriverFactory:
                 logger.info("Driver closed successfully")
             except Exception as e:
                 logger.error(f"Error closing driver: {e}")
+            release_profile(driver)
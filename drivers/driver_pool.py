@@ -0,0 +1,237 @@
+"""
+Pool of warm WebDriver sessions.
+Each xdist worker keeps its own pool so tests reuse sessions instead of
+paying for a new driver process, browser and W3C session every time.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+from config.config import BrowserConfig
+from drivers.session_state import (
+    forget_origins,
+    remove_document_scripts,
+    track_origin,
+    visited_origins,
+)
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# Clears the current document's web storage and returns its origin
+CLEAR_STORAGE_SCRIPT = (
+    "try { window.localStorage.clear(); } catch (e) {}"
+    "try { window.sessionStorage.clear(); } catch (e) {}"
+    "return window.location.origin;"
+)
+
+
+@dataclass
+class PooledDriver:
+    """Bookkeeping for a single pooled driver session."""
+    driver: "WebDriver"
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class DriverPool:
+    """Checks out warm drivers to tests and resets them on return."""
+
+    def __init__(self, config: BrowserConfig, max_size: int = 1, max_uses: int = 20,
+                 factory: Optional[Callable[[BrowserConfig], "WebDriver"]] = None,
+                 quit_func: Optional[Callable[["WebDriver"], None]] = None):
+        """
+        Initialize driver pool.
+
+        Args:
+            config: BrowserConfig used to create new drivers
+            max_size: Maximum number of idle drivers kept warm
+            max_uses: Number of checkouts after which a driver is evicted
+            factory: Callable creating a driver (default: DriverFactory.create_driver)
+            quit_func: Callable quitting a driver (default: DriverFactory.quit_driver)
+        """
+        if factory is None or quit_func is None:
+            from drivers.driver_factory import DriverFactory
+            factory = factory or DriverFactory.create_driver
+            quit_func = quit_func or DriverFactory.quit_driver
+
+        self.config = config
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._factory = factory
+        self._quit = quit_func
+        self._idle: List[PooledDriver] = []
+        self._in_use: Dict[int, PooledDriver] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def acquire(self) -> "WebDriver":
+        """
+        Check out a healthy driver, creating one if none is idle.
+
+        Returns:
+            WebDriver instance reserved for the caller
+        """
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                break
+            if self.is_healthy(entry.driver):
+                self.reused += 1
+                return self._check_out(entry)
+            logger.info("Evicting unhealthy pooled driver")
+            self._evict(entry)
+
+        entry = PooledDriver(driver=self._factory(self.config))
+        self.created += 1
+        return self._check_out(entry)
+
+    def release(self, driver: "WebDriver", discard: bool = False) -> None:
+        """
+        Return a driver to the pool.
+
+        The driver is reset before it becomes available again. It is evicted
+        instead if it failed, reached max_uses, could not be reset or the
+        pool is already full.
+
+        Args:
+            driver: Driver previously returned by acquire()
+            discard: Evict the driver instead of reusing it (e.g. after an error)
+        """
+        with self._lock:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            logger.warning("Released driver does not belong to this pool, quitting it")
+            self._quit(driver)
+            return
+
+        if discard or entry.uses >= self.max_uses:
+            self._evict(entry)
+            return
+
+        if not self.reset_driver(entry.driver):
+            self._evict(entry)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(entry)
+                return
+        self._evict(entry)
+
+    def close(self) -> None:
+        """Quit every driver owned by the pool."""
+        with self._lock:
+            entries = self._idle + list(self._in_use.values())
+            self._idle = []
+            self._in_use = {}
+        for entry in entries:
+            self._quit(entry.driver)
+        logger.info(
+            f"Driver pool closed: {self.created} created, {self.reused} reused, {self.evicted} evicted"
+        )
+
+    @staticmethod
+    def is_healthy(driver: "WebDriver") -> bool:
+        """
+        Check that the session still responds to commands.
+
+        Args:
+            driver: WebDriver instance to check
+
+        Returns:
+            True if the session is alive, False otherwise
+        """
+        try:
+            driver.current_window_handle
+            return True
+        except Exception as e:
+            logger.debug(f"Health check failed: {e}")
+            return False
+
+    @staticmethod
+    def reset_driver(driver: "WebDriver") -> bool:
+        """
+        Reset browser state between tests.
+
+        Closes extra windows, removes the scripts registered for new documents,
+        clears cookies and web storage of every visited origin and navigates
+        to about:blank. On Chrome this goes through DevTools; other drivers
+        load each tracked origin's robots.txt and clear it from there.
+
+        Args:
+            driver: WebDriver instance to reset
+
+        Returns:
+            True if the driver was reset, False if it should be evicted
+        """
+        try:
+            cdp = hasattr(driver, "execute_cdp_cmd")
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                if cdp:
+                    _track_history(driver)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # sessionStorage is per tab and origin, so clear it before leaving the page
+            current = _clear_document(driver)
+            if cdp:
+                _track_history(driver)
+                remove_document_scripts(driver)
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                for origin in sorted(visited_origins(driver)):
+                    driver.execute_cdp_cmd(
+                        "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+                    )
+            else:
+                for origin in sorted(visited_origins(driver) - {current}):
+                    driver.get(origin + "/robots.txt")
+                    _clear_document(driver)
+
+            forget_origins(driver)
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to reset pooled driver: {e}")
+            return False
+
+    def _check_out(self, entry: PooledDriver) -> "WebDriver":
+        entry.uses += 1
+        with self._lock:
+            self._in_use[id(entry.driver)] = entry
+        return entry.driver
+
+    def _evict(self, entry: PooledDriver) -> None:
+        self.evicted += 1
+        self._quit(entry.driver)
+
+
+def _clear_document(driver: "WebDriver") -> Optional[str]:
+    """Clear cookies and web storage visible to the current document; returns its origin."""
+    try:
+        origin = driver.execute_script(CLEAR_STORAGE_SCRIPT)
+    except Exception as e:
+        logger.debug(f"Could not clear web storage: {e}")
+        origin = None
+    driver.delete_all_cookies()
+    return origin
+
+
+def _track_history(driver: "WebDriver") -> None:
+    """Track the origins in the current tab's navigation history (Chrome)."""
+    try:
+        history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+    except Exception as e:
+        logger.debug(f"Could not read navigation history: {e}")
+        return
+    for entry in history.get("entries", []):
+        track_origin(driver, entry.get("url", ""))
@@ -0,0 +1,103 @@
+"""
+Prefetching driver provider.
+Builds the next driver session on a background thread while the current
+test runs, so a ready session is handed over at the next checkout.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Deque, Optional
+import logging
+import time
+
+from config.config import BrowserConfig
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchingDriverProvider:
+    """Keeps `depth` driver sessions warming up in the background."""
+
+    def __init__(self, config: BrowserConfig, depth: int = 1,
+                 factory: Optional[Callable[[BrowserConfig], "WebDriver"]] = None,
+                 quit_func: Optional[Callable[["WebDriver"], None]] = None):
+        """
+        Initialize provider.
+
+        Args:
+            config: BrowserConfig used to create drivers
+            depth: Number of sessions prepared ahead of time
+            factory: Callable creating a driver (default: DriverFactory.create_driver)
+            quit_func: Callable quitting a driver (default: DriverFactory.quit_driver)
+        """
+        if factory is None or quit_func is None:
+            from drivers.driver_factory import DriverFactory
+            factory = factory or DriverFactory.create_driver
+            quit_func = quit_func or DriverFactory.quit_driver
+
+        if depth < 1:
+            raise ValueError("Prefetch depth must be at least 1")
+
+        self.config = config
+        self.depth = depth
+        self._factory = factory
+        self._quit = quit_func
+        # One extra thread so quitting a used driver never delays a prefetch
+        self._executor = ThreadPoolExecutor(max_workers=depth + 1, thread_name_prefix="driver-prefetch")
+        self._pending: Deque[Future] = deque()
+        self._closed = False
+
+    def acquire(self) -> "WebDriver":
+        """
+        Hand over the oldest prefetched driver and start prefetching the next one.
+
+        Returns:
+            Ready WebDriver instance
+        """
+        if not self._pending:
+            self._prefetch()
+        future = self._pending.popleft()
+        self._fill()
+
+        start = time.monotonic()
+        try:
+            driver = future.result()
+        except Exception as e:
+            logger.warning(f"Prefetched driver failed to start ({e}), creating one directly")
+            driver = self._factory(self.config)
+        logger.debug(f"Waited {time.monotonic() - start:.2f}s for prefetched driver")
+        return driver
+
+    def release(self, driver: "WebDriver") -> None:
+        """
+        Quit a used driver in the background.
+
+        Args:
+            driver: Driver previously returned by acquire()
+        """
+        if self._closed:
+            self._quit(driver)
+        else:
+            self._executor.submit(self._quit, driver)
+
+    def close(self) -> None:
+        """Quit unused prefetched drivers and stop the background threads."""
+        self._closed = True
+        while self._pending:
+            future = self._pending.popleft()
+            if future.cancel():
+                continue
+            try:
+                self._quit(future.result())
+            except Exception as e:
+                logger.debug(f"Discarding failed prefetch: {e}")
+        self._executor.shutdown(wait=True)
+
+    def _prefetch(self) -> None:
+        self._pending.append(self._executor.submit(self._factory, self.config))
+
+    def _fill(self) -> None:
+        while not self._closed and len(self._pending) < self.depth:
+            self._prefetch()
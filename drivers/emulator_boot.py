@@ -0,0 +1,290 @@
+"""
+Android emulator boot manager.
+Maps AVD names to adb serials, follows boot progress through adb instead of
+fixed sleeps and reports how long each boot phase took.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FIRST_CONSOLE_PORT = 5554
+LAST_CONSOLE_PORT = 5682
+POLL_INTERVAL = 0.25
+
+
+def find_emulator_binary() -> str:
+    """
+    Locate the Android emulator binary.
+
+    Looks at ANDROID_SDK_ROOT / ANDROID_HOME, the default macOS SDK location
+    and finally PATH.
+
+    Returns:
+        Path to the emulator executable
+    """
+    sdk_roots = [
+        os.getenv("ANDROID_SDK_ROOT"),
+        os.getenv("ANDROID_HOME"),
+        os.path.expanduser("~/Library/Android/sdk"),
+        os.path.expanduser("~/Android/Sdk"),
+    ]
+    for root in filter(None, sdk_roots):
+        candidate = os.path.join(root, "emulator", "emulator")
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which("emulator") or "emulator"
+
+
+@dataclass
+class BootResult:
+    """Outcome of booting (or finding) an emulator."""
+    avd_name: str
+    serial: str
+    already_running: bool = False
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total(self) -> float:
+        """Total boot time in seconds."""
+        return sum(self.phases.values())
+
+    def summary(self) -> str:
+        """Human readable phase breakdown."""
+        if self.already_running:
+            return f"{self.avd_name} ({self.serial}) already running"
+        phases = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.phases.items())
+        return f"{self.avd_name} ({self.serial}) booted in {self.total:.1f}s [{phases}]"
+
+
+class EmulatorBootManager:
+    """Boots Android emulators and tracks them by AVD name and serial."""
+
+    def __init__(self, adb: str = "adb", emulator: Optional[str] = None,
+                 poll_interval: float = POLL_INTERVAL):
+        """
+        Initialize boot manager.
+
+        Args:
+            adb: adb executable
+            emulator: emulator executable (default: auto-detected)
+            poll_interval: Seconds between boot property polls
+        """
+        self.adb = adb
+        self.emulator = emulator or find_emulator_binary()
+        self.poll_interval = poll_interval
+        self._port_lock = threading.Lock()
+        self._reserved_ports: set = set()
+
+    def _adb(self, *args: str, serial: Optional[str] = None,
+             timeout: Optional[float] = 10) -> subprocess.CompletedProcess:
+        cmd = [self.adb]
+        if serial:
+            cmd.extend(["-s", serial])
+        cmd.extend(args)
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+    def emulator_serials(self) -> List[str]:
+        """
+        List serials of emulators attached to adb.
+
+        Returns:
+            Serials such as "emulator-5554" (offline devices included)
+        """
+        result = self._adb("devices")
+        serials = []
+        for line in result.stdout.splitlines()[1:]:
+            parts = line.split()
+            if parts and parts[0].startswith("emulator-"):
+                serials.append(parts[0])
+        return serials
+
+    def avd_name_for(self, serial: str) -> Optional[str]:
+        """
+        Ask an emulator console which AVD it is running.
+
+        Args:
+            serial: Emulator serial
+
+        Returns:
+            AVD name or None if the console did not answer
+        """
+        try:
+            result = self._adb("emu", "avd", "name", serial=serial, timeout=5)
+        except subprocess.TimeoutExpired:
+            return None
+        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        if result.returncode != 0 or not lines or lines[0] == "OK":
+            return None
+        return lines[0]
+
+    def running_emulators(self) -> Dict[str, str]:
+        """
+        Map running AVD names to their serials.
+
+        Returns:
+            Dictionary of AVD name -> serial
+        """
+        running = {}
+        for serial in self.emulator_serials():
+            name = self.avd_name_for(serial)
+            if name:
+                running[name] = serial
+        return running
+
+    def _reserve_port(self, preferred: Optional[int] = None) -> int:
+        with self._port_lock:
+            used = {int(serial.split("-")[1]) for serial in self.emulator_serials()}
+            used |= self._reserved_ports
+            candidates = list(range(FIRST_CONSOLE_PORT, LAST_CONSOLE_PORT, 2))
+            if preferred:
+                candidates.insert(0, preferred)
+            for port in candidates:
+                if port not in used:
+                    self._reserved_ports.add(port)
+                    return port
+        raise RuntimeError("No free emulator console port available")
+
+    def boot(self, avd_name: str, timeout: float = 180,
+             emulator_args: Sequence[str] = ("-no-snapshot-load",),
+             port: Optional[int] = None) -> BootResult:
+        """
+        Boot an AVD (or reuse it if already running) and wait until it is ready.
+
+        Args:
+            avd_name: Name of the AVD to start
+            timeout: Maximum seconds for the whole boot
+            emulator_args: Extra emulator command line arguments
+            port: Preferred console port (serial emulator-<port>) if free
+
+        Returns:
+            BootResult with serial and phase timings
+
+        Raises:
+            TimeoutError: If the emulator does not finish booting in time
+            RuntimeError: If the emulator process exits with an error
+
+        An emulator launched here that does not finish booting is shut down
+        before the error is raised.
+        """
+        serial = self.running_emulators().get(avd_name)
+        if serial:
+            result = BootResult(avd_name, serial, already_running=True)
+            logger.info(result.summary())
+            return result
+
+        port = self._reserve_port(port)
+        serial = f"emulator-{port}"
+        result = BootResult(avd_name, serial)
+        deadline = time.monotonic() + timeout
+        process = None
+
+        try:
+            logger.info(f"Starting Android emulator: {avd_name} on {serial}")
+            start = time.monotonic()
+            process = subprocess.Popen(
+                [self.emulator, "-avd", avd_name, "-port", str(port), *emulator_args],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            result.phases["launch"] = time.monotonic() - start
+
+            start = time.monotonic()
+            try:
+                self._adb("wait-for-device", serial=serial, timeout=self._remaining(deadline))
+            except subprocess.TimeoutExpired:
+                raise TimeoutError(f"Emulator {avd_name} did not appear on adb within {timeout} seconds")
+            result.phases["adb_online"] = time.monotonic() - start
+
+            start = time.monotonic()
+            self._wait_for_props(serial, process, deadline, avd_name, boot_completed=True)
+            result.phases["boot_completed"] = time.monotonic() - start
+
+            start = time.monotonic()
+            self._wait_for_props(serial, process, deadline, avd_name, boot_completed=False)
+            result.phases["boot_animation"] = time.monotonic() - start
+        except BaseException:
+            if process is not None:
+                self._stop_emulator(serial, process)
+            raise
+        finally:
+            with self._port_lock:
+                self._reserved_ports.discard(port)
+
+        logger.info(result.summary())
+        return result
+
+    def boot_many(self, avd_names: Sequence[str], timeout: float = 180,
+                  emulator_args: Sequence[str] = ("-no-snapshot-load",)) -> Dict[str, BootResult]:
+        """
+        Boot several AVDs in parallel.
+
+        Args:
+            avd_names: AVD names to boot
+            timeout: Maximum seconds for each boot
+            emulator_args: Extra emulator command line arguments
+
+        Returns:
+            Dictionary of AVD name -> BootResult
+        """
+        if not avd_names:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(avd_names)) as executor:
+            futures = {
+                name: executor.submit(self.boot, name, timeout, emulator_args)
+                for name in avd_names
+            }
+            return {name: future.result() for name, future in futures.items()}
+
+    def _stop_emulator(self, serial: str, process: subprocess.Popen) -> None:
+        """Shut down an emulator that failed to boot, through its console first."""
+        logger.warning(f"Stopping emulator {serial} after failed boot")
+        try:
+            self._adb("emu", "kill", serial=serial, timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        try:
+            process.terminate()
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(deadline - time.monotonic(), 0.1)
+
+    def _wait_for_props(self, serial: str, process: subprocess.Popen, deadline: float,
+                        avd_name: str, boot_completed: bool) -> None:
+        """
+        Poll boot properties in a single adb round trip per iteration.
+
+        Waits for sys.boot_completed == 1 when boot_completed is True,
+        otherwise for init.svc.bootanim == stopped. A property that is
+        missing or empty means the phase has not finished yet.
+        """
+        while time.monotonic() < deadline:
+            if process.poll() not in (None, 0):
+                raise RuntimeError(f"Emulator {avd_name} exited with code {process.returncode}")
+            try:
+                output = self._adb(
+                    "shell", "getprop sys.boot_completed; getprop init.svc.bootanim",
+                    serial=serial, timeout=5
+                ).stdout
+                # One line per property; an unset property prints an empty line
+                props = [line.strip() for line in output.splitlines()]
+            except subprocess.TimeoutExpired:
+                props = []
+            if boot_completed and props[:1] == ["1"]:
+                return
+            if not boot_completed and props[1:2] == ["stopped"]:
+                return
+            time.sleep(self.poll_interval)
+        raise TimeoutError(f"Emulator {avd_name} failed to finish booting")
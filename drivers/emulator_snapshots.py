@@ -0,0 +1,258 @@
+"""
+Quickboot snapshot management for Android emulators.
+Creates a "Chrome ready" snapshot once (booted, Chrome first-run done,
+popups disabled) and warm-boots later runs from it. The snapshot is
+invalidated when the AVD system image or the Chrome version changes.
+"""
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+import time
+
+from config.config import CACHE_DIR
+from drivers.emulator_boot import BootResult, EmulatorBootManager
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT = "chrome_ready"
+CHROME_PACKAGE = "com.android.chrome"
+CHROME_ACTIVITY = "com.google.android.apps.chrome.Main"
+CHROME_FLAGS = "_ --disable-fre --no-default-browser-check --no-first-run --disable-notifications"
+
+
+def avd_home() -> str:
+    """Directory holding <avd>.ini files."""
+    if os.getenv("ANDROID_AVD_HOME"):
+        return os.environ["ANDROID_AVD_HOME"]
+    user_home = os.getenv("ANDROID_USER_HOME", os.path.expanduser("~/.android"))
+    return os.path.join(user_home, "avd")
+
+
+def read_ini(path: str) -> Dict[str, str]:
+    """Parse a key=value AVD ini file."""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    values[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return values
+
+
+def avd_directory(avd_name: str) -> str:
+    """Content directory of an AVD (<avd>.avd)."""
+    ini = read_ini(os.path.join(avd_home(), f"{avd_name}.ini"))
+    return ini.get("path") or os.path.join(avd_home(), f"{avd_name}.avd")
+
+
+def image_fingerprint(avd_name: str) -> str:
+    """
+    Fingerprint the AVD hardware config and its system image.
+
+    Args:
+        avd_name: Name of the AVD
+
+    Returns:
+        Hex digest that changes when the image or AVD config changes
+    """
+    digest = hashlib.sha256()
+    config = read_ini(os.path.join(avd_directory(avd_name), "config.ini"))
+    digest.update(json.dumps(config, sort_keys=True).encode())
+
+    sysdir = config.get("image.sysdir.1")
+    sdk_root = os.getenv("ANDROID_SDK_ROOT") or os.getenv("ANDROID_HOME") or \
+        os.path.expanduser("~/Library/Android/sdk")
+    if sysdir:
+        image_dir = os.path.join(sdk_root, sysdir)
+        props = read_ini(os.path.join(image_dir, "source.properties"))
+        digest.update(props.get("Pkg.Revision", "").encode())
+        for name in ("system.img", "vendor.img"):
+            try:
+                stat = os.stat(os.path.join(image_dir, name))
+                digest.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)}".encode())
+            except OSError:
+                pass
+    return digest.hexdigest()[:16]
+
+
+class SnapshotManager:
+    """Boots AVDs from a named quickboot snapshot, creating it when needed."""
+
+    def __init__(self, boot_manager: Optional[EmulatorBootManager] = None,
+                 snapshot_name: str = DEFAULT_SNAPSHOT, cache_dir: str = CACHE_DIR):
+        """
+        Initialize snapshot manager.
+
+        Args:
+            boot_manager: EmulatorBootManager used to launch emulators
+            snapshot_name: Name of the quickboot snapshot
+            cache_dir: Directory holding snapshot metadata
+        """
+        self.boot_manager = boot_manager or EmulatorBootManager()
+        self.snapshot_name = snapshot_name
+        self.metadata_dir = os.path.join(cache_dir, "snapshots")
+
+    def _metadata_path(self, avd_name: str) -> str:
+        return os.path.join(self.metadata_dir, f"{avd_name}.{self.snapshot_name}.json")
+
+    def _read_metadata(self, avd_name: str) -> Dict[str, str]:
+        try:
+            with open(self._metadata_path(avd_name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_metadata(self, avd_name: str, metadata: Dict[str, str]) -> None:
+        os.makedirs(self.metadata_dir, exist_ok=True)
+        path = self._metadata_path(avd_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(metadata, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _lock_path(self, avd_name: str) -> str:
+        return os.path.join(self.metadata_dir, f"{avd_name}.lock")
+
+    def snapshot_exists(self, avd_name: str) -> bool:
+        """Check whether the snapshot is present on disk for the AVD."""
+        path = os.path.join(avd_directory(avd_name), "snapshots", self.snapshot_name)
+        return os.path.isdir(path)
+
+    def is_valid(self, avd_name: str) -> bool:
+        """
+        Check that the snapshot exists and was taken from the current image.
+
+        The Chrome version can only be checked once the device is up, see boot().
+        """
+        metadata = self._read_metadata(avd_name)
+        return (
+            self.snapshot_exists(avd_name)
+            and metadata.get("image") == image_fingerprint(avd_name)
+        )
+
+    def boot(self, avd_name: str, timeout: float = 180, port: Optional[int] = None) -> BootResult:
+        """
+        Boot an AVD, warm from the snapshot when it is valid.
+
+        A cold boot is followed by Chrome preparation and a snapshot save, so
+        the next launch is a warm boot.
+
+        Args:
+            avd_name: Name of the AVD to start
+            timeout: Maximum seconds for the boot
+            port: Preferred console port if the emulator has to be started
+
+        Returns:
+            BootResult of the boot
+        """
+        if self.is_valid(avd_name):
+            result = self.boot_manager.boot(
+                avd_name, timeout=timeout,
+                emulator_args=("-snapshot", self.snapshot_name, "-no-snapshot-save"),
+                port=port,
+            )
+            if result.already_running:
+                return result
+            chrome_version = self.chrome_version(result.serial)
+            if chrome_version == self._read_metadata(avd_name).get("chrome"):
+                logger.info(f"Warm booted {avd_name} from snapshot '{self.snapshot_name}'")
+                return result
+            logger.info(
+                f"Chrome version changed on {avd_name} ({chrome_version}), refreshing snapshot"
+            )
+            self.create_snapshot(avd_name, result.serial)
+            return result
+
+        result = self.boot_manager.boot(
+            avd_name, timeout=timeout, emulator_args=("-no-snapshot-load",), port=port
+        )
+        if not result.already_running:
+            self.create_snapshot(avd_name, result.serial)
+        return result
+
+    def create_snapshot(self, avd_name: str, serial: str) -> None:
+        """
+        Prepare Chrome on a freshly booted device and save the snapshot.
+
+        Only the snapshot save and its metadata are done under the AVD's
+        file lock; booting runs unlocked.
+
+        Args:
+            avd_name: Name of the AVD
+            serial: adb serial of the running emulator
+        """
+        start = time.monotonic()
+        self.prepare_chrome(serial)
+        with file_lock(self._lock_path(avd_name)):
+            result = self._adb(serial, "emu", "avd", "snapshot", "save", self.snapshot_name, timeout=120)
+            if result.returncode != 0 or "KO" in result.stdout:
+                logger.warning(
+                    f"Failed to save snapshot '{self.snapshot_name}' for {avd_name}: {result.stdout}"
+                )
+                return
+            self._write_metadata(avd_name, {
+                "snapshot": self.snapshot_name,
+                "image": image_fingerprint(avd_name),
+                "chrome": self.chrome_version(serial),
+            })
+        logger.info(
+            f"Saved snapshot '{self.snapshot_name}' for {avd_name} in {time.monotonic() - start:.1f}s"
+        )
+
+    def invalidate(self, avd_name: str, serial: Optional[str] = None) -> None:
+        """
+        Forget the snapshot of an AVD (and delete it if the emulator is running).
+
+        Args:
+            avd_name: Name of the AVD
+            serial: adb serial of the running emulator, if any
+        """
+        with file_lock(self._lock_path(avd_name)):
+            if serial:
+                self._adb(serial, "emu", "avd", "snapshot", "delete", self.snapshot_name)
+            try:
+                os.remove(self._metadata_path(avd_name))
+            except OSError:
+                pass
+
+    def prepare_chrome(self, serial: str) -> None:
+        """
+        Skip Chrome first-run screens and popups, then open Chrome once.
+
+        Args:
+            serial: adb serial of the running emulator
+        """
+        self._adb(serial, "shell", f"echo '{CHROME_FLAGS}' > /data/local/tmp/chrome-command-line")
+        self._adb(serial, "shell", "am", "set-debug-app", "--persistent", CHROME_PACKAGE)
+        self._adb(serial, "shell", "pm", "grant", CHROME_PACKAGE, "android.permission.POST_NOTIFICATIONS")
+        self._adb(serial, "shell", "am", "start", "-W", "-n",
+                  f"{CHROME_PACKAGE}/{CHROME_ACTIVITY}", "-d", "about:blank")
+        self._adb(serial, "shell", "am", "force-stop", CHROME_PACKAGE)
+
+    def chrome_version(self, serial: str) -> Optional[str]:
+        """
+        Read the installed Chrome version from the device.
+
+        Args:
+            serial: adb serial of the running emulator
+
+        Returns:
+            Chrome versionName or None if Chrome is not installed
+        """
+        result = self._adb(serial, "shell", "dumpsys", "package", CHROME_PACKAGE)
+        match = re.search(r"versionName=(\S+)", result.stdout)
+        return match.group(1) if match else None
+
+    def _adb(self, serial: str, *args: str, timeout: float = 30) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [self.boot_manager.adb, "-s", serial, *args],
+            capture_output=True, text=True, timeout=timeout
+        )
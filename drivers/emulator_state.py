@@ -0,0 +1,199 @@
+"""
+Per-test emulator state rollback.
+Keeps one Appium session for the whole run and rolls the emulator back to a
+snapshot taken right after session setup, instead of rebuilding the session
+for every test. When the emulator cannot take snapshots the session is quit,
+Chrome's data is cleared and a new session is started.
+"""
+from typing import TYPE_CHECKING, Optional
+import logging
+import subprocess
+import time
+
+from config.config import BrowserConfig
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+BASELINE_SNAPSHOT = "test_baseline"
+CHROME_PACKAGE = "com.android.chrome"
+
+
+def driver_serial(driver: "WebDriver") -> Optional[str]:
+    """
+    Read the adb serial of the device behind an Appium session.
+
+    Args:
+        driver: Appium WebDriver instance
+
+    Returns:
+        adb serial or None if the session does not report one
+    """
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return (
+        capabilities.get("deviceUDID")
+        or capabilities.get("udid")
+        or capabilities.get("appium:udid")
+    )
+
+
+class EmulatorStateRestorer:
+    """Saves and restores emulator state for a single device."""
+
+    def __init__(self, serial: Optional[str], snapshot_name: str = BASELINE_SNAPSHOT,
+                 adb: str = "adb"):
+        """
+        Initialize restorer.
+
+        Args:
+            serial: adb serial of the emulator
+            snapshot_name: Name of the baseline snapshot
+            adb: adb executable
+        """
+        self.serial = serial
+        self.snapshot_name = snapshot_name
+        self.adb = adb
+        self.snapshots_available = False
+
+    def _adb(self, *args: str, timeout: float = 60) -> subprocess.CompletedProcess:
+        cmd = [self.adb]
+        if self.serial:
+            cmd.extend(["-s", self.serial])
+        cmd.extend(args)
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+    def save(self) -> bool:
+        """
+        Save the baseline snapshot.
+
+        Returns:
+            True if the emulator supports snapshots and the save succeeded
+        """
+        try:
+            result = self._adb("emu", "avd", "snapshot", "save", self.snapshot_name, timeout=120)
+            self.snapshots_available = result.returncode == 0 and "KO" not in result.stdout
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Snapshot save failed: {e}")
+            self.snapshots_available = False
+
+        if self.snapshots_available:
+            logger.info(f"Saved baseline snapshot '{self.snapshot_name}' on {self.serial}")
+        else:
+            logger.warning(
+                f"Snapshots not available on {self.serial}, falling back to 'pm clear {CHROME_PACKAGE}' "
+                f"and a new session per test"
+            )
+        return self.snapshots_available
+
+    def restore(self) -> bool:
+        """
+        Roll the emulator back to the baseline snapshot.
+
+        Returns:
+            True if the snapshot was loaded; False if snapshots are not
+            available (the caller has to fall back to a new session)
+        """
+        if not self.snapshots_available:
+            return False
+        start = time.monotonic()
+        try:
+            result = self._adb("emu", "avd", "snapshot", "load", self.snapshot_name)
+            loaded = result.returncode == 0 and "KO" not in result.stdout
+            detail = result.stdout.strip()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            loaded, detail = False, str(e)
+        if not loaded:
+            logger.warning(f"Snapshot load failed ({detail}), falling back to new sessions")
+            self.snapshots_available = False
+            return False
+        self._adb("wait-for-device")
+        logger.info(f"Emulator state restored on {self.serial} in {time.monotonic() - start:.1f}s")
+        return True
+
+    def clear_chrome(self) -> None:
+        """
+        Clear Chrome's data (cookies, storage, cache, tabs).
+
+        This kills Chrome, so it must only run while no session is attached.
+        """
+        self._adb("shell", "pm", "clear", CHROME_PACKAGE)
+
+
+class SnapshotResetSession:
+    """One Appium session reused across tests with per-test state rollback."""
+
+    def __init__(self, config: BrowserConfig, snapshot_name: str = BASELINE_SNAPSHOT):
+        """
+        Initialize reset session.
+
+        Args:
+            config: BrowserConfig used to create the Appium session
+            snapshot_name: Name of the baseline snapshot
+        """
+        self.config = config
+        self.snapshot_name = snapshot_name
+        self.driver: Optional["WebDriver"] = None
+        self.restorer: Optional[EmulatorStateRestorer] = None
+
+    def acquire(self) -> "WebDriver":
+        """
+        Return the shared session, creating it and its baseline if needed.
+
+        Returns:
+            WebDriver instance
+        """
+        if self.driver is None:
+            self._start()
+        return self.driver
+
+    def reset(self) -> None:
+        """
+        Restore the baseline, or start a new session on cleared Chrome data.
+
+        The snapshot is loaded under the live session; the session is only
+        recreated if it did not survive. Without snapshots the session is
+        quit before Chrome's data is cleared, since clearing kills Chrome.
+        """
+        if self.driver is None:
+            return
+        if self.restorer.restore():
+            if self._is_healthy():
+                return
+            logger.info("Session did not survive state restore, recreating it")
+            self._quit()
+        else:
+            self._quit()
+            self.restorer.clear_chrome()
+        self._start()
+
+    def close(self) -> None:
+        """Quit the shared session."""
+        self._quit()
+
+    def _start(self) -> None:
+        from drivers.driver_factory import DriverFactory
+
+        self.driver = DriverFactory.create_driver(self.config)
+        serial = driver_serial(self.driver)
+        if self.restorer and self.restorer.serial == serial and not self.restorer.snapshots_available:
+            # Snapshots already failed on this device, keep using new sessions
+            return
+        # (Re)take the baseline so it contains the current session
+        self.restorer = EmulatorStateRestorer(serial, self.snapshot_name)
+        self.restorer.save()
+
+    def _quit(self) -> None:
+        from drivers.driver_factory import DriverFactory
+
+        DriverFactory.quit_driver(self.driver)
+        self.driver = None
+
+    def _is_healthy(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except Exception as e:
+            logger.debug(f"Session health check failed: {e}")
+            return False
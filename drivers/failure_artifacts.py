@@ -0,0 +1,174 @@
+"""
+Failure artifact bundles.
+Collects the screenshot, page source, current URL, browser console log and,
+for Android devices, the UI hierarchy of a failing test's driver
+concurrently under a hard time budget, and writes them to one zip file.
+Artifacts that do not finish within the budget are left out (and noted in
+the bundle's manifest) rather than holding the worker.
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+import json
+import logging
+import os
+import re
+import subprocess
+import time
+import zipfile
+
+from drivers.emulator_state import driver_serial
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+UI_DUMP_MARKER = "UI hierchary dumped to"  # sic, uiautomator's spelling
+
+
+@dataclass
+class FailureArtifacts:
+    """Artifacts collected for one failed test."""
+    files: Dict[str, bytes] = field(default_factory=dict)
+    status: Dict[str, str] = field(default_factory=dict)  # artifact -> ok / error / timed out
+    durations: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def screenshot(self) -> Optional[bytes]:
+        return self.files.get("screenshot.png")
+
+
+def _console_log(driver: "WebDriver") -> bytes:
+    entries = driver.get_log("browser")
+    return "\n".join(
+        f"{entry.get('timestamp')} {entry.get('level')} {entry.get('message')}" for entry in entries
+    ).encode()
+
+
+def _is_android(driver: "WebDriver") -> bool:
+    capabilities = getattr(driver, "capabilities", None) or {}
+    return str(capabilities.get("platformName", "")).lower() == "android"
+
+
+def android_ui_dump(serial: Optional[str], timeout: float = 10) -> bytes:
+    """
+    Dump the UI hierarchy of an Android device without touching its storage.
+
+    Args:
+        serial: adb serial (None for the only connected device)
+        timeout: Maximum time for the dump in seconds
+
+    Returns:
+        UI hierarchy XML
+    """
+    cmd = ["adb"] + (["-s", serial] if serial else []) + [
+        "exec-out", "uiautomator", "dump", "/dev/tty"
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=timeout, check=True)
+    return result.stdout.split(UI_DUMP_MARKER.encode())[0].strip()
+
+
+class FailureArtifactCollector:
+    """Collects failure artifacts from a driver in parallel within a time budget."""
+
+    def __init__(self, directory: str = "reports/artifacts", budget: float = 10.0):
+        """
+        Initialize collector.
+
+        Args:
+            directory: Directory for the zip bundles
+            budget: Seconds allowed for collecting all artifacts
+        """
+        self.directory = directory
+        self.budget = budget
+
+    def tasks(self, driver: "WebDriver") -> Dict[str, Callable[[], Any]]:
+        """Artifact name -> callable producing its content."""
+        tasks = {
+            "screenshot.png": driver.get_screenshot_as_png,
+            "page_source.html": lambda: driver.page_source.encode(),
+            "url.txt": lambda: driver.current_url.encode(),
+            "console.log": lambda: _console_log(driver),
+        }
+        if _is_android(driver):
+            serial = driver_serial(driver)
+            tasks["ui_hierarchy.xml"] = lambda: android_ui_dump(serial, timeout=self.budget)
+        return tasks
+
+    def collect(self, driver: "WebDriver") -> FailureArtifacts:
+        """
+        Collect all artifacts concurrently, abandoning those over budget.
+
+        Args:
+            driver: WebDriver of the failed test
+
+        Returns:
+            FailureArtifacts with whatever finished in time
+        """
+        artifacts = FailureArtifacts()
+        start = time.monotonic()
+
+        def timed(name, task):
+            task_start = time.monotonic()
+            try:
+                return task()
+            finally:
+                artifacts.durations[name] = round(time.monotonic() - task_start, 3)
+
+        tasks = self.tasks(driver)
+        executor = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="artifact")
+        futures = {executor.submit(timed, name, task): name for name, task in tasks.items()}
+        done, not_done = wait(futures, timeout=self.budget)
+        # Don't wait for stragglers, they finish (or fail) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in done:
+            name = futures[future]
+            try:
+                artifacts.files[name] = future.result()
+                artifacts.status[name] = "ok"
+            except Exception as e:
+                message = str(e).strip().splitlines()
+                artifacts.status[name] = f"error: {e.__class__.__name__}" + (f": {message[0]}" if message else "")
+        for future in not_done:
+            artifacts.status[futures[future]] = "timed out"
+        artifacts.elapsed = round(time.monotonic() - start, 3)
+        return artifacts
+
+    def write_bundle(self, test_name: str, artifacts: FailureArtifacts,
+                     metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Write the artifacts and a manifest to a compressed zip file.
+
+        Args:
+            test_name: Test name or node id, used in the file name
+            artifacts: Collected artifacts
+            metadata: Extra manifest entries (e.g. node id, error summary)
+
+        Returns:
+            Path of the bundle
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]+", "_", test_name).strip("_")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.directory, f"{safe_name}_{timestamp}.zip")
+
+        manifest = {
+            **(metadata or {}),
+            "collected_in": artifacts.elapsed,
+            "budget": self.budget,
+            "artifacts": {
+                name: {"status": status, "seconds": artifacts.durations.get(name)}
+                for name, status in sorted(artifacts.status.items())
+            },
+        }
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            for name, content in artifacts.files.items():
+                # PNGs are already compressed
+                compress = zipfile.ZIP_STORED if name.endswith(".png") else zipfile.ZIP_DEFLATED
+                bundle.writestr(name, content, compress_type=compress)
+            bundle.writestr("manifest.json", json.dumps(manifest, indent=2, default=str))
+        return path
@@ -0,0 +1,58 @@
+"""
+Inter-process file locks shared by xdist workers.
+"""
+from contextlib import contextmanager
+from typing import Iterator
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True, shared: bool = False) -> Iterator[bool]:
+    """
+    Hold an exclusive or shared lock on a lock file.
+
+    Args:
+        path: Path of the lock file (created if missing)
+        blocking: Wait for the lock instead of failing immediately
+        shared: Take a shared lock, held by any number of readers but never
+            together with an exclusive one (exclusive on Windows, where
+            msvcrt has no shared locks)
+
+    Yields:
+        True if the lock was acquired, False if non-blocking and busy
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    acquired = False
+    try:
+        try:
+            if fcntl:
+                flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                if not blocking:
+                    flags |= fcntl.LOCK_NB
+                fcntl.flock(fd, flags)
+            else:
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                msvcrt.locking(fd, mode, 1)
+            acquired = True
+        except OSError:
+            if blocking:
+                raise
+        yield acquired
+    finally:
+        if acquired:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
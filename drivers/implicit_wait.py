@@ -0,0 +1,121 @@
+"""
+Implicit wait bookkeeping per driver.
+Tracks the implicit wait each driver was configured with so explicit waits
+and immediate presence checks can zero it temporarily and restore it
+afterwards, without querying the driver for its current timeouts.
+"""
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+import logging
+import threading
+import weakref
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+class ImplicitWaitManager:
+    """Implicit wait state of one driver, with nestable suspension."""
+
+    _managers: "weakref.WeakKeyDictionary[WebDriver, ImplicitWaitManager]" = weakref.WeakKeyDictionary()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, driver: "WebDriver", seconds: Optional[float] = None):
+        """
+        Initialize manager.
+
+        Args:
+            driver: WebDriver instance
+            seconds: Implicit wait currently set on the driver (None if unknown)
+        """
+        # Weak, so the registry entry does not keep its own key alive
+        self._driver = weakref.ref(driver)
+        self.seconds = seconds
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    @property
+    def driver(self) -> "WebDriver":
+        driver = self._driver()
+        if driver is None:
+            raise ReferenceError("Driver of this ImplicitWaitManager no longer exists")
+        return driver
+
+    @classmethod
+    def for_driver(cls, driver: "WebDriver") -> "ImplicitWaitManager":
+        """Get (or create) the manager of a driver."""
+        with cls._registry_lock:
+            manager = cls._managers.get(driver)
+            if manager is None:
+                manager = cls._managers[driver] = cls(driver)
+            return manager
+
+    @classmethod
+    def for_new_session(cls, driver: "WebDriver", seconds: float) -> "ImplicitWaitManager":
+        """
+        Get the manager of a freshly created session with its configured implicit wait.
+
+        W3C sessions start with an implicit wait of 0, so nothing is sent to
+        the driver unless a non-zero wait is configured; suspended() then
+        sends nothing either.
+        """
+        manager = cls.for_driver(driver)
+        if seconds:
+            manager.set(seconds)
+        else:
+            manager.seconds = 0
+        return manager
+
+    def set(self, seconds: float) -> None:
+        """
+        Set the driver's implicit wait.
+
+        Inside a suspension the new value is only applied once it ends.
+
+        Args:
+            seconds: Implicit wait in seconds
+        """
+        with self._lock:
+            self.seconds = seconds
+            if self._depth == 0:
+                self.driver.implicitly_wait(seconds)
+
+    def _current(self) -> float:
+        if self.seconds is None:
+            # Driver created elsewhere, ask it once
+            try:
+                self.seconds = self.driver.timeouts.implicit_wait
+            except Exception as e:
+                logger.debug(f"Could not read implicit wait, assuming 0: {e}")
+                self.seconds = 0
+        return self.seconds
+
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        """
+        Zero the implicit wait for the duration of the block.
+
+        Nested blocks share the outermost suspension, so the driver gets at
+        most two timeout commands per outermost block, and none at all when
+        the implicit wait is already 0.
+        """
+        with self._lock:
+            self._depth += 1
+            try:
+                if self._depth == 1 and self._current():
+                    self.driver.implicitly_wait(0)
+            except Exception:
+                self._depth -= 1
+                raise
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0 and self.seconds:
+                    try:
+                        self.driver.implicitly_wait(self.seconds)
+                    except Exception as e:
+                        logger.warning(f"Could not restore implicit wait of {self.seconds}s: {e}")
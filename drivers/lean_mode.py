@@ -0,0 +1,140 @@
+"""
+Lean rendering mode for Chrome emulation.
+Blocks ad, analytics and media requests (LEAN_BLOCKLISTS categories) through
+CDP Network.setBlockedURLs, optionally disables images and autoplay, and
+reads Chrome's performance log to report what was blocked per test.
+"""
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import json
+import logging
+
+from config.config import BrowserConfig, LEAN_BLOCKLISTS
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+def blocked_patterns(config: BrowserConfig) -> Dict[str, List[str]]:
+    """
+    URL patterns to block, per category.
+
+    Raises:
+        ValueError: If a category is not in LEAN_BLOCKLISTS
+    """
+    unknown = set(config.lean_block) - set(LEAN_BLOCKLISTS)
+    if unknown:
+        raise ValueError(
+            f"Unknown lean mode categories {sorted(unknown)}, expected: {', '.join(LEAN_BLOCKLISTS)}"
+        )
+    patterns = {category: list(LEAN_BLOCKLISTS[category]["patterns"]) for category in config.lean_block}
+    if config.lean_extra_patterns:
+        patterns["custom"] = list(config.lean_extra_patterns)
+    return patterns
+
+
+def lean_prefs(config: BrowserConfig) -> Dict[str, int]:
+    """Chrome prefs for lean mode."""
+    prefs = {}
+    if "images" in config.lean_block:
+        prefs["profile.managed_default_content_settings.images"] = 2
+    return prefs
+
+
+def lean_arguments(config: BrowserConfig) -> List[str]:
+    """Chrome command-line switches for lean mode."""
+    arguments = ["--mute-audio"]
+    if "media" in config.lean_block:
+        arguments.append("--autoplay-policy=user-gesture-required")
+    return arguments
+
+
+def enable_request_blocking(driver: "WebDriver", patterns: Dict[str, List[str]]) -> None:
+    """Block all pattern URLs for the session."""
+    urls = [pattern for category in patterns.values() for pattern in category]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+    logger.info(f"Lean mode: blocking {len(urls)} URL patterns ({', '.join(patterns)})")
+
+
+@dataclass
+class LeanModeStats:
+    """Requests of one test, read from Chrome's performance log."""
+    requests: int = 0  # Requests that finished loading
+    bytes_transferred: int = 0
+    blocked: Dict[str, int] = field(default_factory=dict)  # category -> blocked requests
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def bytes_avoided(self) -> int:
+        """Estimate from LEAN_BLOCKLISTS typical_kb per blocked request."""
+        return sum(
+            count * LEAN_BLOCKLISTS.get(category, {}).get("typical_kb", 0) * 1024
+            for category, count in self.blocked.items()
+        )
+
+    def summary(self) -> str:
+        categories = ", ".join(f"{category}: {count}" for category, count in sorted(self.blocked.items()))
+        return (
+            f"{self.blocked_requests} requests blocked ({categories or 'none'}), "
+            f"~{self.bytes_avoided / 1048576:.1f} MB avoided; "
+            f"{self.requests} requests / {self.bytes_transferred / 1048576:.1f} MB loaded"
+        )
+
+
+def _category(url: str, patterns: Dict[str, List[str]]) -> str:
+    for category, category_patterns in patterns.items():
+        if any(fnmatchcase(url, pattern) for pattern in category_patterns):
+            return category
+    return "other"
+
+
+def collect_stats(log_entries: Sequence[dict], patterns: Dict[str, List[str]]) -> LeanModeStats:
+    """
+    Summarize performance log entries.
+
+    Args:
+        log_entries: driver.get_log("performance") entries
+        patterns: Blocked patterns per category
+
+    Returns:
+        LeanModeStats
+    """
+    stats = LeanModeStats()
+    urls: Dict[str, str] = {}
+    for entry in log_entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            urls[params.get("requestId")] = params.get("request", {}).get("url", "")
+        elif method == "Network.loadingFinished":
+            stats.requests += 1
+            stats.bytes_transferred += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            category = _category(urls.get(params.get("requestId"), ""), patterns)
+            stats.blocked[category] = stats.blocked.get(category, 0) + 1
+    return stats
+
+
+def read_stats(driver: "WebDriver", patterns: Dict[str, List[str]]) -> Optional[LeanModeStats]:
+    """
+    Drain the driver's performance log into LeanModeStats.
+
+    Returns:
+        LeanModeStats since the previous call, or None if the log is unavailable
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        logger.debug(f"Performance log unavailable: {e}")
+        return None
+    return collect_stats(entries, patterns)
@@ -0,0 +1,102 @@
+"""
+Network and CPU throttling through the Chrome DevTools Protocol.
+Applies a NETWORK_PROFILES entry to a Chrome session with
+Network.emulateNetworkConditions and Emulation.setCPUThrottlingRate, and
+resolves which profile a test runs with (marker, option or device preset).
+"""
+from typing import TYPE_CHECKING, Optional
+import logging
+
+from config.config import DEVICE_PRESETS, NETWORK_PROFILES
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+PRESET = "preset"  # Use the device preset's profile
+NO_THROTTLING = "none"
+
+
+def resolve_profile(device_name: str, requested: Optional[str]) -> Optional[str]:
+    """
+    Resolve the profile name to apply.
+
+    Args:
+        device_name: Device preset name
+        requested: Profile name, "preset" for the device preset's profile,
+                   or None/"none" for no throttling
+
+    Returns:
+        A NETWORK_PROFILES key, or None for no throttling
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if requested == PRESET:
+        requested = DEVICE_PRESETS.get(device_name, {}).get("network_profile")
+    if not requested or requested == NO_THROTTLING:
+        return None
+    if requested not in NETWORK_PROFILES:
+        raise ValueError(
+            f"Unknown network profile '{requested}', expected one of: {', '.join(NETWORK_PROFILES)}"
+        )
+    return requested
+
+
+def _kbps_to_bytes(kbps: float) -> float:
+    return kbps * 1000 / 8
+
+
+def network_conditions(profile: dict) -> dict:
+    """CDP Network.emulateNetworkConditions parameters for a profile."""
+    params = {
+        "offline": profile.get("offline", False),
+        "latency": profile.get("latency_ms", 0),
+        "downloadThroughput": _kbps_to_bytes(profile["download_kbps"]) if "download_kbps" in profile else -1,
+        "uploadThroughput": _kbps_to_bytes(profile["upload_kbps"]) if "upload_kbps" in profile else -1,
+    }
+    if profile.get("packet_loss"):
+        params["packetLoss"] = profile["packet_loss"]
+    return params
+
+
+def apply_network_profile(driver: "WebDriver", name: str) -> bool:
+    """
+    Throttle a Chrome session's network and CPU.
+
+    Args:
+        driver: WebDriver instance
+        name: NETWORK_PROFILES key
+
+    Returns:
+        True if applied, False if the driver has no CDP access
+    """
+    if not hasattr(driver, "execute_cdp_cmd"):
+        logger.warning(f"Network profile '{name}' needs Chrome DevTools, not applied")
+        return False
+    profile = NETWORK_PROFILES[name]
+    params = network_conditions(profile)
+    driver.execute_cdp_cmd("Network.enable", {})
+    try:
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", params)
+    except Exception:
+        if "packetLoss" not in params:
+            raise
+        # Packet loss emulation needs a recent Chrome
+        logger.warning(f"Packet loss emulation unsupported, applying '{name}' without it")
+        params.pop("packetLoss")
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", params)
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": profile.get("cpu_slowdown", 1)})
+    logger.info(f"Network profile applied: {name} {profile}")
+    return True
+
+
+def clear_network_profile(driver: "WebDriver") -> None:
+    """Remove network and CPU throttling from a Chrome session."""
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+        "offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1,
+    })
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": 1})
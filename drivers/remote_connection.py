@@ -0,0 +1,144 @@
+"""
+Tuned transport for WebDriver/Appium command connections.
+Replaces the HTTP connection manager behind driver.command_executor with a
+persistent keep-alive pool sized per worker, explicit connect/read timeouts
+and optional compressed responses, and dispatches batches of independent
+read-only commands concurrently over that pool.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+import logging
+import threading
+
+import urllib3
+
+from config.config import BrowserConfig
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+BATCH_WORKERS = 4
+
+
+class TunedPoolManager(urllib3.PoolManager):
+    """PoolManager that applies fixed timeouts and extra headers to every request."""
+
+    def __init__(self, timeout: urllib3.Timeout, extra_headers: Optional[Dict[str, str]] = None,
+                 **kwargs: Any):
+        super().__init__(timeout=timeout, **kwargs)
+        self.command_timeout = timeout
+        self.extra_headers = extra_headers or {}
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        # Selenium passes its own headers and timeout, merge ours on top
+        if self.extra_headers:
+            kw["headers"] = {**self.extra_headers, **(kw.get("headers") or {})}
+        kw["timeout"] = self.command_timeout
+        return super().urlopen(method, url, redirect=redirect, **kw)
+
+
+def tune_connection(driver: "WebDriver", config: BrowserConfig) -> bool:
+    """
+    Install a tuned keep-alive connection pool on a driver.
+
+    Args:
+        driver: Selenium or Appium WebDriver instance
+        config: BrowserConfig with connection_* settings
+
+    Returns:
+        True if the connection was tuned, False if it was left unchanged
+    """
+    executor = getattr(driver, "command_executor", None)
+    current = getattr(executor, "_conn", None)
+    if current is None or isinstance(current, urllib3.ProxyManager):
+        # Proxied connections keep Selenium's own manager
+        logger.debug("Remote connection not tuned (no direct connection manager)")
+        return False
+
+    timeout = urllib3.Timeout(
+        connect=config.connection_connect_timeout,
+        read=config.connection_read_timeout,
+    )
+    manager = TunedPoolManager(
+        timeout=timeout,
+        extra_headers=COMPRESSION_HEADERS if config.compress_transport else None,
+        num_pools=1,
+        maxsize=config.connection_pool_size,
+        block=False,
+        retries=False,
+        **_tls_kwargs(current),
+    )
+    executor._conn = manager
+    current.clear()
+
+    # Selenium only uses the shared manager (_conn) when keep-alive is on,
+    # otherwise it opens a new connection manager per command
+    client_config = getattr(executor, "_client_config", None)
+    if client_config is not None:
+        client_config.keep_alive = True
+    else:
+        executor.keep_alive = True
+
+    logger.debug(
+        f"Remote connection tuned: pool={config.connection_pool_size}, "
+        f"timeouts={config.connection_connect_timeout}/{config.connection_read_timeout}s, "
+        f"compression={config.compress_transport}"
+    )
+    return True
+
+
+def _tls_kwargs(manager: urllib3.PoolManager) -> Dict[str, Any]:
+    """Carry TLS settings (ignore_certificates / ca_certs) over to the new manager."""
+    return {
+        key: value for key, value in manager.connection_pool_kw.items()
+        if key in ("cert_reqs", "ca_certs")
+    }
+
+
+_batch_executor: Optional[ThreadPoolExecutor] = None
+_batch_executor_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Process-wide executor shared by all batches."""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="dispatch-batch")
+        return _batch_executor
+
+
+def dispatch_batch(driver: "WebDriver", commands: List[Callable[["WebDriver"], Any]]) -> List[Any]:
+    """
+    Dispatch independent read-only commands as one group over the connection pool.
+
+    Commands are sent concurrently, so the batch costs roughly one round
+    trip of network/proxy latency instead of one per command. The session
+    may run them in any order, so only pass commands without side effects
+    (reading title, URL, element properties); clicks, typing, navigation or
+    scripts that change the page must be sent one by one.
+
+    Args:
+        driver: WebDriver instance
+        commands: Callables taking the driver, e.g. lambda d: d.title
+
+    Returns:
+        Results in the order of the commands
+
+    Raises:
+        Exception: The first exception raised by any command, in command order
+
+    Example:
+        title, url = dispatch_batch(driver, [lambda d: d.title, lambda d: d.current_url])
+    """
+    if not commands:
+        return []
+    if len(commands) == 1:
+        return [commands[0](driver)]
+
+    executor = _executor()
+    futures = [executor.submit(command, driver) for command in commands]
+    return [future.result() for future in futures]
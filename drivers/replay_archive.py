@@ -0,0 +1,197 @@
+"""
+Indexed archive of recorded HTTP exchanges for the record/replay proxy.
+An archive is a directory holding index.json, which maps a request key to
+its recorded responses, and append-only body files. Lookups are a dict hit
+and bodies are served straight from memory-mapped body files, so large media
+responses are never copied into Python memory up front.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+
+# Response headers that describe the original transfer, not the content
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "content-length",
+}
+
+
+def request_key(method: str, url: str, body: bytes = b"",
+                ignored_params: Iterable[str] = ()) -> str:
+    """
+    Key identifying equivalent requests.
+
+    Query parameters are sorted and `ignored_params` (cache busters, session
+    ids) dropped; request bodies are included as a hash.
+
+    Args:
+        method: HTTP method
+        url: Absolute URL
+        body: Request body
+        ignored_params: Query parameters that do not affect the response
+
+    Returns:
+        Request key string
+    """
+    parts = urlsplit(url)
+    ignored = set(ignored_params)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k not in ignored))
+    normalized = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", query, ""))
+    key = f"{method.upper()} {normalized}"
+    if body:
+        key += " #" + hashlib.sha1(body).hexdigest()[:16]
+    return key
+
+
+@dataclass
+class ArchivedResponse:
+    """A recorded response; body is a view into the memory-mapped body file."""
+    status: int
+    reason: str
+    headers: List[Tuple[str, str]]
+    body: memoryview
+
+
+class ReplayArchive:
+    """Record/replay archive stored in a directory."""
+
+    def __init__(self, path: str, writer: str = "main"):
+        """
+        Initialize archive.
+
+        Args:
+            path: Archive directory
+            writer: Name of this recording process (e.g. the xdist worker), used
+                    for its body file so parallel recorders never share one
+        """
+        self.path = path
+        self.writer = writer
+        self._index: Dict[str, List[dict]] = {}
+        self._new: Dict[str, List[dict]] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._files = []
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._blob = None
+        self._blob_name = f"bodies-{writer}.bin"
+
+    # Replay
+
+    def load(self) -> "ReplayArchive":
+        """
+        Load the index and map the body files.
+
+        Raises:
+            FileNotFoundError: If the archive has no index
+        """
+        with open(os.path.join(self.path, INDEX_FILE)) as f:
+            self._index = json.load(f)
+        for name in {entry["file"] for entries in self._index.values() for entry in entries}:
+            blob_path = os.path.join(self.path, name)
+            if os.path.getsize(blob_path) == 0:
+                continue
+            f = open(blob_path, "rb")
+            self._files.append(f)
+            self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        logger.info(f"Replay archive loaded: {len(self._index)} requests from {self.path}")
+        return self
+
+    def lookup(self, key: str) -> Optional[ArchivedResponse]:
+        """
+        Find the response for a request key.
+
+        Repeated requests get the recorded responses in order, then the last one again.
+
+        Returns:
+            ArchivedResponse, or None if the request was not recorded
+        """
+        entries = self._index.get(key)
+        if not entries:
+            return None
+        with self._lock:
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = position + 1
+        entry = entries[min(position, len(entries) - 1)]
+        data = self._maps.get(entry["file"])
+        body = memoryview(data)[entry["offset"]:entry["offset"] + entry["length"]] if data else memoryview(b"")
+        return ArchivedResponse(entry["status"], entry["reason"], [tuple(h) for h in entry["headers"]], body)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Record
+
+    def add(self, key: str, status: int, reason: str, headers: Iterable[Tuple[str, str]],
+            body: bytes) -> None:
+        """Append a recorded response."""
+        headers = [[name, value] for name, value in headers if name.lower() not in HOP_BY_HOP_HEADERS]
+        with self._lock:
+            if self._blob is None:
+                os.makedirs(self.path, exist_ok=True)
+                self._blob = open(os.path.join(self.path, self._blob_name), "ab")
+            offset = self._blob.tell()
+            self._blob.write(body)
+            self._new.setdefault(key, []).append({
+                "status": status, "reason": reason, "headers": headers,
+                "file": self._blob_name, "offset": offset, "length": len(body),
+            })
+
+    def save(self) -> int:
+        """
+        Merge newly recorded responses into the index (safe across parallel recorders).
+
+        Responses recorded now replace earlier recordings of the same request.
+
+        Returns:
+            Number of request keys written
+        """
+        with self._lock:
+            if self._blob is not None:
+                self._blob.flush()
+                os.fsync(self._blob.fileno())
+            new, self._new = self._new, {}
+        if not new:
+            return 0
+        index_path = os.path.join(self.path, INDEX_FILE)
+        with file_lock(index_path + ".lock"):
+            try:
+                with open(index_path) as f:
+                    merged = json.load(f)
+            except (OSError, ValueError):
+                merged = {}
+            merged.update(new)
+            tmp_path = index_path + f".{self.writer}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(merged, f)
+            os.replace(tmp_path, index_path)
+        logger.info(f"Replay archive saved: {len(new)} requests recorded to {self.path}")
+        return len(new)
+
+    def close(self) -> None:
+        """Save new recordings and release files and mappings."""
+        self.save()
+        with self._lock:
+            if self._blob is not None:
+                self._blob.close()
+                self._blob = None
+        for data in self._maps.values():
+            try:
+                data.close()
+            except BufferError:
+                pass  # A response body is still referenced, the mapping goes with it
+        for f in self._files:
+            f.close()
+        self._maps, self._files = {}, []
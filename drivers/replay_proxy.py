@@ -0,0 +1,312 @@
+"""
+Local record/replay HTTP(S) proxy.
+In record mode every request is forwarded upstream and the response stored
+in a ReplayArchive; in replay mode responses are served from the archive
+only (unrecorded requests get 404), optionally with added latency and a
+bandwidth cap, so page runs are offline and deterministic.
+
+HTTPS is intercepted with one self-signed certificate (created with the
+openssl CLI and cached); the browser must be started with
+--ignore-certificate-errors.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+import atexit
+import http.client
+import logging
+import os
+import ssl
+import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+
+from config.config import CACHE_DIR
+from drivers.file_lock import file_lock
+from drivers.replay_archive import HOP_BY_HOP_HEADERS, ReplayArchive, request_key
+
+if TYPE_CHECKING:
+    from config.config import BrowserConfig
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+CHUNK_SIZE = 16384
+# Address of the host's loopback interface as seen from an Android emulator
+ANDROID_HOST_ALIAS = "10.0.2.2"
+UPSTREAM_TIMEOUT = 30
+
+
+def ensure_certificate(directory: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Create (once) the self-signed certificate used to intercept HTTPS.
+
+    Args:
+        directory: Where to keep cert.pem/key.pem (default: in the local cache dir)
+
+    Returns:
+        Tuple of (certificate path, key path)
+
+    Raises:
+        RuntimeError: If the certificate cannot be created
+    """
+    directory = directory or os.path.join(CACHE_DIR, "replay-proxy")
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with file_lock(os.path.join(directory, ".lock")):
+        if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+            try:
+                subprocess.run(
+                    ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+                     "-keyout", key_path, "-out", cert_path, "-days", "3650",
+                     "-subj", "/CN=opennet-wap-testing replay proxy"],
+                    capture_output=True, check=True, timeout=60,
+                )
+            except (OSError, subprocess.SubprocessError) as e:
+                raise RuntimeError(f"Could not create the replay proxy certificate with openssl: {e}")
+    return cert_path, key_path
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Handles one client connection; CONNECT tunnels are terminated locally."""
+
+    protocol_version = "HTTP/1.1"
+    tunnel_host: Optional[str] = None  # host[:port] of an intercepted HTTPS tunnel
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_CONNECT(self):
+        proxy: ReplayProxy = self.server.proxy
+        if proxy.tls_context is None:
+            self.send_error(502, "HTTPS interception unavailable")
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.wfile.flush()
+        try:
+            tls = proxy.tls_context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            logger.debug(f"TLS handshake for {self.path} failed: {e}")
+            self.close_connection = True
+            return
+
+        host, _, port = self.path.partition(":")
+        self.tunnel_host = host if port in ("", "443") else self.path
+        self.connection = tls
+        self.rfile = tls.makefile("rb", self.rbufsize)
+        self.wfile = tls.makefile("wb")
+        self.close_connection = False
+        while not self.close_connection:
+            self.handle_one_request()
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _handle(self):
+        proxy: ReplayProxy = self.server.proxy
+        url = f"https://{self.tunnel_host}{self.path}" if self.tunnel_host else self.path
+        if not urlsplit(url).netloc:
+            self.send_error(400, "Proxy requests need an absolute URL")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        key = request_key(self.command, url, body, proxy.ignored_params)
+
+        if proxy.mode == REPLAY:
+            response = proxy.archive.lookup(key)
+            if response is None:
+                proxy.count("misses")
+                logger.debug(f"Replay miss: {key}")
+                self._respond(404, "Not Recorded", [("X-Replay-Miss", "1")], b"")
+                return
+            proxy.count("hits")
+            self._respond(response.status, response.reason, response.headers, response.body)
+            return
+
+        try:
+            status, reason, headers, data = proxy.fetch(self.command, url, self.headers.items(), body)
+        except (OSError, http.client.HTTPException) as e:
+            logger.debug(f"Upstream request failed for {url}: {e}")
+            self.send_error(502, f"Upstream request failed: {e.__class__.__name__}")
+            return
+        proxy.archive.add(key, status, reason, headers, data)
+        proxy.count("recorded")
+        self._respond(status, reason, headers, data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_HEAD = _handle
+
+    def _respond(self, status: int, reason: str, headers: Iterable[Tuple[str, str]], body) -> None:
+        proxy: ReplayProxy = self.server.proxy
+        if proxy.mode == REPLAY and proxy.latency_ms:
+            time.sleep(proxy.latency_ms / 1000)
+        self.send_response(status, reason)
+        for name, value in headers:
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "HEAD" or not body:
+            return
+        if proxy.mode == REPLAY and proxy.bandwidth_kbps:
+            bytes_per_second = proxy.bandwidth_kbps * 1000 / 8
+            for start in range(0, len(body), CHUNK_SIZE):
+                chunk = body[start:start + CHUNK_SIZE]
+                self.wfile.write(chunk)
+                time.sleep(len(chunk) / bytes_per_second)
+        else:
+            self.wfile.write(body)
+
+
+class ReplayProxy:
+    """Record/replay proxy server running in a background thread."""
+
+    def __init__(self, archive: ReplayArchive, mode: str = REPLAY, latency_ms: int = 0,
+                 bandwidth_kbps: Optional[int] = None, ignored_params: Iterable[str] = (),
+                 host: str = "127.0.0.1", port: int = 0, intercept_https: bool = True):
+        """
+        Initialize proxy.
+
+        Args:
+            archive: Archive to record into or replay from
+            mode: "record" or "replay"
+            latency_ms: Delay added before each replayed response
+            bandwidth_kbps: Cap on replayed body throughput (None for no cap)
+            ignored_params: Query parameters ignored when matching requests
+            host: Listen address
+            port: Listen port (0 picks a free port)
+            intercept_https: Terminate CONNECT tunnels with the self-signed certificate
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unsupported proxy mode: {mode}")
+        self.archive = archive
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.bandwidth_kbps = bandwidth_kbps
+        self.ignored_params: List[str] = list(ignored_params)
+        self.host = host
+        self.port = port
+        self.tls_context: Optional[ssl.SSLContext] = None
+        if intercept_https:
+            try:
+                cert_path, key_path = ensure_certificate()
+                self.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                self.tls_context.load_cert_chain(cert_path, key_path)
+            except (RuntimeError, ssl.SSLError) as e:
+                logger.warning(f"HTTPS requests will fail through the replay proxy: {e}")
+        self.hits = self.misses = self.recorded = 0
+        self._counter_lock = threading.Lock()
+        self._upstream_context = ssl.create_default_context()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def count(self, counter: str) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch(self, method: str, url: str, headers: Iterable[Tuple[str, str]],
+              body: bytes) -> Tuple[int, str, List[Tuple[str, str]], bytes]:
+        """Forward a request upstream and read the complete response."""
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                parts.netloc, timeout=UPSTREAM_TIMEOUT, context=self._upstream_context
+            )
+        else:
+            connection = http.client.HTTPConnection(parts.netloc, timeout=UPSTREAM_TIMEOUT)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        forwarded = {
+            name: value for name, value in headers
+            if name.lower() not in HOP_BY_HOP_HEADERS and not name.lower().startswith("proxy-")
+        }
+        try:
+            connection.request(method, path, body=body or None, headers=forwarded)
+            response = connection.getresponse()
+            data = response.read()
+            return response.status, response.reason, response.getheaders(), data
+        finally:
+            connection.close()
+
+    def start(self) -> "ReplayProxy":
+        """Start serving in a background thread."""
+        if self.mode == REPLAY:
+            self.archive.load()
+        self._server = ThreadingHTTPServer((self.host, self.port), _ProxyHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, name="replay-proxy", daemon=True)
+        self._thread.start()
+        logger.info(f"Replay proxy ({self.mode}) listening on {self.url}, archive {self.archive.path}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and save (record mode) or release (replay mode) the archive."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self.archive.close()
+        logger.info(
+            f"Replay proxy stopped: {self.recorded} recorded, {self.hits} replayed, {self.misses} missed"
+        )
+
+
+_proxy: Optional[ReplayProxy] = None
+_proxy_lock = threading.Lock()
+
+
+def replay_proxy(config: "BrowserConfig") -> ReplayProxy:
+    """
+    Process-wide proxy for the config's replay mode, started on first use.
+
+    Each xdist worker runs its own proxy and records into its own body file.
+    Stop it with stop_replay_proxy() (the replay_session fixture does so at
+    the end of the test session); exiting the process stops it as a fallback.
+    """
+    global _proxy
+    with _proxy_lock:
+        if _proxy is None:
+            archive = ReplayArchive(config.replay_archive, writer=os.getenv("PYTEST_XDIST_WORKER", "main"))
+            _proxy = ReplayProxy(
+                archive,
+                mode=config.replay_mode,
+                latency_ms=config.replay_latency_ms,
+                bandwidth_kbps=config.replay_bandwidth_kbps,
+                ignored_params=config.replay_ignored_params,
+            ).start()
+            atexit.register(stop_replay_proxy)
+        return _proxy
+
+
+def stop_replay_proxy() -> None:
+    """Stop the process-wide proxy, if running, and save what it recorded."""
+    global _proxy
+    with _proxy_lock:
+        proxy, _proxy = _proxy, None
+    if proxy is not None:
+        proxy.stop()
+
+
+def proxy_arguments(proxy: ReplayProxy, host_alias: Optional[str] = None) -> List[str]:
+    """
+    Chrome switches routing all traffic through the proxy.
+
+    Args:
+        proxy: Running ReplayProxy
+        host_alias: Address under which the browser reaches the proxy host
+                    (e.g. 10.0.2.2 from an Android emulator)
+    """
+    return [
+        f"--proxy-server=http://{host_alias or proxy.host}:{proxy.port}",
+        "--ignore-certificate-errors",
+        "--disable-quic",
+    ]
@@ -0,0 +1,72 @@
+"""
+Browser state a session accumulates across tests.
+Tracks the origins a driver visited and the scripts registered for new
+documents over CDP (Page.addScriptToEvaluateOnNewDocument), so a pooled
+session can be wiped completely before the next test gets it.
+"""
+from typing import TYPE_CHECKING, Dict, Set
+from urllib.parse import urlsplit
+import logging
+import weakref
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# Origins (scheme://host[:port]) visited, per driver
+_origins: "weakref.WeakKeyDictionary[WebDriver, Set[str]]" = weakref.WeakKeyDictionary()
+# CDP identifiers of new-document scripts by name, per driver
+_document_scripts: "weakref.WeakKeyDictionary[WebDriver, Dict[str, str]]" = weakref.WeakKeyDictionary()
+
+
+def track_origin(driver: "WebDriver", url: str) -> None:
+    """Remember the origin of a URL the driver is about to load."""
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https") and parts.netloc:
+        _origins.setdefault(driver, set()).add(f"{parts.scheme}://{parts.netloc.lower()}")
+
+
+def visited_origins(driver: "WebDriver") -> Set[str]:
+    """Origins tracked for a driver since its last reset."""
+    return set(_origins.get(driver, set()))
+
+
+def forget_origins(driver: "WebDriver") -> None:
+    """Drop the tracked origins of a driver."""
+    _origins.pop(driver, None)
+
+
+def add_document_script(driver: "WebDriver", name: str, source: str) -> str:
+    """
+    Register a script for every new document, replacing an earlier one of the same name.
+
+    Args:
+        driver: Chrome/Chromium driver (must support execute_cdp_cmd)
+        name: Name the registration is kept under (e.g. "web_vitals")
+        source: JavaScript source
+
+    Returns:
+        CDP identifier of the registration
+    """
+    scripts = _document_scripts.setdefault(driver, {})
+    previous = scripts.pop(name, None)
+    if previous:
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": previous})
+    added = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+    scripts[name] = added["identifier"]
+    return added["identifier"]
+
+
+def has_document_script(driver: "WebDriver", name: str) -> bool:
+    """Whether a script of that name is registered for new documents."""
+    return name in _document_scripts.get(driver, {})
+
+
+def remove_document_scripts(driver: "WebDriver") -> None:
+    """Remove every new-document script registered through add_document_script."""
+    for name, identifier in _document_scripts.pop(driver, {}).items():
+        try:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+        except Exception as e:
+            logger.debug(f"Could not remove new-document script {name}: {e}")
@@ -0,0 +1,446 @@
+"""
+Native UI lookups on Android through a persistent adb shell.
+One `adb shell` process is kept open per device and commands are written to
+its stdin, so dumping the UI hierarchy and tapping a node cost no process
+launches. Dumps are parsed incrementally as they stream in and indexed by
+text, resource-id and content-desc. Tap coordinates are cached per screen
+resolution: with a cached entry the dump, the check that the node is still
+there and the tap happen in a single round trip.
+"""
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
+from xml.etree.ElementTree import ParseError, XMLPullParser
+from xml.sax.saxutils import escape
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import shlex
+import subprocess
+import threading
+import time
+
+from config.config import CACHE_DIR
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+DUMP_PATH = "/data/local/tmp/ui_engine_dump.xml"
+TAPPED = b"__ui_engine_tapped__"
+BOUNDS_PATTERN = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+SIZE_PATTERN = re.compile(r"(Physical|Override) size: (\d+x\d+)")
+RETRY_INTERVAL = 0.25
+
+
+@dataclass
+class UiNode:
+    """A node of the UI hierarchy."""
+    text: str
+    resource_id: str
+    content_desc: str
+    class_name: str
+    bounds: Tuple[int, int, int, int]  # x1, y1, x2, y2
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        x1, y1, x2, y2 = self.bounds
+        return (x1 + x2) // 2, (y1 + y2) // 2
+
+    @classmethod
+    def from_attributes(cls, attributes: Dict[str, str]) -> "UiNode":
+        match = BOUNDS_PATTERN.fullmatch(attributes.get("bounds", ""))
+        bounds = tuple(map(int, match.groups())) if match else (0, 0, 0, 0)
+        return cls(
+            text=attributes.get("text", ""),
+            resource_id=attributes.get("resource-id", ""),
+            content_desc=attributes.get("content-desc", ""),
+            class_name=attributes.get("class", ""),
+            bounds=bounds,
+        )
+
+
+class UiHierarchy:
+    """Nodes of one UI dump, indexed by text, resource-id and content-desc."""
+
+    def __init__(self):
+        self.nodes: List[UiNode] = []
+        self.by_text: Dict[str, List[UiNode]] = {}
+        self.by_resource_id: Dict[str, List[UiNode]] = {}
+        self.by_content_desc: Dict[str, List[UiNode]] = {}
+        self.rotation = 0
+
+    def add(self, node: UiNode) -> None:
+        self.nodes.append(node)
+        for index, key in ((self.by_text, node.text), (self.by_resource_id, node.resource_id),
+                           (self.by_content_desc, node.content_desc)):
+            if key:
+                index.setdefault(key, []).append(node)
+
+    def find(self, text: Union[str, Pattern, None] = None,
+             resource_id: Optional[str] = None) -> Optional[UiNode]:
+        """
+        First node matching all given criteria.
+
+        Args:
+            text: Exact text, or a compiled pattern searched in text and content-desc
+            resource_id: Exact resource-id
+
+        Returns:
+            UiNode or None
+        """
+        if text is None:
+            candidates = self.by_resource_id.get(resource_id, []) if resource_id else self.nodes
+        elif isinstance(text, str):
+            candidates = self.by_text.get(text, []) + self.by_content_desc.get(text, [])
+        else:
+            # Distinct labels are far fewer than nodes
+            candidates = [node for index in (self.by_text, self.by_content_desc)
+                          for label, nodes in index.items() if text.search(label) for node in nodes]
+        for node in candidates:
+            if resource_id is None or node.resource_id == resource_id:
+                return node
+        return None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+def parse_hierarchy(chunks: Iterable[bytes]) -> UiHierarchy:
+    """
+    Parse a uiautomator dump as it arrives.
+
+    Args:
+        chunks: Pieces of the dump XML (anything after the root element is ignored)
+
+    Returns:
+        UiHierarchy
+
+    Raises:
+        ValueError: If the dump is not valid XML
+    """
+    hierarchy = UiHierarchy()
+    parser = XMLPullParser(events=("start", "end"))
+    done = False
+    for chunk in chunks:
+        if done:
+            continue  # Keep consuming so the stream is drained
+        try:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start" and element.tag == "node":
+                    hierarchy.add(UiNode.from_attributes(element.attrib))
+                elif event == "start" and element.tag == "hierarchy":
+                    hierarchy.rotation = int(element.get("rotation", 0))
+                elif event == "end":
+                    element.clear()
+                    if element.tag == "hierarchy":
+                        done = True
+        except ParseError as e:
+            raise ValueError(f"Invalid UI dump: {e}")
+    return hierarchy
+
+
+class AdbShell:
+    """A long-running `adb shell` that runs commands written to its stdin."""
+
+    def __init__(self, serial: Optional[str] = None, adb: str = "adb"):
+        """
+        Initialize shell (started on first use).
+
+        Args:
+            serial: adb serial (None for the only connected device)
+            adb: adb executable
+        """
+        self.serial = serial
+        self.adb = adb
+        self.last_status: Optional[int] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._output: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._commands = 0
+
+    def _start(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            return
+        cmd = [self.adb] + (["-s", self.serial] if self.serial else []) + ["shell"]
+        self._process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+        )
+        self._output = queue.Queue()
+        threading.Thread(
+            target=self._read, args=(self._process.stdout, self._output), name="adb-shell-reader", daemon=True
+        ).start()
+        logger.debug(f"adb shell started for {self.serial or 'default device'}")
+
+    @staticmethod
+    def _read(stdout, output: "queue.Queue[Optional[bytes]]") -> None:
+        while True:
+            data = stdout.read(65536)
+            if not data:
+                output.put(None)
+                return
+            output.put(data)
+
+    def stream(self, command: str, timeout: float = 10) -> Iterator[bytes]:
+        """
+        Run a command and yield its stdout as it arrives.
+
+        The exit status is available as last_status once the stream is exhausted.
+
+        Raises:
+            TimeoutError: If the command does not finish within timeout (the shell is restarted)
+            RuntimeError: If the adb shell exits
+        """
+        with self._lock:
+            self._start()
+            self._commands += 1
+            marker = f"__ui_engine_done_{self._commands}__".encode()
+            self._process.stdin.write(f"{command}; echo {marker.decode()} $?\n".encode())
+            self._process.stdin.flush()
+            deadline = time.monotonic() + timeout
+            pending = b""
+            finished = False
+            try:
+                while True:
+                    try:
+                        chunk = self._output.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        raise TimeoutError(f"adb command timed out after {timeout}s: {command}")
+                    if chunk is None:
+                        raise RuntimeError("adb shell exited (device disconnected?)")
+                    pending += chunk
+                    index = pending.find(marker)
+                    if index >= 0 and pending.endswith(b"\n"):
+                        status = pending[index + len(marker):].strip()
+                        self.last_status = int(status) if status.isdigit() else None
+                        finished = True
+                        if index:
+                            yield pending[:index]
+                        return
+                    if index < 0 and len(pending) > len(marker):
+                        # Hold back a possible partial marker
+                        yield pending[:-len(marker)]
+                        pending = pending[-len(marker):]
+            finally:
+                if not finished:
+                    self.close()  # Unread output would corrupt the next command
+
+    def run(self, command: str, timeout: float = 10) -> Tuple[int, bytes]:
+        """
+        Run a command to completion.
+
+        Returns:
+            Tuple of (exit status, stdout)
+        """
+        output = b"".join(self.stream(command, timeout))
+        return self.last_status, output
+
+    def close(self) -> None:
+        """Stop the shell process."""
+        if self._process is not None:
+            try:
+                self._process.kill()
+                self._process.wait(timeout=5)
+            except (OSError, subprocess.SubprocessError):
+                pass
+            self._process = None
+
+
+class TapCache:
+    """Resolved tap targets per screen resolution, persisted across runs."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(CACHE_DIR, "ui_tap_cache.json")
+        self._entries: Dict[str, Dict[str, dict]] = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, dict]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, resolution: str, query: str) -> Optional[UiNode]:
+        entry = self._entries.get(resolution, {}).get(query)
+        if not entry:
+            return None
+        return UiNode(
+            entry["text"], entry["resource_id"], entry.get("content_desc", ""), "", tuple(entry["bounds"])
+        )
+
+    def put(self, resolution: str, query: str, node: UiNode) -> None:
+        """Store a tap target and merge it into the on-disk cache (safe across xdist workers)."""
+        entry = {
+            "text": node.text, "resource_id": node.resource_id,
+            "content_desc": node.content_desc, "bounds": list(node.bounds),
+        }
+        with file_lock(self.path + ".lock"):
+            merged = self._load()
+            merged.setdefault(resolution, {})[query] = entry
+            tmp_path = self.path + f".{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(merged, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        with self._lock:
+            self._entries = merged
+
+
+def _query_key(text: Union[str, Pattern, None], resource_id: Optional[str]) -> str:
+    label = text.pattern if hasattr(text, "pattern") else text
+    return json.dumps([label, resource_id])
+
+
+def _ere_escape(value: str) -> str:
+    return re.sub(r"([.^$*+?()\[\]{}|\\])", r"\\\1", value)
+
+
+def _grep_pattern(node: UiNode) -> Optional[str]:
+    """
+    Extended regex matching the node's own element in the dump XML, used to confirm a cached node.
+
+    Requires its text, resource-id, content-desc and bounds on the same element
+    (uiautomator writes them in this order), so the label has to be at the
+    cached position. None if the node has no identifying attribute.
+    """
+    if not (node.text or node.resource_id or node.content_desc):
+        return None
+    x1, y1, x2, y2 = node.bounds
+    attributes = (
+        ("text", node.text), ("resource-id", node.resource_id), ("content-desc", node.content_desc),
+        ("bounds", f"[{x1},{y1}][{x2},{y2}]"),
+    )
+    return "<node" + "".join(
+        f'[^>]* {name}="{_ere_escape(escape(value, {chr(34): "&quot;"}))}"' for name, value in attributes
+    )
+
+
+class UiAutomatorEngine:
+    """Finds and taps native UI nodes on one device over a persistent adb shell."""
+
+    _engines: Dict[Optional[str], "UiAutomatorEngine"] = {}
+    _engines_lock = threading.Lock()
+
+    def __init__(self, serial: Optional[str] = None, adb: str = "adb", cache: Optional[TapCache] = None,
+                 dump_path: str = DUMP_PATH):
+        """
+        Initialize engine.
+
+        Args:
+            serial: adb serial (None for the only connected device)
+            adb: adb executable
+            cache: Tap target cache (default: the shared on-disk cache)
+            dump_path: Device path the hierarchy is dumped to
+        """
+        self.serial = serial
+        self.dump_path = dump_path
+        self.shell = AdbShell(serial, adb)
+        self.cache = cache or TapCache()
+        self._resolution: Optional[str] = None
+        self.round_trips = 0
+
+    @classmethod
+    def for_device(cls, serial: Optional[str] = None) -> "UiAutomatorEngine":
+        """Engine shared by all callers for a device; its shell is stopped at exit."""
+        with cls._engines_lock:
+            engine = cls._engines.get(serial)
+            if engine is None:
+                engine = cls._engines[serial] = cls(serial)
+                atexit.register(engine.close)
+            return engine
+
+    def resolution(self) -> str:
+        """Screen resolution such as "1080x2400" (override size if set)."""
+        if self._resolution is None:
+            _, output = self._run("wm size", timeout=5)
+            sizes = dict(SIZE_PATTERN.findall(output.decode(errors="replace")))
+            self._resolution = sizes.get("Override") or sizes.get("Physical") or "unknown"
+        return self._resolution
+
+    def _run(self, command: str, timeout: float) -> Tuple[int, bytes]:
+        self.round_trips += 1
+        return self.shell.run(command, timeout)
+
+    def _stream(self, command: str, timeout: float) -> Iterator[bytes]:
+        self.round_trips += 1
+        return self.shell.stream(command, timeout)
+
+    def dump(self, timeout: float = 10) -> UiHierarchy:
+        """Dump and index the current UI hierarchy (one round trip)."""
+        return parse_hierarchy(self._stream(self._dump_command(f"cat {self.dump_path}"), timeout))
+
+    def _dump_command(self, then: str) -> str:
+        return f"uiautomator dump {self.dump_path} >/dev/null 2>&1 && {then}"
+
+    def tap(self, x: int, y: int, timeout: float = 5) -> bool:
+        """Tap screen coordinates."""
+        status, _ = self._run(f"input tap {x} {y}", timeout)
+        return status == 0
+
+    def _try_cached(self, cached: UiNode, timeout: float) -> Tuple[bool, Optional[UiHierarchy]]:
+        """Confirm and tap a cached node in one round trip; returns the dump if it was not there."""
+        x, y = cached.center
+        command = self._dump_command(
+            f"if grep -qE {shlex.quote(_grep_pattern(cached))} {self.dump_path}; "
+            f"then input tap {x} {y} && echo {TAPPED.decode()}; else cat {self.dump_path}; fi"
+        )
+        chunks = self._stream(command, timeout)
+        head = b""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= len(TAPPED):
+                break
+        if head.startswith(TAPPED):
+            for _ in chunks:
+                pass
+            return True, None
+        return False, parse_hierarchy(chain([head], chunks))
+
+    def find_and_tap(self, text: Union[str, Pattern, None] = None, resource_id: Optional[str] = None,
+                     timeout: float = 0, command_timeout: float = 10) -> Optional[UiNode]:
+        """
+        Tap the center of the first node matching text/resource_id.
+
+        Polls the hierarchy until the node appears or `timeout` expires
+        (timeout=0 checks once), without a fixed initial wait.
+
+        Args:
+            text: Exact text, or a compiled pattern searched in text and content-desc
+            resource_id: Exact resource-id
+            timeout: Seconds to wait for the node to appear
+            command_timeout: Maximum time for one dump in seconds
+
+        Returns:
+            The tapped node, or None if it did not appear
+        """
+        resolution = self.resolution()
+        query = _query_key(text, resource_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            cached = self.cache.get(resolution, query)
+            if cached and _grep_pattern(cached):
+                tapped, hierarchy = self._try_cached(cached, command_timeout)
+                if tapped:
+                    logger.debug(f"Tapped cached {query} at {cached.center} ({resolution})")
+                    return cached
+            else:
+                hierarchy = self.dump(command_timeout)
+
+            node = hierarchy.find(text, resource_id) if hierarchy is not None else None
+            if node is not None:
+                if not self.tap(*node.center):
+                    raise RuntimeError(f"adb tap at {node.center} failed")
+                if hierarchy.rotation == 0 and _grep_pattern(node):
+                    self.cache.put(resolution, query, node)
+                logger.debug(f"Tapped {query} at {node.center} ({len(hierarchy)} nodes indexed)")
+                return node
+            if time.monotonic() + RETRY_INTERVAL > deadline:
+                return None
+            time.sleep(RETRY_INTERVAL)
+
+    def close(self) -> None:
+        """Stop the device's adb shell."""
+        self.shell.close()
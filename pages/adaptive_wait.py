@@ -0,0 +1,230 @@
+"""
+Adaptive polling waits with per-locator latency learning.
+AdaptiveWait polls quickly at first and backs off later, so fast elements
+are picked up within tens of milliseconds. LocatorLatencyStore records how
+long each locator took to appear (or become clickable/visible, kept
+apart), persists it across runs and derives p99-based timeouts from it.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
+import json
+import logging
+import math
+import os
+import time
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from config.config import CACHE_DIR
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+INITIAL_POLL = 0.05
+MAX_POLL = 0.5
+BACKOFF = 1.6
+
+PRESENT = "present"
+CLICKABLE = "clickable"
+VISIBLE = "visible"
+
+
+class AdaptiveWait:
+    """Explicit wait with a short initial poll interval and exponential backoff."""
+
+    def __init__(self, driver, timeout: float, initial_poll: float = INITIAL_POLL,
+                 max_poll: float = MAX_POLL, backoff: float = BACKOFF,
+                 ignored_exceptions: Sequence[Type[Exception]] = (NoSuchElementException,)):
+        """
+        Initialize adaptive wait.
+
+        Args:
+            driver: WebDriver instance passed to the condition
+            timeout: Maximum wait time in seconds
+            initial_poll: First poll interval in seconds
+            max_poll: Poll interval ceiling in seconds
+            backoff: Factor applied to the interval after each poll
+            ignored_exceptions: Exceptions treated as "not yet"
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.ignored_exceptions = tuple(ignored_exceptions)
+        self.polls = 0
+
+    def until(self, method: Callable[..., T], message: str = "") -> T:
+        """
+        Poll `method(driver)` until it returns a truthy value.
+
+        Args:
+            method: Condition such as an expected_conditions callable
+            message: Message for the TimeoutException
+
+        Returns:
+            The truthy value returned by the condition
+
+        Raises:
+            TimeoutException: If the condition is not met within the timeout
+        """
+        end = time.monotonic() + self.timeout
+        interval = self.initial_poll
+        screen = stacktrace = None
+        while True:
+            self.polls += 1
+            try:
+                value = method(self.driver)
+                if value:
+                    return value
+            except self.ignored_exceptions as exc:
+                screen = getattr(exc, "screen", None)
+                stacktrace = getattr(exc, "stacktrace", None)
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll)
+        raise TimeoutException(message, screen, stacktrace)
+
+
+def locator_key(locator: Tuple[str, str], condition: str = PRESENT) -> str:
+    """Stable string key for a locator and the condition waited for."""
+    by, value = locator
+    key = f"{by}={value}"
+    return key if condition == PRESENT else f"{condition}:{key}"
+
+
+class LocatorLatencyStore:
+    """Per-locator appearance latencies, persisted to a JSON file."""
+
+    def __init__(self, path: Optional[str] = None, max_samples: int = 50,
+                 min_samples: int = 5, recent_window: int = 10):
+        """
+        Initialize latency store.
+
+        Args:
+            path: JSON file holding the samples (default: in the local cache dir)
+            max_samples: Samples kept per locator (most recent)
+            min_samples: Samples needed before a timeout is suggested
+            recent_window: Number of latest outcomes checked for timeouts
+        """
+        self.path = path or os.path.join(CACHE_DIR, "locator_latency.json")
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self.recent_window = recent_window
+        self._data: Dict[str, dict] = self._load()
+        self._pending: Dict[str, dict] = {}
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, locator: Tuple[str, str], seconds: Optional[float], condition: str = PRESENT) -> None:
+        """
+        Record one wait outcome.
+
+        Args:
+            locator: Tuple of (By, locator_string)
+            seconds: Time until the condition was met, None if the wait timed out
+            condition: Condition waited for (PRESENT, CLICKABLE, VISIBLE)
+        """
+        key = locator_key(locator, condition)
+        for store in (self._data, self._pending):
+            entry = store.setdefault(key, {"samples": [], "timeouts": 0})
+            if seconds is None:
+                entry["timeouts"] += 1
+            else:
+                entry["samples"].append(round(seconds, 3))
+                del entry["samples"][:-self.max_samples]
+            recent = entry.setdefault("recent", [])
+            recent.append(1 if seconds is None else 0)
+            del recent[:-self.recent_window]
+
+    def samples(self, locator: Tuple[str, str], condition: str = PRESENT) -> List[float]:
+        """Recorded latencies for a locator and condition, oldest first."""
+        return list(self._data.get(locator_key(locator, condition), {}).get("samples", []))
+
+    def recent_timeouts(self, locator: Tuple[str, str], condition: str = PRESENT) -> int:
+        """Number of timeouts among the latest recent_window outcomes."""
+        return sum(self._data.get(locator_key(locator, condition), {}).get("recent", []))
+
+    def p99(self, locator: Tuple[str, str], condition: str = PRESENT) -> Optional[float]:
+        """
+        99th percentile latency (nearest rank).
+
+        Returns:
+            Seconds, or None if there are fewer than min_samples samples
+        """
+        return self._p99(locator_key(locator, condition))
+
+    def _p99(self, key: str) -> Optional[float]:
+        samples = sorted(self._data.get(key, {}).get("samples", []))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[math.ceil(0.99 * len(samples)) - 1]
+
+    def suggested_timeout(self, locator: Tuple[str, str], default: float,
+                          margin: float = 2.0, floor: float = 1.0, condition: str = PRESENT) -> float:
+        """
+        Suggest a timeout for a locator from its p99 latency.
+
+        A wait capped at the learned timeout records a slow appearance as a
+        timeout, never as a sample, so the p99 alone could only shrink. Any
+        timeout among the recent outcomes therefore falls back to `default`
+        until the locator has again met the condition recent_window times.
+
+        Args:
+            locator: Tuple of (By, locator_string)
+            default: Timeout to use when there is not enough data or recent timeouts
+            margin: Multiplier applied to the p99 latency
+            floor: Minimum suggested timeout in seconds
+            condition: Condition waited for (PRESENT, CLICKABLE, VISIBLE)
+
+        Returns:
+            Suggested timeout in seconds, never above `default`
+        """
+        return self._suggested(locator_key(locator, condition), default, margin, floor)
+
+    def _suggested(self, key: str, default: float, margin: float = 2.0, floor: float = 1.0) -> float:
+        p99 = self._p99(key)
+        if p99 is None or sum(self._data[key].get("recent", [])):
+            return default
+        return min(max(p99 * margin, floor), default)
+
+    def suggestions(self, default: float) -> Dict[str, Tuple[float, float]]:
+        """
+        Suggested timeouts for all locators with enough samples.
+
+        Returns:
+            Mapping of key (see locator_key) -> (p99 seconds, suggested timeout)
+        """
+        result = {}
+        for key in self._data:
+            p99 = self._p99(key)
+            if p99 is not None:
+                result[key] = (p99, self._suggested(key, default))
+        return result
+
+    def flush(self) -> None:
+        """Merge this process's new samples into the file (safe across xdist workers)."""
+        if not self._pending:
+            return
+        with file_lock(self.path + ".lock"):
+            merged = self._load()
+            for key, entry in self._pending.items():
+                target = merged.setdefault(key, {"samples": [], "timeouts": 0})
+                target["samples"] = (target["samples"] + entry["samples"])[-self.max_samples:]
+                target["timeouts"] += entry["timeouts"]
+                target["recent"] = (target.get("recent", []) + entry.get("recent", []))[-self.recent_window:]
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(merged, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        self._data = merged
+        self._pending = {}
@@ -1,22 +1,89 @@
 """Base Page Object Model class."""
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+)
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.actions.action_builder import ActionBuilder
 from selenium.webdriver.common.actions import interaction
 from selenium.webdriver.common.actions.pointer_input import PointerInput
-from typing import Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Any, Union
 import logging
 import time
+import weakref
+
+from config.config import BrowserConfig
+from drivers.implicit_wait import ImplicitWaitManager
+from drivers.session_state import add_document_script, has_document_script, track_origin
+from pages.adaptive_wait import CLICKABLE, PRESENT, VISIBLE, AdaptiveWait, LocatorLatencyStore
+from pages.navigation_timing import PAGE_LOAD_SCRIPT, NavigationTiming
+from pages.screenshots import screenshot_service
+from pages.storage_state import (
+    EXPORT_STORAGE_SCRIPT,
+    IMPORT_STORAGE_SCRIPT,
+    StorageState,
+    StorageStateStore,
+    origin_of,
+)
+from pages.web_vitals import WebVitals, WebVitalsCollector
+from pages.wait_scripts import DOM_STABLE_SCRIPT, NETWORK_IDLE_SCRIPT, NETWORK_TRACKER_SCRIPT
+from pages.dom_query import (
+    DomQuery,
+    ElementSnapshot,
+    BULK_QUERY_SCRIPT,
+    SCROLL_UNTIL_SCRIPT,
+    build_payload,
+    parse_results,
+    to_js_locator,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class BasePage:
-    """Base class for all page objects."""
+    """
+    Base class for all page objects.
+    
+    Elements resolved by find_element are cached per locator for the page
+    instance. The cache is cleared by navigation through this page
+    (navigate_to, refresh, go_back, go_forward), and a cached element is
+    checked for staleness before it is returned, which is how navigation
+    elsewhere (driver.get, links, form submits) and re-renders are detected.
+    
+    Locator waits use AdaptiveWait (short first polls, then backoff). When a
+    latency store is attached, every wait's outcome is recorded per locator,
+    and with apply_learned_timeouts the p99-based timeout replaces the
+    default one for locators that have enough samples.
+    
+    The driver's implicit wait is zeroed while an explicit wait polls, so
+    every poll answers immediately and a wait never outlasts its timeout.
+    count, is_present and is_absent answer in a single lookup without
+    waiting at all.
+    
+    When a storage state store is attached, navigate_to re-injects the
+    saved cookies and web storage of the target origin into a session
+    before its first visit there (see save_storage_state).
+    """
+    
+    latency_store: Optional[LocatorLatencyStore] = None
+    apply_learned_timeouts: bool = False
+    
+    storage_states: Optional[StorageStateStore] = None
+    
+    # Origins whose saved storage state was restored, per driver
+    _restored_origins: "weakref.WeakKeyDictionary[WebDriver, set]" = weakref.WeakKeyDictionary()
+    # Script timeout in seconds, per driver (bounds the in-page async waits)
+    _script_timeouts: "weakref.WeakKeyDictionary[WebDriver, float]" = weakref.WeakKeyDictionary()
+    
+    # Window size per driver, shared by all page objects of the session
+    _window_sizes: "weakref.WeakKeyDictionary[WebDriver, Dict[str, int]]" = weakref.WeakKeyDictionary()
     
     def __init__(self, driver: WebDriver, timeout: int = 10):
         """
@@ -28,14 +95,24 @@ class BasePage:
         """
         self.driver = driver
         self.timeout = timeout
+        self.implicit_waits = ImplicitWaitManager.for_driver(driver)
+        self._element_cache: Dict[Tuple[str, str], WebElement] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
     
-    def find_element(self, locator: Tuple[str, str], timeout: Optional[int] = None):
+    def find_element(self, locator: Tuple[str, str], timeout: Optional[int] = None,
+                     use_cache: bool = True):
         """
         Find element with explicit wait.
         
+        A cached element is checked for staleness before it is returned,
+        since callers outside the page object do not recover from it.
+        
         Args:
             locator: Tuple of (By, locator_string)
             timeout: Optional custom timeout
+            use_cache: Return the cached element for this locator if present
             
         Returns:
             WebElement if found
@@ -43,16 +120,143 @@ class BasePage:
         Raises:
             TimeoutException: If element not found within timeout
         """
-        wait_time = timeout or self.timeout
-        wait = WebDriverWait(self.driver, wait_time)
+        return self._find(locator, timeout, use_cache, validate=True)
+    
+    def _find(self, locator: Tuple[str, str], timeout: Optional[int] = None,
+              use_cache: bool = True, validate: bool = False) -> WebElement:
+        """find_element, trusting cached elements unless validate is set."""
+        locator = tuple(locator)
+        if use_cache:
+            element = self._cached_element(locator, validate)
+            if element is not None:
+                return element
+        
+        wait_time = self._timeout_for(locator, timeout)
         try:
-            element = wait.until(EC.presence_of_element_located(locator))
+            element = self._wait_until(EC.presence_of_element_located(locator), locator, wait_time)
             logger.debug(f"Element found: {locator}")
+            self._element_cache[locator] = element
             return element
         except TimeoutException:
             logger.error(f"Element not found within {wait_time}s: {locator}")
             raise
     
+    def _timeout_for(self, locator: Tuple[str, str], timeout: Optional[float],
+                     kind: str = PRESENT) -> float:
+        """Explicit timeout, else the learned per-locator timeout if enabled, else the default."""
+        if timeout is not None:
+            return timeout
+        if self.apply_learned_timeouts and self.latency_store is not None:
+            return self.latency_store.suggested_timeout(locator, self.timeout, condition=kind)
+        return self.timeout
+    
+    def _wait_until(self, condition: Callable[[WebDriver], Any], locator: Tuple[str, str],
+                    wait_time: float, record: bool = True, kind: str = PRESENT) -> Any:
+        """
+        Wait for a condition with AdaptiveWait, recording the locator's latency.
+        
+        The implicit wait is suspended meanwhile, so each poll returns at once.
+        
+        Args:
+            condition: Condition such as an expected_conditions callable
+            locator: Locator the condition waits for
+            wait_time: Maximum wait time in seconds
+            record: Record the outcome in the latency store
+            kind: What the condition waits for (PRESENT, CLICKABLE, VISIBLE),
+                recorded separately per locator
+            
+        Returns:
+            The condition's truthy result
+            
+        Raises:
+            TimeoutException: If the condition is not met within wait_time
+        """
+        start = time.monotonic()
+        try:
+            with self.implicit_waits.suspended():
+                result = AdaptiveWait(self.driver, wait_time).until(condition)
+        except TimeoutException:
+            if record and self.latency_store is not None:
+                self.latency_store.record(locator, None, kind)
+            raise
+        if record and self.latency_store is not None:
+            self.latency_store.record(locator, time.monotonic() - start, kind)
+        return result
+    
+    def _cached_element(self, locator: Tuple[str, str], validate: bool = False) -> Optional[WebElement]:
+        """
+        Return the cached element for a locator, counting hits and misses.
+        
+        Internal callers (_with_element, click) use the element as is and
+        re-find it when the action raises StaleElementReferenceException, so
+        a hit costs no extra command. With validate the element is first
+        checked with one cheap call and dropped if stale (new document or a
+        re-render detached the node), for elements handed to outside callers.
+        """
+        locator = tuple(locator)
+        element = self._element_cache.get(locator)
+        if element is not None and validate:
+            try:
+                element.is_enabled()
+            except StaleElementReferenceException:
+                logger.debug(f"Cached element stale, dropping: {locator}")
+                self.invalidate_cache(locator)
+                element = None
+        if element is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            logger.debug(f"Element cache hit: {locator}")
+        return element
+    
+    def invalidate_cache(self, locator: Optional[Tuple[str, str]] = None):
+        """
+        Drop cached elements.
+        
+        Args:
+            locator: Locator to drop (default: the whole cache)
+        """
+        if locator is None:
+            self.cache_invalidations += len(self._element_cache)
+            self._element_cache.clear()
+        elif self._element_cache.pop(tuple(locator), None) is not None:
+            self.cache_invalidations += 1
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get element cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, invalidations and current size
+        """
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "invalidations": self.cache_invalidations,
+            "size": len(self._element_cache),
+        }
+    
+    def _with_element(self, locator: Tuple[str, str], action: Callable[[WebElement], Any],
+                      timeout: Optional[int] = None) -> Any:
+        """
+        Run an action on the (possibly cached) element, re-finding it once if stale.
+        
+        Args:
+            locator: Tuple of (By, locator_string)
+            action: Callable receiving the WebElement
+            timeout: Optional custom timeout
+            
+        Returns:
+            Result of the action
+        """
+        element = self._find(locator, timeout)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            logger.debug(f"Cached element stale, re-finding: {locator}")
+            self.invalidate_cache(locator)
+            return action(self._find(locator, timeout))
+    
     def find_elements(self, locator: Tuple[str, str], timeout: Optional[int] = None):
         """
         Find multiple elements with explicit wait.
@@ -64,10 +268,10 @@ class BasePage:
         Returns:
             List of WebElements
         """
-        wait_time = timeout or self.timeout
-        wait = WebDriverWait(self.driver, wait_time)
+        locator = tuple(locator)
+        wait_time = self._timeout_for(locator, timeout)
         try:
-            elements = wait.until(EC.presence_of_all_elements_located(locator))
+            elements = self._wait_until(EC.presence_of_all_elements_located(locator), locator, wait_time)
             logger.debug(f"Found {len(elements)} elements: {locator}")
             return elements
         except TimeoutException:
@@ -82,9 +286,21 @@ class BasePage:
             locator: Tuple of (By, locator_string)
             timeout: Optional custom timeout
         """
-        wait_time = timeout or self.timeout
-        wait = WebDriverWait(self.driver, wait_time)
-        element = wait.until(EC.element_to_be_clickable(locator))
+        locator = tuple(locator)
+        element = self._cached_element(locator)
+        if element is not None:
+            try:
+                element.click()
+                logger.debug(f"Clicked cached element: {locator}")
+                return
+            except StaleElementReferenceException:
+                self.invalidate_cache(locator)
+            except (ElementNotInteractableException, ElementClickInterceptedException):
+                pass  # Not clickable yet, wait for it below
+        
+        wait_time = self._timeout_for(locator, timeout, CLICKABLE)
+        element = self._wait_until(EC.element_to_be_clickable(locator), locator, wait_time, kind=CLICKABLE)
+        self._element_cache[locator] = element
         element.click()
         logger.debug(f"Clicked element: {locator}")
     
@@ -97,9 +313,11 @@ class BasePage:
             text: Text to send
             timeout: Optional custom timeout
         """
-        element = self.find_element(locator, timeout)
-        element.clear()
-        element.send_keys(text)
+        def clear_and_type(element):
+            element.clear()
+            element.send_keys(text)
+        
+        self._with_element(locator, clear_and_type, timeout)
         logger.debug(f"Sent keys to element: {locator}")
     
     def get_text(self, locator: Tuple[str, str], timeout: Optional[int] = None) -> str:
@@ -113,8 +331,7 @@ class BasePage:
         Returns:
             Text content of element
         """
-        element = self.find_element(locator, timeout)
-        text = element.text
+        text = self._with_element(locator, lambda element: element.text, timeout)
         logger.debug(f"Got text from element {locator}: {text}")
         return text
     
@@ -129,14 +346,78 @@ class BasePage:
         Returns:
             True if visible, False otherwise
         """
+        locator = tuple(locator)
         try:
-            wait_time = timeout or self.timeout
-            wait = WebDriverWait(self.driver, wait_time)
-            wait.until(EC.visibility_of_element_located(locator))
+            self._wait_until(EC.visibility_of_element_located(locator), locator,
+                             self._timeout_for(locator, timeout, VISIBLE), kind=VISIBLE)
             return True
         except TimeoutException:
             return False
     
+    def count(self, locator: Tuple[str, str]) -> int:
+        """
+        Count matching elements right now, without any wait.
+        
+        Args:
+            locator: Tuple of (By, locator_string)
+            
+        Returns:
+            Number of matching elements
+        """
+        with self.implicit_waits.suspended():
+            return len(self.driver.find_elements(*locator))
+    
+    def is_present(self, locator: Tuple[str, str]) -> bool:
+        """
+        Check if at least one element matches right now, without any wait.
+        
+        Args:
+            locator: Tuple of (By, locator_string)
+            
+        Returns:
+            True if present, False otherwise
+        """
+        return self.count(locator) > 0
+    
+    def is_absent(self, locator: Tuple[str, str]) -> bool:
+        """
+        Check that no element matches right now, without any wait.
+        
+        Args:
+            locator: Tuple of (By, locator_string)
+            
+        Returns:
+            True if absent, False otherwise
+        """
+        return self.count(locator) == 0
+    
+    def wait_for_any(self, locators: List[Tuple[str, str]],
+                     timeout: Optional[int] = None) -> Optional[Tuple[str, str]]:
+        """
+        Wait until any of several locators matches an element.
+        
+        Args:
+            locators: Locators to check, in order of preference
+            timeout: Optional custom timeout
+            
+        Returns:
+            The first locator that matched, or None on timeout
+        """
+        locators = [tuple(locator) for locator in locators]
+        
+        def first_present(driver):
+            for locator in locators:
+                if driver.find_elements(*locator):
+                    return locator
+            return None
+        
+        wait_time = self.timeout if timeout is None else timeout
+        try:
+            return self._wait_until(first_present, locators[0], wait_time, record=False)
+        except TimeoutException:
+            logger.debug(f"None of {locators} found within {wait_time}s")
+            return None
+    
     def wait_for_element_to_disappear(self, locator: Tuple[str, str], timeout: Optional[int] = None):
         """
         Wait for element to disappear.
@@ -145,9 +426,10 @@ class BasePage:
             locator: Tuple of (By, locator_string)
             timeout: Optional custom timeout
         """
-        wait_time = timeout or self.timeout
-        wait = WebDriverWait(self.driver, wait_time)
-        wait.until(EC.invisibility_of_element_located(locator))
+        # Disappearance time says nothing about how fast the locator appears
+        wait_time = self.timeout if timeout is None else timeout
+        self._wait_until(EC.invisibility_of_element_located(locator), tuple(locator),
+                         wait_time, record=False)
         logger.debug(f"Element disappeared: {locator}")
     
     def scroll_to_element(self, locator: Tuple[str, str]):
@@ -157,8 +439,10 @@ class BasePage:
         Args:
             locator: Tuple of (By, locator_string)
         """
-        element = self.find_element(locator)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        self._with_element(
+            locator,
+            lambda element: self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        )
         logger.debug(f"Scrolled to element: {locator}")
     
     def swipe_up(self, duration: int = 300):
@@ -168,7 +452,7 @@ class BasePage:
         Args:
             duration: Duration of swipe in milliseconds
         """
-        size = self.driver.get_window_size()
+        size = self.window_size()
         start_x = size['width'] // 2
         start_y = size['height'] * 0.7
         end_y = size['height'] * 0.3
@@ -183,7 +467,7 @@ class BasePage:
         Args:
             duration: Duration of swipe in milliseconds
         """
-        size = self.driver.get_window_size()
+        size = self.window_size()
         start_x = size['width'] // 2
         start_y = size['height'] * 0.3
         end_y = size['height'] * 0.7
@@ -198,7 +482,7 @@ class BasePage:
         Args:
             duration: Duration of swipe in milliseconds
         """
-        size = self.driver.get_window_size()
+        size = self.window_size()
         start_x = size['width'] * 0.7
         start_y = size['height'] // 2
         end_x = size['width'] * 0.3
@@ -213,7 +497,7 @@ class BasePage:
         Args:
             duration: Duration of swipe in milliseconds
         """
-        size = self.driver.get_window_size()
+        size = self.window_size()
         start_x = size['width'] * 0.3
         start_y = size['height'] // 2
         end_x = size['width'] * 0.7
@@ -221,6 +505,94 @@ class BasePage:
         self._swipe(int(start_x), start_y, int(end_x), start_y, duration)
         logger.debug("Performed swipe right")
     
+    def window_size(self) -> Dict[str, int]:
+        """
+        Get the window size, fetched once per driver session.
+        
+        Returns:
+            Dictionary with width and height
+        """
+        size = self._window_sizes.get(self.driver)
+        if size is None:
+            size = self._window_sizes[self.driver] = self.driver.get_window_size()
+        return size
+    
+    def invalidate_viewport(self):
+        """Forget the cached window size (e.g. after a rotation or resize)."""
+        self._window_sizes.pop(self.driver, None)
+    
+    def _is_native_context(self) -> bool:
+        """True if an Appium driver is in the NATIVE_APP context."""
+        try:
+            return getattr(self.driver, "current_context", None) == "NATIVE_APP"
+        except Exception:
+            return False
+    
+    def scroll_until(self, locator: Tuple[str, str], max_scrolls: int = 10,
+                     direction: str = "down") -> Optional[WebElement]:
+        """
+        Scroll until an element is in the viewport.
+        
+        In web contexts each step is one execute_script call that checks for
+        the target, scrolls it into view if it exists (or scrolls the page by
+        most of a viewport if it does not yet) and checks again. Scrolling
+        stops once the target is in view or the page stops moving. In native
+        contexts each step is a touch swipe using the cached window size,
+        followed by an immediate presence check.
+        
+        Args:
+            locator: Tuple of (By, locator_string)
+            max_scrolls: Maximum number of scroll steps
+            direction: "down" or "up"
+            
+        Returns:
+            The element in view, or None if it was not reached
+        """
+        if direction not in ("down", "up"):
+            raise ValueError(f"Unsupported scroll direction: {direction}")
+        locator = tuple(locator)
+        if self._is_native_context():
+            element = self._swipe_until(locator, max_scrolls, direction)
+        else:
+            element = self._js_scroll_until(locator, max_scrolls, direction)
+        if element is None:
+            logger.debug(f"Element not in view after {max_scrolls} scrolls: {locator}")
+            return None
+        self._element_cache[locator] = element
+        return element
+    
+    def _js_scroll_until(self, locator: Tuple[str, str], max_scrolls: int,
+                         direction: str) -> Optional[WebElement]:
+        using, value = to_js_locator(locator)
+        step = 0.8 if direction == "down" else -0.8
+        ends = 0
+        for scroll in range(max_scrolls + 1):
+            # The last call only checks (and scrolls the target into view if it exists)
+            result = self.driver.execute_script(
+                SCROLL_UNTIL_SCRIPT, using, value, step if scroll < max_scrolls else 0
+            )
+            if result["found"]:
+                logger.debug(f"Element in view after {scroll} scrolls: {locator}")
+                return result["element"]
+            # Give infinite lists one more step to load before giving up
+            ends = ends + 1 if result["atEnd"] else 0
+            if ends >= 2:
+                break
+        return None
+    
+    def _swipe_until(self, locator: Tuple[str, str], max_scrolls: int,
+                     direction: str) -> Optional[WebElement]:
+        swipe = self.swipe_up if direction == "down" else self.swipe_down
+        for scroll in range(max_scrolls + 1):
+            if scroll:
+                swipe()
+            with self.implicit_waits.suspended():
+                elements = self.driver.find_elements(*locator)
+            if elements and elements[0].is_displayed():
+                logger.debug(f"Element in view after {scroll} swipes: {locator}")
+                return elements[0]
+        return None
+    
     def _swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int):
         """
         Perform swipe gesture using Actions API.
@@ -248,9 +620,7 @@ class BasePage:
         Args:
             locator: Tuple of (By, locator_string)
         """
-        element = self.find_element(locator)
-        actions = ActionChains(self.driver)
-        actions.click(element).perform()
+        self._with_element(locator, lambda element: ActionChains(self.driver).click(element).perform())
         logger.debug(f"Tapped element: {locator}")
     
     def long_press(self, locator: Tuple[str, str], duration: int = 1000):
@@ -261,21 +631,13 @@ class BasePage:
             locator: Tuple of (By, locator_string)
             duration: Duration in milliseconds
         """
-        element = self.find_element(locator)
-        actions = ActionChains(self.driver)
-        actions.click_and_hold(element).pause(duration / 1000).release().perform()
+        self._with_element(
+            locator,
+            lambda element: ActionChains(self.driver).click_and_hold(element)
+            .pause(duration / 1000).release().perform()
+        )
         logger.debug(f"Long pressed element: {locator} for {duration}ms")
     
-    def take_screenshot(self, filename: str):
-        """
-        Take screenshot.
-        
-        Args:
-            filename: Path to save screenshot
-        """
-        self.driver.save_screenshot(filename)
-        logger.info(f"Screenshot saved: {filename}")
-    
     def get_current_url(self) -> str:
         """Get current URL."""
         return self.driver.current_url
@@ -291,81 +653,323 @@ class BasePage:
         Args:
             url: URL to navigate to
         """
+        self.invalidate_cache()
+        if self.storage_states is not None:
+            self._restore_saved_state(url)
+        collector = WebVitalsCollector.for_driver(self.driver)
+        if collector:
+            collector.install()  # Registers the observers for the new document on Chrome
+        if not has_document_script(self.driver, "network_tracker"):
+            # Counts requests made while the page loads for later network idle waits
+            self._register_network_tracker()
+        track_origin(self.driver, url)
         self.driver.get(url)
         logger.info(f"Navigated to: {url}")
     
+    def _restore_saved_state(self, url: str):
+        """Restore the saved state of url's origin unless this session already has it."""
+        origin = origin_of(url)
+        try:
+            fresh = not self.driver.current_url.startswith("http")  # New or reset session
+        except Exception:
+            fresh = True
+        restored = self._restored_origins.setdefault(self.driver, set())
+        if origin in restored and not fresh:
+            return
+        state = self.storage_states.load(url)
+        if state is not None:
+            self.restore_storage_state(state)
+    
+    def storage_state_restored(self, url: Optional[str] = None) -> bool:
+        """
+        Whether a saved storage state was restored for the origin in this session.
+        
+        Args:
+            url: URL of the origin (default: the current URL)
+        """
+        origin = origin_of(url or self.driver.current_url)
+        return origin in self._restored_origins.get(self.driver, set())
+    
+    def export_storage_state(self) -> StorageState:
+        """
+        Read cookies, localStorage and sessionStorage of the current document.
+        
+        Returns:
+            StorageState of the current origin
+        """
+        storage = self.driver.execute_script(EXPORT_STORAGE_SCRIPT) or {}
+        return StorageState(
+            origin=storage.get("origin") or origin_of(self.driver.current_url),
+            cookies=self.driver.get_cookies(),
+            local_storage=storage.get("local", {}),
+            session_storage=storage.get("session", {}),
+        )
+    
+    def save_storage_state(self) -> Optional[str]:
+        """
+        Save the current origin's storage state for later sessions.
+        
+        Call once onboarding/popups have been dismissed; later sessions on the
+        same device preset start with that state.
+        
+        Returns:
+            Path of the saved state, or None if no store is attached
+        """
+        if self.storage_states is None:
+            return None
+        state = self.export_storage_state()
+        self._restored_origins.setdefault(self.driver, set()).add(state.origin)
+        return self.storage_states.save(state)
+    
+    def restore_storage_state(self, state: StorageState):
+        """
+        Inject a storage state into the session.
+        
+        On Chrome the cookies are set through DevTools and web storage is
+        seeded into the origin's next document before its scripts run, so no
+        extra navigation is needed. Other drivers first load the origin's
+        robots.txt to get a same-origin document to write into.
+        
+        Args:
+            state: StorageState to inject
+        """
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": state.cdp_cookies()})
+            add_document_script(self.driver, "storage_seed", state.seed_script())
+        else:
+            self.driver.get(state.origin + "/robots.txt")
+            for cookie in state.live_cookies():
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception as e:
+                    logger.debug(f"Could not restore cookie {cookie.get('name')}: {e}")
+            self.driver.execute_script(IMPORT_STORAGE_SCRIPT, state.local_storage, state.session_storage)
+        self._restored_origins.setdefault(self.driver, set()).add(state.origin)
+        logger.info(f"Storage state restored for {state.origin} ({len(state.live_cookies())} cookies)")
+    
     def refresh(self):
         """Refresh current page."""
+        self.invalidate_cache()
         self.driver.refresh()
         logger.debug("Page refreshed")
     
     def go_back(self):
         """Navigate back."""
+        self.invalidate_cache()
         self.driver.back()
         logger.debug("Navigated back")
     
     def go_forward(self):
         """Navigate forward."""
+        self.invalidate_cache()
         self.driver.forward()
         logger.debug("Navigated forward")
     
-    def take_screenshot(self, filename: str = None, directory: str = "screenshots") -> str:
+    def take_screenshot(self, filename: str = None, directory: str = "screenshots",
+                        locator: Optional[Tuple[str, str]] = None) -> str:
         """
         Take a screenshot and save to file.
         
+        Only the capture happens on the calling thread; the file is encoded
+        and written in the background by the shared ScreenshotService.
+        A frame identical to the previous one is not written again.
+        
         Args:
             filename: Filename for screenshot (default: auto-generated with timestamp)
             directory: Directory to save screenshot (default: "screenshots")
+            locator: Capture only this element instead of the viewport
             
         Returns:
-            Full path to saved screenshot
+            Full path of the screenshot (written once pending writes are flushed)
             
         Example:
             page.take_screenshot("my_screenshot.png")
             page.take_screenshot()  # Auto-generated name
+            page.take_screenshot("player.png", locator=(By.TAG_NAME, "video"))
         """
-        import os
-        from datetime import datetime
+        if locator is None:
+            filepath = screenshot_service().capture(self.driver, filename, directory)
+        else:
+            filepath = self._with_element(
+                locator, lambda element: screenshot_service().capture(element, filename, directory)
+            )
+        print(f"📸 Screenshot saved: {filepath}")
+        return filepath
+    
+    def wait_for_page_load(self, timeout: int = 30) -> Optional[NavigationTiming]:
+        """
+        Wait for page to fully load and return its navigation timing.
         
-        # Create directory if it doesn't exist
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            logger.info(f"Created directory: {directory}")
+        Blocks on the document's load event inside the page (one async
+        script call) instead of polling document.readyState, then reads the
+        PerformanceNavigationTiming entry in the same call.
         
-        # Generate filename if not provided
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
+        Args:
+            timeout: Maximum wait time in seconds (capped one second below
+                the driver's script timeout)
+            
+        Returns:
+            NavigationTiming (complete=False if the load event did not fire
+            in time), or None if async scripts are unavailable
+        """
+        timeout = self._wait_bound(timeout)
+        result = self._execute_bounded_async(PAGE_LOAD_SCRIPT, timeout, int(timeout * 1000))
+        timing = NavigationTiming.from_script(result) if result else None
+        if timing and timing.complete:
+            logger.debug(f"Page loaded: {timing.url} ({timing.summary()})")
+            print(f"✓ Page loaded: {timing.summary()}")
+        elif timing:
+            logger.warning(f"Page did not finish loading within {timeout}s: {timing.url}")
+        return timing
+    
+    def mark_step(self, name: str) -> Optional[WebVitals]:
+        """
+        Harvest Web Vitals at the end of a flow step.
         
-        # Ensure .png extension
-        if not filename.endswith('.png'):
-            filename += '.png'
+        A no-op unless collection was enabled for the driver
+        (WebVitalsCollector.enable, e.g. through the web_vitals fixture).
         
-        # Full path
-        filepath = os.path.join(directory, filename)
+        Args:
+            name: Step name used in reports and budget failures
+            
+        Returns:
+            WebVitals of the current document, or None if not collecting
+        """
+        collector = WebVitalsCollector.for_driver(self.driver)
+        return collector.harvest(name) if collector else None
+    
+    def _wait_bound(self, timeout: float) -> float:
+        """
+        Cap an in-page wait one second below the driver's script timeout.
         
-        # Take screenshot
-        self.driver.save_screenshot(filepath)
-        logger.info(f"Screenshot saved: {filepath}")
-        print(f"📸 Screenshot saved: {filepath}")
+        The script then always resolves with its own result before the
+        driver gives up on it. The script timeout is read once per driver.
+        """
+        script_timeout = self._script_timeouts.get(self.driver)
+        if script_timeout is None:
+            try:
+                script_timeout = float(self.driver.timeouts.script)
+            except Exception:
+                script_timeout = BrowserConfig.script_timeout
+            self._script_timeouts[self.driver] = script_timeout
+        if timeout > script_timeout - 1:
+            logger.debug(f"Wait of {timeout}s capped below the {script_timeout}s script timeout")
+            timeout = script_timeout - 1
+        return max(timeout, 0.1)
+    
+    def _execute_bounded_async(self, script: str, timeout: float, *args) -> Optional[dict]:
+        """
+        Run an async wait script that resolves by itself within `timeout`.
         
-        return filepath
+        Returns:
+            The script's result, or None if the driver gave up first
+            (timeout above the driver's script timeout) or scripts are unavailable
+        """
+        try:
+            return self.driver.execute_async_script(script, *args)
+        except TimeoutException:
+            logger.warning(f"Driver script timeout hit before the {timeout}s wait bound")
+            return None
+        except Exception as e:
+            logger.debug(f"Async wait script failed: {e}")
+            return None
     
-    def wait_for_page_load(self, timeout: int = 30):
+    def wait_for_dom_stable(self, quiet_ms: int = 500, timeout: float = 10) -> bool:
         """
-        Wait for page to fully load.
+        Wait until the DOM has not changed for `quiet_ms` milliseconds.
+        
+        Uses an injected MutationObserver, so it returns as soon as the page
+        stops rendering instead of after a fixed sleep.
         
         Args:
+            quiet_ms: Required quiet period without DOM mutations
             timeout: Maximum wait time in seconds
+            
+        Returns:
+            True if the DOM became stable, False if the timeout was reached
+        """
+        timeout = self._wait_bound(timeout)
+        result = self._execute_bounded_async(DOM_STABLE_SCRIPT, timeout, quiet_ms, int(timeout * 1000))
+        stable = bool(result and result.get("stable"))
+        if result:
+            logger.debug(
+                f"DOM {'stable' if stable else 'still changing'} after {result['elapsed']:.0f}ms "
+                f"({result['mutations']} mutations)"
+            )
+        return stable
+    
+    def install_network_tracker(self) -> bool:
+        """
+        Start counting in-flight fetch/XHR requests in the page.
+        
+        On Chrome the tracker is also registered for every new document
+        (CDP Page.addScriptToEvaluateOnNewDocument, once per session;
+        navigate_to does this automatically), so requests made while a page
+        loads are counted. Elsewhere it only covers the current document
+        from the moment it is installed.
+        
+        Returns:
+            True if the tracker is registered for future documents
+        """
+        persistent = has_document_script(self.driver, "network_tracker") or self._register_network_tracker()
+        self.driver.execute_script(NETWORK_TRACKER_SCRIPT)
+        return persistent
+    
+    def _register_network_tracker(self) -> bool:
+        """Register the network tracker for new documents through CDP."""
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return False
+        try:
+            add_document_script(self.driver, "network_tracker", NETWORK_TRACKER_SCRIPT)
+            return True
+        except Exception as e:
+            logger.debug(f"Could not register network tracker via CDP: {e}")
+            return False
+    
+    def wait_for_network_idle(self, idle_ms: int = 500, timeout: float = 15,
+                              max_inflight: int = 0) -> bool:
         """
-        from selenium.webdriver.support.ui import WebDriverWait
+        Wait until fetch/XHR traffic and resource loads have been idle for `idle_ms`.
         
-        wait = WebDriverWait(self.driver, timeout)
+        Installs the network tracker in the current document if needed.
         
-        # Wait for document ready state
-        wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
-        logger.debug("Page loaded")
-        print("✓ Page loaded")
+        Args:
+            idle_ms: Required idle period in milliseconds
+            timeout: Maximum wait time in seconds
+            max_inflight: Number of long-lived requests (e.g. polling) to tolerate
+            
+        Returns:
+            True if the network became idle, False if the timeout was reached
+        """
+        timeout = self._wait_bound(timeout)
+        result = self._execute_bounded_async(
+            NETWORK_IDLE_SCRIPT, timeout, idle_ms, max_inflight, int(timeout * 1000)
+        )
+        idle = bool(result and result.get("idle"))
+        if result:
+            logger.debug(
+                f"Network {'idle' if idle else 'busy'} after {result['elapsed']:.0f}ms "
+                f"({result['inflight']} requests in flight)"
+            )
+        return idle
+    
+    def wait_until_quiet(self, quiet_ms: int = 300, timeout: float = 15) -> bool:
+        """
+        Wait for network idle, then for a stable DOM, sharing one time budget.
+        
+        Args:
+            quiet_ms: Quiet period for both conditions in milliseconds
+            timeout: Maximum total wait time in seconds
+            
+        Returns:
+            True if the page became quiescent within the timeout
+        """
+        start = time.monotonic()
+        network_idle = self.wait_for_network_idle(idle_ms=quiet_ms, timeout=timeout)
+        remaining = max(timeout - (time.monotonic() - start), 0.1)
+        dom_stable = self.wait_for_dom_stable(quiet_ms=quiet_ms, timeout=remaining)
+        return network_idle and dom_stable
     
     def execute_script(self, script: str, *args):
         """
@@ -380,6 +984,38 @@ class BasePage:
         """
         return self.driver.execute_script(script, *args)
     
+    def bulk_query(self, queries: Dict[str, Union[Tuple[str, str], DomQuery]]) -> Dict[str, List[ElementSnapshot]]:
+        """
+        Read several elements and their properties in one execute_script call.
+        
+        Each query is a locator (reads text, href, rect and visibility of all
+        matches) or a DomQuery choosing properties, attributes, first match
+        only and whether to return WebElement handles. Works in web contexts.
+        
+        Args:
+            queries: Mapping of result name -> locator or DomQuery
+            
+        Returns:
+            Mapping of result name -> list of ElementSnapshot (empty if no match)
+            
+        Example:
+            results = page.bulk_query({
+                "cards": page.VIDEO_CARDS,
+                "title": DomQuery((By.TAG_NAME, "h1"), properties=("text",), first=True),
+            })
+            titles = [card.text for card in results["cards"]]
+        """
+        normalized = {
+            name: query if isinstance(query, DomQuery) else DomQuery(tuple(query))
+            for name, query in queries.items()
+        }
+        raw = self.driver.execute_script(BULK_QUERY_SCRIPT, build_payload(normalized))
+        results = parse_results(raw)
+        logger.debug(
+            "Bulk query: " + ", ".join(f"{name}={len(items)}" for name, items in results.items())
+        )
+        return results
+    
     def wait(self, seconds: float):
         """
         Wait for specified seconds.
@@ -0,0 +1,182 @@
+"""
+Bulk DOM queries resolved in a single execute_script round trip.
+Used by BasePage.bulk_query to read several elements and their properties
+(text, href, bounding rect, visibility, attributes) in one WebDriver command
+instead of one command per element per property, and by BasePage.scroll_until
+to scroll and look for a target in the same command.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+DEFAULT_PROPERTIES = ("text", "href", "rect", "visible")
+SUPPORTED_PROPERTIES = ("tag", "text", "href", "rect", "visible")
+
+
+@dataclass
+class DomQuery:
+    """A locator and the properties to read from the elements it matches."""
+    locator: Tuple[str, str]
+    properties: Sequence[str] = DEFAULT_PROPERTIES
+    attributes: Sequence[str] = ()
+    first: bool = False  # Only the first match
+    include_elements: bool = False  # Also return WebElement handles
+
+
+@dataclass
+class ElementSnapshot:
+    """Properties of one element captured by a bulk query."""
+    tag: Optional[str] = None
+    text: Optional[str] = None
+    href: Optional[str] = None
+    rect: Optional[Dict[str, float]] = None
+    visible: Optional[bool] = None
+    attributes: Dict[str, Optional[str]] = field(default_factory=dict)
+    element: Optional[WebElement] = None
+
+
+BULK_QUERY_SCRIPT = """
+const queries = arguments[0];
+const results = {};
+for (const q of queries) {
+    let nodes = [];
+    if (q.using === 'xpath') {
+        const found = document.evaluate(q.value, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < found.snapshotLength; i++) nodes.push(found.snapshotItem(i));
+    } else {
+        nodes = Array.from(document.querySelectorAll(q.value));
+    }
+    if (q.first) nodes = nodes.slice(0, 1);
+    results[q.name] = nodes.map(el => {
+        const record = {attributes: {}};
+        const props = q.properties;
+        if (props.includes('tag')) record.tag = el.tagName.toLowerCase();
+        if (props.includes('text')) record.text = (el.innerText || el.textContent || '').trim();
+        if (props.includes('href')) record.href = el.href || el.getAttribute('href');
+        if (props.includes('rect') || props.includes('visible')) {
+            const r = el.getBoundingClientRect();
+            if (props.includes('rect')) {
+                record.rect = {x: r.x, y: r.y, width: r.width, height: r.height};
+            }
+            if (props.includes('visible')) {
+                const style = window.getComputedStyle(el);
+                record.visible = r.width > 0 && r.height > 0
+                    && style.visibility !== 'hidden' && style.display !== 'none'
+                    && parseFloat(style.opacity) !== 0;
+            }
+        }
+        for (const name of q.attributes) record.attributes[name] = el.getAttribute(name);
+        if (q.elements) record.element = el;
+        return record;
+    });
+}
+return results;
+"""
+
+# Checks whether the target is in the viewport; if not, scrolls it into view
+# when it exists or scrolls the page by `step` viewport heights, then checks again.
+# arguments: using ('css' or 'xpath'), value, step (negative scrolls up)
+SCROLL_UNTIL_SCRIPT = """
+const using = arguments[0], value = arguments[1], step = arguments[2];
+const find = () => using === 'xpath'
+    ? document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : document.querySelector(value);
+const inView = el => {
+    if (!el) return false;
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0 && r.bottom > 0 && r.right > 0
+        && r.top < window.innerHeight && r.left < window.innerWidth;
+};
+const scroller = () => {
+    const root = document.scrollingElement || document.documentElement;
+    if (root.scrollHeight > root.clientHeight) return root;
+    // Pages that scroll an inner container instead of the document
+    for (const el of document.querySelectorAll('main, [role="main"], div')) {
+        const overflow = window.getComputedStyle(el).overflowY;
+        if ((overflow === 'auto' || overflow === 'scroll') && el.scrollHeight > el.clientHeight) return el;
+    }
+    return root;
+};
+let el = find();
+if (inView(el)) return {found: true, element: el, scrolled: false, atEnd: false};
+let atEnd = false;
+if (el) {
+    el.scrollIntoView({block: 'center', behavior: 'instant'});
+} else {
+    const target = scroller();
+    const before = target.scrollTop;
+    target.scrollBy({top: step * window.innerHeight, behavior: 'instant'});
+    atEnd = target.scrollTop === before;
+    el = find();
+}
+const found = inView(el);
+return {found: found, element: found ? el : null, scrolled: true, atEnd: atEnd};
+"""
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def to_js_locator(locator: Tuple[str, str]) -> Tuple[str, str]:
+    """
+    Translate a Selenium locator into a CSS selector or XPath for in-page lookup.
+
+    Args:
+        locator: Tuple of (By, locator_string)
+
+    Returns:
+        Tuple of ("css" or "xpath", expression)
+
+    Raises:
+        ValueError: If the locator strategy cannot be evaluated in the page
+    """
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return "css", value
+    if by == By.XPATH:
+        return "xpath", value
+    if by == By.ID:
+        return "css", f"[id={_quote(value)}]"
+    if by == By.NAME:
+        return "css", f"[name={_quote(value)}]"
+    if by == By.CLASS_NAME:
+        return "css", "." + value
+    if by == By.TAG_NAME:
+        return "css", value
+    if by == By.LINK_TEXT:
+        return "xpath", f"//a[normalize-space(.)={_quote(value)}]"
+    if by == By.PARTIAL_LINK_TEXT:
+        return "xpath", f"//a[contains(., {_quote(value)})]"
+    raise ValueError(f"Locator strategy not supported in bulk queries: {by}")
+
+
+def build_payload(queries: Dict[str, DomQuery]) -> List[Dict[str, Any]]:
+    """Serialize queries into the argument passed to BULK_QUERY_SCRIPT."""
+    payload = []
+    for name, query in queries.items():
+        unknown = set(query.properties) - set(SUPPORTED_PROPERTIES)
+        if unknown:
+            raise ValueError(f"Unsupported properties for '{name}': {sorted(unknown)}")
+        using, value = to_js_locator(query.locator)
+        payload.append({
+            "name": name,
+            "using": using,
+            "value": value,
+            "properties": list(query.properties),
+            "attributes": list(query.attributes),
+            "first": query.first,
+            "elements": query.include_elements,
+        })
+    return payload
+
+
+def parse_results(raw: Optional[Dict[str, List[Dict[str, Any]]]]) -> Dict[str, List[ElementSnapshot]]:
+    """Convert the script's JSON result into ElementSnapshot records."""
+    return {
+        name: [ElementSnapshot(**record) for record in records]
+        for name, records in (raw or {}).items()
+    }
@@ -0,0 +1,99 @@
+"""
+Page load waits that return navigation timing.
+PAGE_LOAD_SCRIPT resolves on the document's load event (or at once if it has
+already fired) and reports the PerformanceNavigationTiming entry of the
+current document, so waiting for a load and measuring it is one command.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict
+
+# Resolves with the navigation timing once the load event has fired (and
+# loadEventEnd is set), or with complete=false at timeoutMs.
+# arguments: timeoutMs, callback
+PAGE_LOAD_SCRIPT = """
+const timeoutMs = arguments[0], done = arguments[arguments.length - 1];
+const start = performance.now();
+const timing = complete => {
+    const nav = performance.getEntriesByType
+        ? performance.getEntriesByType('navigation')[0] : null;
+    if (nav) {
+        return {
+            complete: complete, url: nav.name, type: nav.type,
+            dns: nav.domainLookupEnd - nav.domainLookupStart,
+            connect: nav.connectEnd - nav.connectStart,
+            ttfb: nav.responseStart - nav.startTime,
+            response: nav.responseEnd - nav.responseStart,
+            domContentLoaded: nav.domContentLoadedEventEnd - nav.startTime,
+            load: nav.loadEventEnd - nav.startTime,
+            transferSize: nav.transferSize || 0,
+            waited: performance.now() - start,
+        };
+    }
+    // Legacy Navigation Timing (older WebKit)
+    const t = performance.timing, origin = t.navigationStart;
+    return {
+        complete: complete, url: location.href, type: 'navigate',
+        dns: t.domainLookupEnd - t.domainLookupStart,
+        connect: t.connectEnd - t.connectStart,
+        ttfb: t.responseStart - origin,
+        response: t.responseEnd - t.responseStart,
+        domContentLoaded: t.domContentLoadedEventEnd ? t.domContentLoadedEventEnd - origin : 0,
+        load: t.loadEventEnd ? t.loadEventEnd - origin : 0,
+        transferSize: 0,
+        waited: performance.now() - start,
+    };
+};
+const finish = () => {
+    clearTimeout(timer);
+    // loadEventEnd is only set after the load handlers have returned
+    setTimeout(() => done(timing(true)), 0);
+};
+const timer = setTimeout(() => {
+    window.removeEventListener('load', finish);
+    done(timing(false));
+}, timeoutMs);
+if (document.readyState === 'complete') finish();
+else window.addEventListener('load', finish, {once: true});
+"""
+
+
+@dataclass
+class NavigationTiming:
+    """Navigation timing of the current document, in milliseconds from navigation start."""
+    url: str
+    complete: bool  # False if the load event had not fired when the wait gave up
+    type: str = "navigate"  # navigate, reload, back_forward or prerender
+    dns: float = 0.0  # DNS lookup duration
+    connect: float = 0.0  # TCP/TLS connect duration
+    ttfb: float = 0.0  # Time to first byte
+    response: float = 0.0  # Response download duration
+    dom_content_loaded: float = 0.0  # DOMContentLoaded finished
+    load: float = 0.0  # Load event finished
+    transfer_size: int = 0  # Bytes transferred for the document
+    waited: float = 0.0  # Time spent waiting for the load event
+
+    @classmethod
+    def from_script(cls, result: Dict[str, Any]) -> "NavigationTiming":
+        """Build from the PAGE_LOAD_SCRIPT result."""
+        return cls(
+            url=result.get("url", ""),
+            complete=bool(result.get("complete")),
+            type=result.get("type", "navigate"),
+            dns=result.get("dns", 0.0),
+            connect=result.get("connect", 0.0),
+            ttfb=result.get("ttfb", 0.0),
+            response=result.get("response", 0.0),
+            dom_content_loaded=result.get("domContentLoaded", 0.0),
+            load=result.get("load", 0.0),
+            transfer_size=int(result.get("transferSize") or 0),
+            waited=result.get("waited", 0.0),
+        )
+
+    def summary(self) -> str:
+        """One-line human readable breakdown."""
+        state = "" if self.complete else " (load event not fired)"
+        return (
+            f"DNS {self.dns:.0f}ms, TTFB {self.ttfb:.0f}ms, "
+            f"DOMContentLoaded {self.dom_content_loaded:.0f}ms, load {self.load:.0f}ms{state}"
+        )
+
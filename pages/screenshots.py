@@ -0,0 +1,204 @@
+"""
+Asynchronous screenshot pipeline.
+The calling thread only grabs the PNG bytes from the driver; optional
+downscaling/re-encoding and the disk write run on a background worker.
+Consecutive identical frames are encoded once and hardlinked (or copied)
+under their own names. Downscaling and JPEG/WebP output use Pillow (the
+`images` extra) when it is installed, otherwise the PNG is written as is.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import atexit
+import hashlib
+import io
+import logging
+import os
+import shutil
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: only needed to downscale or re-encode
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+
+def encode_image(png: bytes, image_format: str = "png", max_width: Optional[int] = None,
+                 quality: int = 80) -> bytes:
+    """
+    Downscale and/or re-encode PNG bytes.
+
+    Args:
+        png: PNG image bytes
+        image_format: png, jpeg or webp
+        max_width: Downscale to this width, keeping the aspect ratio
+        quality: JPEG/WebP quality
+
+    Returns:
+        Encoded image bytes (the input unchanged if nothing to do or Pillow is missing)
+    """
+    if Image is None or (image_format == "png" and not max_width):
+        return png
+    image = Image.open(io.BytesIO(png))
+    if max_width and image.width > max_width:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.LANCZOS)
+    if image_format == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    out = io.BytesIO()
+    options = {"optimize": True} if image_format == "png" else {"quality": quality}
+    image.save(out, format=image_format.upper(), **options)
+    return out.getvalue()
+
+
+class ScreenshotService:
+    """Captures screenshots on the caller's thread and writes them in the background."""
+
+    def __init__(self, directory: str = "screenshots", image_format: str = "png",
+                 max_width: Optional[int] = None, quality: int = 80, dedupe: bool = True):
+        """
+        Initialize screenshot service.
+
+        Args:
+            directory: Default output directory
+            image_format: png, jpeg or webp (jpeg/webp need Pillow)
+            max_width: Downscale wider screenshots to this width (needs Pillow)
+            quality: JPEG/WebP quality
+            dedupe: Link a frame identical to the previous one in the same directory
+                to the previous file instead of encoding it again
+        """
+        if image_format not in EXTENSIONS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        if Image is None and (image_format != "png" or max_width):
+            logger.warning("Pillow is not installed, screenshots are written as full-size PNG")
+            image_format, max_width = "png", None
+        self.directory = directory
+        self.image_format = image_format
+        self.max_width = max_width
+        self.quality = quality
+        self.dedupe = dedupe
+        self.captured = 0
+        self.skipped = 0
+        self._last: Dict[str, Tuple[str, str]] = {}  # directory -> (content hash, path)
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot")
+
+    def capture(self, source, filename: Optional[str] = None,
+                directory: Optional[str] = None) -> str:
+        """
+        Capture a screenshot of a driver's viewport or of a single element.
+
+        Returns as soon as the PNG bytes are in memory; the file is written
+        by the background worker (call flush() to wait for it).
+
+        Args:
+            source: WebDriver (viewport) or WebElement (element only)
+            filename: File name (default: timestamped); the extension follows the format
+            directory: Output directory (default: the service's directory)
+
+        Returns:
+            Path the screenshot is written to
+        """
+        if hasattr(source, "get_screenshot_as_png"):
+            png = source.get_screenshot_as_png()
+        else:
+            png = source.screenshot_as_png
+        return self.save(png, filename, directory)
+
+    def save(self, png: bytes, filename: Optional[str] = None,
+             directory: Optional[str] = None) -> str:
+        """
+        Queue already captured PNG bytes for writing.
+
+        Args:
+            png: PNG image bytes
+            filename: File name (default: timestamped); the extension follows the format
+            directory: Output directory (default: the service's directory)
+
+        Returns:
+            Path the screenshot is written to
+        """
+        directory = directory or self.directory
+        digest = hashlib.blake2b(png, digest_size=16).hexdigest()
+
+        with self._lock:
+            last = self._last.get(directory)
+            path = os.path.join(directory, self._filename(filename))
+            if self.dedupe and last and last[0] == digest:
+                # Queued behind the previous frame's write on the single worker
+                self.skipped += 1
+                task = self._executor.submit(self._link, last[1], path)
+            else:
+                self._last[directory] = (digest, path)
+                self.captured += 1
+                task = self._executor.submit(self._write, png, path)
+            self._pending = [future for future in self._pending if not future.done()]
+            self._pending.append(task)
+        return path
+
+    def _filename(self, filename: Optional[str]) -> str:
+        if not filename:
+            filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        root, ext = os.path.splitext(filename)
+        if ext.lower() in (".png", ".jpg", ".jpeg", ".webp"):
+            filename = root
+        return filename + EXTENSIONS[self.image_format]
+
+    def _write(self, png: bytes, path: str) -> None:
+        try:
+            data = encode_image(png, self.image_format, self.max_width, self.quality)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            logger.info(f"Screenshot saved: {path} ({len(data) // 1024} KB)")
+        except Exception as e:
+            logger.error(f"Failed to write screenshot {path}: {e}")
+
+    def _link(self, source: str, path: str) -> None:
+        if source == path:
+            return
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+            try:
+                os.link(source, path)
+            except OSError:
+                shutil.copyfile(source, path)
+            logger.debug(f"Screenshot identical to {source}, linked as {path}")
+        except Exception as e:
+            logger.error(f"Failed to write screenshot {path}: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait for all pending screenshot writes."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result(timeout=timeout)
+
+    def close(self) -> None:
+        """Write pending screenshots and stop the worker."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+_default_service: Optional[ScreenshotService] = None
+_default_lock = threading.Lock()
+
+
+def screenshot_service() -> ScreenshotService:
+    """Process-wide screenshot service, configured from SCREENSHOT_FORMAT/SCREENSHOT_MAX_WIDTH."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            max_width = os.getenv("SCREENSHOT_MAX_WIDTH")
+            _default_service = ScreenshotService(
+                image_format=os.getenv("SCREENSHOT_FORMAT", "png"),
+                max_width=int(max_width) if max_width else None,
+            )
+            atexit.register(_default_service.close)
+        return _default_service
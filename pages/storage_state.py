@@ -0,0 +1,182 @@
+"""
+Saved browser storage state (cookies, localStorage, sessionStorage).
+State exported once a site's onboarding/popups have been dismissed is stored
+per device preset and origin, and re-injected into later sessions before
+their first navigation, so those sessions start past the popups.
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import hashlib
+import json
+import logging
+import os
+import time
+
+from config.config import CACHE_DIR
+from drivers.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Returns the current document's origin and web storage
+EXPORT_STORAGE_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    try {
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            items[key] = storage.getItem(key);
+        }
+    } catch (e) {}
+    return items;
+}
+return {
+    origin: location.origin,
+    local: dump(window.localStorage),
+    session: dump(window.sessionStorage)
+};
+"""
+
+# Writes web storage items into the current document (args: local, session)
+IMPORT_STORAGE_SCRIPT = """
+var local = arguments[0], session = arguments[1];
+try { Object.keys(local).forEach(function (k) { localStorage.setItem(k, local[k]); }); } catch (e) {}
+try { Object.keys(session).forEach(function (k) { sessionStorage.setItem(k, session[k]); }); } catch (e) {}
+"""
+
+# Seeds web storage in every new document of the origin, once per tab, before page scripts run
+SEED_STORAGE_TEMPLATE = """
+(function () {
+    if (location.origin !== %(origin)s) return;
+    try {
+        if (sessionStorage.getItem("__storage_state_seeded")) return;
+        var local = %(local)s, session = %(session)s;
+        Object.keys(local).forEach(function (k) { localStorage.setItem(k, local[k]); });
+        Object.keys(session).forEach(function (k) { sessionStorage.setItem(k, session[k]); });
+        sessionStorage.setItem("__storage_state_seeded", "1");
+    } catch (e) {}
+})();
+"""
+
+
+def origin_of(url: str) -> str:
+    """scheme://host[:port] of a URL."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+@dataclass
+class StorageState:
+    """Cookies and web storage of one origin."""
+    origin: str
+    cookies: List[Dict[str, Any]] = field(default_factory=list)  # WebDriver cookie dicts
+    local_storage: Dict[str, str] = field(default_factory=dict)
+    session_storage: Dict[str, str] = field(default_factory=dict)
+    saved_at: float = field(default_factory=time.time)
+
+    def live_cookies(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Cookies that have not expired."""
+        now = time.time() if now is None else now
+        return [cookie for cookie in self.cookies if not cookie.get("expiry") or cookie["expiry"] > now]
+
+    def cdp_cookies(self) -> List[Dict[str, Any]]:
+        """Live cookies as CDP Network.setCookies parameters."""
+        cookies = []
+        for cookie in self.live_cookies():
+            param = {
+                key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly")
+                if key in cookie
+            }
+            if cookie.get("expiry"):
+                param["expires"] = cookie["expiry"]
+            if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                param["sameSite"] = cookie["sameSite"]
+            if "domain" not in param:
+                param["url"] = self.origin
+            cookies.append(param)
+        return cookies
+
+    def seed_script(self) -> str:
+        """Script seeding this state's web storage into new documents (CDP)."""
+        return SEED_STORAGE_TEMPLATE % {
+            "origin": json.dumps(self.origin),
+            "local": json.dumps(self.local_storage),
+            "session": json.dumps(self.session_storage),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StorageState":
+        return cls(
+            origin=data["origin"],
+            cookies=data.get("cookies", []),
+            local_storage=data.get("local_storage", {}),
+            session_storage=data.get("session_storage", {}),
+            saved_at=data.get("saved_at", 0),
+        )
+
+
+class StorageStateStore:
+    """On-disk storage states per device preset and origin, shared by xdist workers."""
+
+    def __init__(self, device: str, path: Optional[str] = None, max_age_hours: float = 72):
+        """
+        Initialize store.
+
+        Args:
+            device: Device preset name the states belong to
+            path: Directory holding the state files
+            max_age_hours: States older than this are ignored and deleted
+        """
+        self.device = device
+        self.path = path or os.path.join(CACHE_DIR, "storage_state")
+        self.max_age_hours = max_age_hours
+
+    def _file(self, origin: str) -> str:
+        key = hashlib.sha1(f"{self.device}|{origin}".encode()).hexdigest()[:16]
+        return os.path.join(self.path, f"{key}.json")
+
+    def load(self, url: str) -> Optional[StorageState]:
+        """
+        Saved state for the URL's origin.
+
+        Returns:
+            StorageState, or None if nothing valid is saved
+        """
+        filepath = self._file(origin_of(url))
+        try:
+            with open(filepath) as f:
+                state = StorageState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        if time.time() - state.saved_at > self.max_age_hours * 3600:
+            logger.debug(f"Storage state for {state.origin} expired")
+            self.delete(url)
+            return None
+        return state
+
+    def save(self, state: StorageState) -> str:
+        """
+        Store a state, replacing the previous one for its origin.
+
+        Returns:
+            Path of the state file
+        """
+        filepath = self._file(state.origin)
+        os.makedirs(self.path, exist_ok=True)
+        with file_lock(filepath + ".lock"):
+            tmp_path = filepath + f".{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(dict(asdict(state), device=self.device), f)
+            os.replace(tmp_path, filepath)
+        logger.info(
+            f"Storage state saved for {state.origin} on {self.device}: {len(state.cookies)} cookies, "
+            f"{len(state.local_storage)} localStorage and {len(state.session_storage)} sessionStorage items"
+        )
+        return filepath
+
+    def delete(self, url: str) -> None:
+        """Forget the state for the URL's origin."""
+        try:
+            os.remove(self._file(origin_of(url)))
+        except OSError:
+            pass
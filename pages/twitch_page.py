@@ -1,6 +1,7 @@
 from selenium.webdriver.common.by import By
-from appium.webdriver.common.appiumby import AppiumBy
 from pages.base_page import BasePage
+from pages.dom_query import DomQuery
+import re
 import time
 
 
@@ -11,6 +12,7 @@ class TwitchPage(BasePage):
     SEARCH_BUTTON = (By.CSS_SELECTOR, "button[type='submit']")
     BROWSE_BUTTON = (By.XPATH, "//div[text()='Browse']")  # Browse navigation button
     VIDEO_CARDS = (By.CSS_SELECTOR, "[data-a-target='search-result-video']")  # Video search results
+    KEEP_USING_WEB = re.compile(r"[Kk]eep.*web")  # Native "Keep using web" popup button text
     
     def __init__(self, driver, timeout=10):
         """Initialize example page."""
@@ -45,6 +47,26 @@ class TwitchPage(BasePage):
         search_input.send_keys(Keys.RETURN)
         
         print(f"Searched for: {query}")
+        self.mark_step("search")
+
+    def get_video_cards(self, visible_only: bool = False):
+        """
+        Read all video search results in a single round trip.
+        
+        Args:
+            visible_only: Only return rendered cards (non-zero size, not hidden)
+            
+        Returns:
+            List of ElementSnapshot with text, href, rect and visibility
+            
+        Example:
+            page = TwitchPage(driver)
+            titles = [card.text for card in page.get_video_cards()]
+        """
+        cards = self.bulk_query({"cards": DomQuery(self.VIDEO_CARDS)})["cards"]
+        if visible_only:
+            cards = [card for card in cards if card.visible]
+        return cards
 
     def click_browse(self):
         """
@@ -59,6 +81,7 @@ class TwitchPage(BasePage):
         """
         # Try to click with retries and overlay handling
         self.click_with_retry(self.BROWSE_BUTTON)
+        self.mark_step("browse")
     
     
     def dismiss_popup_adb(self, wait_time: int = 3, device_id: str = None):
@@ -67,9 +90,18 @@ class TwitchPage(BasePage):
         
         This method uses ADB commands to find and tap the popup button directly,
         which can be faster and more reliable than WebDriver in some cases.
+        The UI hierarchy is dumped over the device's persistent adb shell and
+        polled until the button appears, so there is no fixed initial wait;
+        once the button's position is known for the screen resolution, the
+        check and the tap take a single round trip.
+        
+        When a saved storage state was restored for the page (the popup was
+        dismissed in an earlier session) the popup is only checked for once,
+        without waiting for it; after a successful dismissal the storage
+        state is saved for later sessions.
         
         Args:
-            wait_time: Time to wait for popup to appear (default: 3 seconds)
+            wait_time: Maximum time to wait for popup to appear (default: 3 seconds)
             device_id: ADB device ID (optional, uses first device if not specified)
             
         Example:
@@ -78,63 +110,38 @@ class TwitchPage(BasePage):
             # or
             page.dismiss_popup_adb(device_id="emulator-5554")  # Specific device
         """
-        import subprocess
-        import re
+        from drivers.ui_hierarchy import UiAutomatorEngine
         
-        # Wait for popup to appear
-        time.sleep(wait_time)
+        if self.storage_state_restored():
+            print("ℹ️  Storage state restored, checking for the popup once")
+            wait_time = 0
         
         try:
-            # Build ADB command prefix
-            adb_prefix = ["adb"]
-            if device_id:
-                adb_prefix.extend(["-s", device_id])
-            
-            # Dump UI hierarchy
             print("🔍 Searching for popup using ADB...")
-            dump_cmd = adb_prefix + ["shell", "uiautomator", "dump", "/sdcard/window_dump.xml"]
-            subprocess.run(dump_cmd, capture_output=True, text=True, timeout=10)
+            engine = UiAutomatorEngine.for_device(device_id)
+            button = engine.find_and_tap(text=self.KEEP_USING_WEB, timeout=wait_time)
             
-            # Pull the dump file
-            pull_cmd = adb_prefix + ["shell", "cat", "/sdcard/window_dump.xml"]
-            result = subprocess.run(pull_cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode != 0:
-                print("❌ Failed to dump UI hierarchy")
-                return
-            
-            xml_content = result.stdout
-            
-            # Search for "Keep using web" button in the XML
-            # Pattern: text="Keep using web" bounds="[x1,y1][x2,y2]"
-            pattern = r'text="[^"]*[Kk]eep[^"]*web[^"]*"[^>]*bounds="\[(\d+),(\d+)\]\[(\d+),(\d+)\]"'
-            match = re.search(pattern, xml_content)
-            
-            if match:
-                x1, y1, x2, y2 = map(int, match.groups())
-                
-                # Calculate center point
-                center_x = (x1 + x2) // 2
-                center_y = (y1 + y2) // 2
-                
-                print(f"✓ Found popup button at coordinates: ({center_x}, {center_y})")
-                
-                # Tap using ADB
-                tap_cmd = adb_prefix + ["shell", "input", "tap", str(center_x), str(center_y)]
-                tap_result = subprocess.run(tap_cmd, capture_output=True, text=True, timeout=5)
-                
-                if tap_result.returncode == 0:
-                    print("✓ Dismissed popup using ADB tap")
-                else:
-                    print("❌ ADB tap command failed")
+            if button:
+                print(f"✓ Dismissed popup using ADB tap at {button.center}")
+                self._remember_dismissal()
             else:
                 print("ℹ️  Popup not found in UI hierarchy (already dismissed?)")
                 
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             print("⚠️  ADB command timeout")
         except Exception as e:
             print(f"⚠️  ADB dismissal failed: {e}")
     
+    def _remember_dismissal(self):
+        """Save the storage state once the page has recorded the dismissal."""
+        if self.storage_states is None:
+            return
+        self.wait_for_dom_stable(quiet_ms=200, timeout=2)
+        try:
+            self.save_storage_state()
+        except Exception as e:
+            print(f"⚠️  Could not save storage state: {e}")
+    
     def dismiss_popup_adb_simple(self, x: int, y: int, wait_time: int = 3, device_id: str = None):
         """
         Dismiss popup using ADB tap at specific coordinates (simple/fast).
@@ -192,15 +199,31 @@ class TwitchPage(BasePage):
             page = TwitchPage(driver)
             page.dismiss_popup_hybrid()  # Try Appium, fallback to ADB
         """
+        # Imported here so browser emulation runs never load Appium
+        from appium.webdriver.common.appiumby import AppiumBy
+        
+        selector = 'new UiSelector().textContains("Keep using web")'
+        if self.storage_state_restored():
+            # The popup should be gone, check for it once without waiting
+            print("ℹ️  Storage state restored, checking for the popup once")
+            with self.implicit_waits.suspended():
+                buttons = self.driver.find_elements(AppiumBy.ANDROID_UIAUTOMATOR, selector)
+            if not buttons:
+                return
+            buttons[0].click()
+            print("✓ Dismissed popup using Appium")
+            self._remember_dismissal()
+            return
+        
         # Wait for popup
         time.sleep(wait_time)
         
         # Try Appium/UiAutomator first
         try:
-            keep_web = self.driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR,
-                'new UiSelector().textContains("Keep using web")')
+            keep_web = self.driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR, selector)
             keep_web.click()
             print("✓ Dismissed popup using Appium")
+            self._remember_dismissal()
             return
         except Exception as e:
             print(f"ℹ️  Appium method failed: {e}")
@@ -239,16 +262,15 @@ class TwitchPage(BasePage):
                 # Wait for element to be present
                 element = self.find_element(locator, timeout=10)
                 
-                # Scroll element into view
+                # Scroll element into view (instant, so there is no animation to wait for)
                 if scroll_to_element:
                     self.driver.execute_script(
-                        "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", 
+                        "arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", 
                         element
                     )
-                    time.sleep(0.5)  # Wait for smooth scroll
                 
-                # Wait a bit for any overlays to disappear
-                time.sleep(0.5)
+                # Wait for overlays/animations to settle instead of a fixed sleep
+                self.wait_for_dom_stable(quiet_ms=200, timeout=2)
                 
                 # Try normal click first
                 try:
@@ -264,6 +286,7 @@ class TwitchPage(BasePage):
                     return
                     
             except StaleElementReferenceException:
+                self.invalidate_cache(locator)
                 if attempt < max_attempts - 1:
                     print(f"⚠️  Element stale, retrying... (attempt {attempt + 1}/{max_attempts})")
                     time.sleep(1)
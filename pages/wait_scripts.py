@@ -0,0 +1,72 @@
+"""
+In-page JavaScript used by BasePage quiescence waits.
+Async scripts take their bounds as arguments and always call the
+WebDriver callback (last argument) before the bound expires.
+"""
+
+# Resolves once no DOM mutation happened for quietMs, or with stable=false at timeoutMs.
+# arguments: quietMs, timeoutMs, callback
+DOM_STABLE_SCRIPT = """
+const quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const start = performance.now();
+let last = start, mutations = 0;
+const observer = new MutationObserver(records => { mutations += records.length; last = performance.now(); });
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+const timer = setInterval(() => {
+    const now = performance.now();
+    const stable = now - last >= quietMs;
+    if (stable || now - start >= timeoutMs) {
+        clearInterval(timer);
+        observer.disconnect();
+        done({stable: stable, mutations: mutations, elapsed: now - start});
+    }
+}, Math.min(50, quietMs));
+"""
+
+# Counts in-flight fetch/XHR requests and records the last network activity
+# (including finished resource loads) in window.__wapNetwork. Safe to run more than once.
+NETWORK_TRACKER_SCRIPT = """
+(function () {
+    if (window.__wapNetwork) return;
+    const state = window.__wapNetwork = {inflight: 0, lastActivity: performance.now()};
+    const begin = () => { state.inflight++; state.lastActivity = performance.now(); };
+    const end = () => { state.inflight = Math.max(0, state.inflight - 1); state.lastActivity = performance.now(); };
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            return originalFetch.apply(this, arguments).finally(end);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+    if (window.PerformanceObserver) {
+        try {
+            new PerformanceObserver(() => { state.lastActivity = performance.now(); })
+                .observe({type: 'resource'});
+        } catch (e) {}
+    }
+})();
+"""
+
+# Resolves once at most maxInflight fetch/XHR requests are pending and no request
+# started/finished and no resource finished loading for idleMs, or with idle=false at timeoutMs.
+# arguments: idleMs, maxInflight, timeoutMs, callback
+NETWORK_IDLE_SCRIPT = NETWORK_TRACKER_SCRIPT + """
+const idleMs = arguments[0], maxInflight = arguments[1], timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const state = window.__wapNetwork;
+const start = performance.now();
+const timer = setInterval(() => {
+    const now = performance.now();
+    const idle = state.inflight <= maxInflight && now - state.lastActivity >= idleMs;
+    if (idle || now - start >= timeoutMs) {
+        clearInterval(timer);
+        done({idle: idle, inflight: state.inflight, elapsed: now - start});
+    }
+}, 50);
+"""
@@ -0,0 +1,264 @@
+"""
+Core Web Vitals collection and performance budgets.
+PerformanceObserver hooks (LCP, FCP, CLS, INP, long tasks) are injected into
+every document of a driver; page objects harvest the current values at the
+end of each flow step and tests assert them against the device preset's
+budget from DEVICE_PRESETS.
+"""
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import logging
+import threading
+import weakref
+
+from config.config import DEFAULT_PERFORMANCE_BUDGET, DEVICE_PRESETS
+from drivers.session_state import add_document_script, has_document_script
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# Observes vitals into window.__wapVitals. Buffered observers also pick up
+# entries from before installation (paint, LCP, layout shifts); event timing
+# and long tasks are only seen from installation on. Safe to run more than once.
+WEB_VITALS_OBSERVER_SCRIPT = """
+(function () {
+    if (window.__wapVitals) return;
+    const v = window.__wapVitals = {
+        lcp: null, fcp: null, cls: null, inp: null, longTasks: null, tbt: null
+    };
+    const observe = (type, callback, options) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(callback))
+                .observe(Object.assign({type: type, buffered: true}, options || {}));
+            return true;
+        } catch (e) {
+            return false;
+        }
+    };
+    observe('paint', e => { if (e.name === 'first-contentful-paint') v.fcp = e.startTime; });
+    observe('largest-contentful-paint', e => { v.lcp = e.renderTime || e.loadTime || e.startTime; });
+    if (observe('layout-shift', e => { if (!e.hadRecentInput) v.cls += e.value; })) v.cls = 0;
+    // Slowest interaction so far, which is INP for pages with few interactions
+    observe('event', e => { if (e.interactionId) v.inp = Math.max(v.inp || 0, e.duration); },
+            {durationThreshold: 40});
+    if (observe('longtask', e => { v.longTasks++; v.tbt += Math.max(0, e.duration - 50); })) {
+        v.longTasks = 0;
+        v.tbt = 0;
+    }
+})();
+"""
+
+HARVEST_SCRIPT = WEB_VITALS_OBSERVER_SCRIPT + """
+return Object.assign({url: location.href}, window.__wapVitals);
+"""
+
+# Metric -> (label, unit)
+METRICS = {
+    "lcp": ("LCP", "ms"),
+    "fcp": ("FCP", "ms"),
+    "cls": ("CLS", ""),
+    "inp": ("INP", "ms"),
+    "total_blocking_time": ("TBT", "ms"),
+}
+
+
+@dataclass
+class WebVitals:
+    """Vitals of the current document; None where the browser reported nothing."""
+    url: str
+    lcp: Optional[float] = None  # Largest Contentful Paint (ms)
+    fcp: Optional[float] = None  # First Contentful Paint (ms)
+    cls: Optional[float] = None  # Cumulative Layout Shift
+    inp: Optional[float] = None  # Slowest interaction (ms)
+    long_tasks: Optional[int] = None  # Number of tasks over 50ms
+    total_blocking_time: Optional[float] = None  # Sum of long task time over 50ms (ms)
+
+    @classmethod
+    def from_script(cls, result: Dict) -> "WebVitals":
+        """Build from the HARVEST_SCRIPT result."""
+        return cls(
+            url=result.get("url", ""),
+            lcp=result.get("lcp"),
+            fcp=result.get("fcp"),
+            cls=result.get("cls"),
+            inp=result.get("inp"),
+            long_tasks=result.get("longTasks"),
+            total_blocking_time=result.get("tbt"),
+        )
+
+
+@dataclass
+class PerformanceBudget:
+    """Upper bounds per metric; None disables a check."""
+    lcp: Optional[float] = None
+    fcp: Optional[float] = None
+    cls: Optional[float] = None
+    inp: Optional[float] = None
+    total_blocking_time: Optional[float] = None
+
+    @classmethod
+    def for_device(cls, device_name: str) -> "PerformanceBudget":
+        """Budget of a DEVICE_PRESETS entry, the default budget for other devices."""
+        budget = DEVICE_PRESETS.get(device_name, {}).get("performance_budget", DEFAULT_PERFORMANCE_BUDGET)
+        known = {f.name for f in fields(cls)}
+        return cls(**{name: value for name, value in budget.items() if name in known})
+
+
+def _format(metric: str, value: float) -> str:
+    unit = METRICS[metric][1]
+    return f"{value:.3f}" if not unit else f"{value:.0f}{unit}"
+
+
+@dataclass
+class BudgetViolation:
+    """A metric over its budget at a flow step."""
+    step: str
+    url: str
+    metric: str
+    value: float
+    budget: float
+
+    @property
+    def over(self) -> float:
+        return self.value - self.budget
+
+    def __str__(self) -> str:
+        percent = f" ({self.over / self.budget:.0%})" if self.budget else ""
+        return (
+            f"{self.step}: {METRICS[self.metric][0]} {_format(self.metric, self.value)} exceeds "
+            f"budget {_format(self.metric, self.budget)} by {_format(self.metric, self.over)}{percent}"
+        )
+
+
+def check_budget(step: str, vitals: WebVitals, budget: PerformanceBudget) -> List[BudgetViolation]:
+    """
+    Compare vitals to a budget.
+
+    Returns:
+        One violation per metric over budget (metrics without a value pass)
+    """
+    violations = []
+    for metric in METRICS:
+        value, limit = getattr(vitals, metric), getattr(budget, metric)
+        if value is not None and limit is not None and value > limit:
+            violations.append(BudgetViolation(step, vitals.url, metric, value, limit))
+    return violations
+
+
+class WebVitalsCollector:
+    """Collects Web Vitals of one driver's documents at named flow steps."""
+
+    _collectors: "weakref.WeakKeyDictionary[WebDriver, WebVitalsCollector]" = weakref.WeakKeyDictionary()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, driver: "WebDriver", budget: Optional[PerformanceBudget] = None):
+        """
+        Initialize collector.
+
+        Args:
+            driver: WebDriver instance
+            budget: Budget used by violations()/assert_budget() by default
+        """
+        # Weak, so the registry entry does not keep its own key alive
+        self._driver = weakref.ref(driver)
+        self.budget = budget or PerformanceBudget(**DEFAULT_PERFORMANCE_BUDGET)
+        self.steps: List[Tuple[str, WebVitals]] = []
+
+    @property
+    def driver(self) -> "WebDriver":
+        driver = self._driver()
+        if driver is None:
+            raise ReferenceError("Driver of this WebVitalsCollector no longer exists")
+        return driver
+
+    @classmethod
+    def enable(cls, driver: "WebDriver", budget: Optional[PerformanceBudget] = None) -> "WebVitalsCollector":
+        """Start collecting for a driver (returns the existing collector if already enabled)."""
+        with cls._registry_lock:
+            collector = cls._collectors.get(driver)
+            if collector is None:
+                collector = cls._collectors[driver] = cls(driver, budget)
+        collector.install()
+        return collector
+
+    @classmethod
+    def for_driver(cls, driver: "WebDriver") -> Optional["WebVitalsCollector"]:
+        """Collector of a driver, None if collection is not enabled."""
+        return cls._collectors.get(driver)
+
+    @classmethod
+    def disable(cls, driver: "WebDriver") -> None:
+        """Stop collecting for a driver."""
+        with cls._registry_lock:
+            cls._collectors.pop(driver, None)
+
+    def install(self) -> None:
+        """
+        Inject the observers into the current document and, on Chrome,
+        into every document loaded from now on.
+        """
+        if hasattr(self.driver, "execute_cdp_cmd") and not has_document_script(self.driver, "web_vitals"):
+            try:
+                add_document_script(self.driver, "web_vitals", WEB_VITALS_OBSERVER_SCRIPT)
+            except Exception as e:
+                logger.debug(f"Could not register Web Vitals observers via CDP: {e}")
+        try:
+            self.driver.execute_script(WEB_VITALS_OBSERVER_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Could not inject Web Vitals observers: {e}")
+
+    def harvest(self, step: str) -> Optional[WebVitals]:
+        """
+        Read the current document's vitals and record them under a step name.
+
+        Args:
+            step: Flow step name (e.g. "search")
+
+        Returns:
+            WebVitals, or None if the page could not be read
+        """
+        try:
+            vitals = WebVitals.from_script(self.driver.execute_script(HARVEST_SCRIPT))
+        except Exception as e:
+            logger.warning(f"Could not harvest Web Vitals at step '{step}': {e}")
+            return None
+        self.steps.append((step, vitals))
+        logger.debug(f"Web Vitals at {step}: {vitals}")
+        return vitals
+
+    def violations(self, budget: Optional[PerformanceBudget] = None) -> List[BudgetViolation]:
+        """
+        Budget violations over all steps.
+
+        Vitals accumulate per document, so for each document and metric only
+        the latest step's violation is reported.
+        """
+        latest: Dict[Tuple[str, str], BudgetViolation] = {}
+        for step, vitals in self.steps:
+            for violation in check_budget(step, vitals, budget or self.budget):
+                latest[(violation.url, violation.metric)] = violation
+        return list(latest.values())
+
+    def assert_budget(self, budget: Optional[PerformanceBudget] = None) -> None:
+        """
+        Raises:
+            AssertionError: Listing every metric over budget and by how much
+        """
+        violations = self.violations(budget)
+        if violations:
+            raise AssertionError(
+                "Performance budget exceeded:\n" + "\n".join(f"  - {v}" for v in violations)
+            )
+
+    def report(self) -> str:
+        """Table of the recorded steps."""
+        lines = [f"{'step':24}{'LCP':>9}{'FCP':>9}{'CLS':>8}{'INP':>8}{'TBT':>8}"]
+        for step, vitals in self.steps:
+            cells = []
+            for metric, width in (("lcp", 9), ("fcp", 9), ("cls", 8), ("inp", 8), ("total_blocking_time", 8)):
+                value = getattr(vitals, metric)
+                cells.append(f"{'-' if value is None else _format(metric, value):>{width}}")
+            lines.append(f"{step[:24]:24}" + "".join(cells))
+        return "\n".join(lines)
@@ -5,8 +5,21 @@ import os
 from datetime import datetime
 from selenium.webdriver.remote.webdriver import WebDriver
 
-from config.config import BrowserConfig, TestConfig
+from config.config import BrowserConfig, TestConfig, REAL_DEVICE_CONFIGS
 from drivers.driver_factory import DriverFactory
+from drivers.device_allocator import DeviceAllocator
+from drivers.driver_pool import DriverPool
+from drivers.driver_prefetch import PrefetchingDriverProvider
+from drivers.emulator_state import SnapshotResetSession
+from drivers.failure_artifacts import FailureArtifactCollector
+from drivers.lean_mode import blocked_patterns, read_stats
+from drivers.network_conditions import apply_network_profile, clear_network_profile, resolve_profile
+from drivers.replay_proxy import stop_replay_proxy
+from pages.adaptive_wait import LocatorLatencyStore
+from pages.base_page import BasePage
+from pages.screenshots import screenshot_service
+from pages.storage_state import StorageStateStore
+from pages.web_vitals import PerformanceBudget, WebVitalsCollector
 
 # Configure logging
 logging.basicConfig(
@@ -60,6 +73,154 @@ def pytest_addoption(parser):
         default="http://localhost:4723",
         help="Appium server URL"
     )
+    parser.addoption(
+        "--connection-pool-size",
+        action="store",
+        type=int,
+        default=4,
+        help="Keep-alive HTTP connections per driver for WebDriver/Appium commands"
+    )
+    parser.addoption(
+        "--compress-transport",
+        action="store_true",
+        default=False,
+        help="Request gzip-compressed WebDriver/Appium command responses"
+    )
+    parser.addoption(
+        "--driver-pool",
+        action="store_true",
+        default=False,
+        help="Reuse warm drivers between tests instead of creating one per test"
+    )
+    parser.addoption(
+        "--driver-max-uses",
+        action="store",
+        type=int,
+        default=20,
+        help="Number of tests after which a pooled driver is replaced"
+    )
+    parser.addoption(
+        "--prefetch-drivers",
+        action="store",
+        type=int,
+        default=0,
+        help="Number of driver sessions to build ahead in the background (browser emulation only)"
+    )
+    parser.addoption(
+        "--emulator-snapshot",
+        action="store",
+        default="chrome_ready",
+        help="Quickboot snapshot used to warm-boot Android emulators"
+    )
+    parser.addoption(
+        "--cold-boot",
+        action="store_true",
+        default=False,
+        help="Cold boot Android emulators instead of loading the quickboot snapshot"
+    )
+    parser.addoption(
+        "--emulator-reset",
+        action="store",
+        default="session",
+        choices=["session", "snapshot"],
+        help="Android state reset between tests: new session per test, or restore a snapshot"
+    )
+    parser.addoption(
+        "--devices",
+        action="store",
+        default=None,
+        help="Comma-separated real devices to spread xdist workers over (default: --device)"
+    )
+    parser.addoption(
+        "--artifact-budget",
+        action="store",
+        type=float,
+        default=TestConfig.artifact_budget,
+        help="Seconds allowed for collecting failure artifacts (screenshot, source, logs, UI dump)"
+    )
+    parser.addoption(
+        "--network-profile",
+        action="store",
+        default="none",
+        help="Network/CPU throttling (Chrome): a NETWORK_PROFILES name, 'preset' for the device preset's profile, or 'none'"
+    )
+    parser.addoption(
+        "--lean",
+        action="store_true",
+        default=False,
+        help="Lean mode for Chrome emulation: block ads/analytics/media requests and report what was avoided"
+    )
+    parser.addoption(
+        "--lean-block",
+        action="store",
+        default="ads,analytics,media",
+        help="Comma-separated LEAN_BLOCKLISTS categories blocked in lean mode (ads, analytics, media, images)"
+    )
+    parser.addoption(
+        "--replay",
+        action="store",
+        default=None,
+        choices=("record", "replay"),
+        help="Record all browser traffic into the replay archive, or replay it offline"
+    )
+    parser.addoption(
+        "--replay-archive",
+        action="store",
+        default="recordings/default",
+        help="Replay archive directory"
+    )
+    parser.addoption(
+        "--replay-latency",
+        action="store",
+        type=int,
+        default=0,
+        help="Milliseconds added to each replayed response"
+    )
+    parser.addoption(
+        "--replay-bandwidth",
+        action="store",
+        type=int,
+        default=None,
+        help="Cap replayed response bodies at this many kbps (default: no cap)"
+    )
+    parser.addoption(
+        "--warm-profile",
+        action="store_true",
+        default=False,
+        help="Start Chrome emulation sessions from a copy of a profile warmed on --base-url"
+    )
+    parser.addoption(
+        "--warm-profile-max-mb",
+        action="store",
+        type=int,
+        default=200,
+        help="Size limit of the warm Chrome profile template"
+    )
+    parser.addoption(
+        "--storage-state",
+        action="store_true",
+        default=False,
+        help="Save browser storage state after popups are dismissed and restore it in later sessions"
+    )
+    parser.addoption(
+        "--storage-state-max-age",
+        action="store",
+        type=float,
+        default=72,
+        help="Hours after which a saved storage state is discarded"
+    )
+    parser.addoption(
+        "--adaptive-timeouts",
+        action="store_true",
+        default=False,
+        help="Use learned p99-based per-locator timeouts instead of the default timeout"
+    )
+    parser.addoption(
+        "--record-latencies",
+        action="store_true",
+        default=False,
+        help="Record per-locator wait latencies (implied by --adaptive-timeouts)"
+    )
 
 
 @pytest.fixture(scope="session")
@@ -74,8 +235,100 @@ def test_config(request):
     return config
 
 
+@pytest.fixture(scope="session", autouse=True)
+def locator_latency(request):
+    """
+    Record per-locator wait latencies for the session and persist them at the end.
+    
+    Only with --record-latencies or --adaptive-timeouts (which also makes
+    page objects use the learned timeouts), so unit tests with fake drivers
+    never write into the shared store.
+    
+    Yields:
+        LocatorLatencyStore instance, or None when not recording
+    """
+    adaptive = request.config.getoption("--adaptive-timeouts")
+    if not (adaptive or request.config.getoption("--record-latencies")):
+        yield None
+        return
+    store = LocatorLatencyStore()
+    BasePage.latency_store = store
+    BasePage.apply_learned_timeouts = adaptive
+    try:
+        yield store
+    finally:
+        BasePage.latency_store = None
+        BasePage.apply_learned_timeouts = False
+        try:
+            store.flush()
+        except OSError as e:
+            logger.warning(f"Could not persist locator latencies: {e}")
+        for key, (p99, suggested) in sorted(store.suggestions(default=10).items()):
+            logger.info(f"Locator {key}: p99 {p99:.2f}s -> suggested timeout {suggested:.1f}s")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def storage_state(request):
+    """
+    Attach the saved storage states of the session's device preset to page objects (--storage-state).
+    
+    Yields:
+        StorageStateStore instance, or None when disabled
+    """
+    if not request.config.getoption("--storage-state"):
+        yield None
+        return
+    browser_config = request.getfixturevalue("browser_config")
+    store = StorageStateStore(
+        browser_config.device_name, max_age_hours=request.config.getoption("--storage-state-max-age")
+    )
+    BasePage.storage_states = store
+    try:
+        yield store
+    finally:
+        BasePage.storage_states = None
+
+
+@pytest.fixture(scope="session", autouse=True)
+def replay_session(request):
+    """
+    Stop the worker's record/replay proxy at the end of the session (--replay).
+    
+    Saves the recordings as soon as the session's drivers are gone instead
+    of relying on interpreter exit.
+    """
+    yield
+    if request.config.getoption("--replay"):
+        stop_replay_proxy()
+
+
+@pytest.fixture(scope="session")
+def device_allocation(request):
+    """
+    Device and ports reserved for this xdist worker (real devices only).
+    
+    Yields:
+        DeviceAllocation, or None in browser emulation mode
+    """
+    if not request.config.getoption("--use-real-device"):
+        yield None
+        return
+    
+    devices = request.config.getoption("--devices")
+    if devices:
+        device_names = [name.strip() for name in devices.split(",") if name.strip()]
+    else:
+        device_names = [request.config.getoption("--device")]
+    
+    allocator = DeviceAllocator(device_names)
+    try:
+        yield allocator.allocate()
+    finally:
+        allocator.release()
+
+
 @pytest.fixture(scope="session")
-def browser_config(request):
+def browser_config(request, device_allocation):
     """Browser configuration fixture."""
     config = BrowserConfig()
     config.browser_name = request.config.getoption("--browser")
@@ -84,23 +337,148 @@ def browser_config(request):
     config.headless = request.config.getoption("--headless")
     config.use_real_device = request.config.getoption("--use-real-device")
     config.appium_server_url = request.config.getoption("--appium-server")
+    config.connection_pool_size = request.config.getoption("--connection-pool-size")
+    config.compress_transport = request.config.getoption("--compress-transport")
+    config.driver_pool = request.config.getoption("--driver-pool")
+    config.driver_max_uses = request.config.getoption("--driver-max-uses")
+    config.driver_prefetch = request.config.getoption("--prefetch-drivers")
+    if request.config.getoption("--cold-boot"):
+        config.emulator_snapshot = None
+    else:
+        config.emulator_snapshot = request.config.getoption("--emulator-snapshot")
+    config.emulator_reset = request.config.getoption("--emulator-reset")
+    config.lean_mode = request.config.getoption("--lean")
+    config.lean_block = tuple(
+        category.strip() for category in request.config.getoption("--lean-block").split(",") if category.strip()
+    )
+    config.replay_mode = request.config.getoption("--replay")
+    config.replay_archive = request.config.getoption("--replay-archive")
+    config.replay_latency_ms = request.config.getoption("--replay-latency")
+    config.replay_bandwidth_kbps = request.config.getoption("--replay-bandwidth")
+    config.warm_profile = request.config.getoption("--warm-profile")
+    config.warm_profile_url = request.config.getoption("--base-url")
+    config.warm_profile_max_mb = request.config.getoption("--warm-profile-max-mb")
+    network_profile = request.config.getoption("--network-profile")
+    config.network_profile = None if network_profile == "none" else network_profile
+    
+    if device_allocation:
+        config.device_name = device_allocation.device_name
+        device_config = REAL_DEVICE_CONFIGS.get(config.device_name, {})
+        config.platform = device_config.get("platform", config.platform)
+        config.appium_ports = device_allocation.ports
+        config.emulator_console_port = device_allocation.console_port
     
     mode = "real emulator/simulator" if config.use_real_device else "browser emulation"
     logger.info(f"Browser config: {config.browser_name}, Device: {config.device_name}, Platform: {config.platform}, Mode: {mode}")
     return config
 
 
+@pytest.fixture(scope="session")
+def driver_pool(browser_config):
+    """
+    Session-scoped pool of warm drivers (one pool per xdist worker).
+    
+    Args:
+        browser_config: Browser configuration
+        
+    Yields:
+        DriverPool instance
+    """
+    pool = DriverPool(
+        browser_config,
+        max_size=browser_config.driver_pool_size,
+        max_uses=browser_config.driver_max_uses,
+    )
+    try:
+        yield pool
+    finally:
+        pool.close()
+
+
+@pytest.fixture(scope="session")
+def driver_prefetcher(browser_config):
+    """
+    Session-scoped provider that builds the next driver while a test runs.
+    
+    Args:
+        browser_config: Browser configuration
+        
+    Yields:
+        PrefetchingDriverProvider instance
+    """
+    provider = PrefetchingDriverProvider(browser_config, depth=browser_config.driver_prefetch)
+    try:
+        yield provider
+    finally:
+        provider.close()
+
+
+@pytest.fixture(scope="session")
+def snapshot_reset_session(browser_config):
+    """
+    Session-scoped Appium session whose emulator is rolled back per test.
+    
+    Args:
+        browser_config: Browser configuration
+        
+    Yields:
+        SnapshotResetSession instance
+    """
+    session = SnapshotResetSession(browser_config)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 @pytest.fixture(scope="function")
-def driver(browser_config) -> WebDriver:
+def driver(request, browser_config) -> WebDriver:
     """
-    WebDriver fixture that creates and quits driver for each test.
+    WebDriver fixture that provides a driver for each test.
+    
+    With --driver-pool the driver is checked out of the worker's pool and
+    reset on return. With --use-real-device --emulator-reset snapshot on
+    Android one session is shared and the emulator snapshot is restored
+    after each test. With --prefetch-drivers the next driver is built in
+    the background while the test runs. Otherwise the driver is created and
+    quit for each test.
     
     Args:
+        request: Pytest request object
         browser_config: Browser configuration
         
     Yields:
         WebDriver instance
     """
+    if browser_config.driver_pool:
+        pool = request.getfixturevalue("driver_pool")
+        driver = pool.acquire()
+        try:
+            yield driver
+        finally:
+            rep_call = getattr(request.node, "rep_call", None)
+            pool.release(driver, discard=bool(rep_call and rep_call.failed))
+        return
+
+    if (browser_config.use_real_device and browser_config.emulator_reset == "snapshot"
+            and browser_config.platform.lower() == "android"):
+        session = request.getfixturevalue("snapshot_reset_session")
+        try:
+            yield session.acquire()
+        finally:
+            session.reset()
+        return
+
+    # Concurrent sessions would fight over a single emulator/simulator
+    if browser_config.driver_prefetch > 0 and not browser_config.use_real_device:
+        provider = request.getfixturevalue("driver_prefetcher")
+        driver = provider.acquire()
+        try:
+            yield driver
+        finally:
+            provider.release(driver)
+        return
+
     driver = None
     try:
         driver = DriverFactory.create_driver(browser_config)
@@ -110,6 +488,101 @@ def driver(browser_config) -> WebDriver:
             DriverFactory.quit_driver(driver)
 
 
+@pytest.fixture(autouse=True)
+def network_profile(request):
+    """
+    Throttle the test's driver with a network profile.
+    
+    The profile comes from @pytest.mark.network("<profile>") or, without
+    the marker, from --network-profile. Throttling is removed after the
+    test so pooled drivers are returned at full speed.
+    
+    Yields:
+        Applied profile name, or None
+    """
+    marker = request.node.get_closest_marker("network")
+    if "driver" not in request.fixturenames or (
+            not marker and request.config.getoption("--network-profile") == "none"):
+        yield None
+        return
+    
+    browser_config = request.getfixturevalue("browser_config")
+    requested = marker.args[0] if marker else browser_config.network_profile
+    name = resolve_profile(browser_config.device_name, requested)
+    if name is None:
+        yield None
+        return
+    
+    driver = request.getfixturevalue("driver")
+    applied = apply_network_profile(driver, name)
+    try:
+        yield name if applied else None
+    finally:
+        if applied:
+            try:
+                clear_network_profile(driver)
+            except Exception as e:
+                logger.warning(f"Could not clear network profile '{name}': {e}")
+
+
+@pytest.fixture(autouse=True)
+def lean_mode_report(request):
+    """
+    Report requests blocked and bytes avoided by lean mode for each test.
+    
+    The counts are logged and added to the test's user_properties.
+    
+    Yields:
+        None
+    """
+    if "driver" not in request.fixturenames or not request.config.getoption("--lean"):
+        yield
+        return
+    
+    browser_config = request.getfixturevalue("browser_config")
+    if browser_config.browser_name != "chrome" or browser_config.use_real_device:
+        yield
+        return
+    
+    driver = request.getfixturevalue("driver")
+    patterns = blocked_patterns(browser_config)
+    read_stats(driver, patterns)  # Drop entries from before the test (pooled drivers)
+    yield
+    
+    stats = read_stats(driver, patterns)
+    if stats:
+        logger.info(f"Lean mode [{request.node.name}]: {stats.summary()}")
+        request.node.user_properties.extend([
+            ("lean_blocked_requests", stats.blocked_requests),
+            ("lean_bytes_avoided", stats.bytes_avoided),
+            ("lean_bytes_transferred", stats.bytes_transferred),
+        ])
+
+
+@pytest.fixture(scope="function")
+def web_vitals(driver, browser_config):
+    """
+    Collect Core Web Vitals for the test's driver at page object flow steps.
+    
+    The collector's budget is the device preset's performance_budget;
+    call web_vitals.assert_budget() to fail on metrics over budget.
+    
+    Args:
+        driver: WebDriver fixture
+        browser_config: Browser configuration
+        
+    Yields:
+        WebVitalsCollector instance
+    """
+    collector = WebVitalsCollector.enable(driver, PerformanceBudget.for_device(browser_config.device_name))
+    try:
+        yield collector
+    finally:
+        if collector.steps:
+            logger.info(f"Web Vitals ({browser_config.device_name}):\n{collector.report()}")
+        WebVitalsCollector.disable(driver)
+
+
 @pytest.fixture(scope="class")
 def class_driver(browser_config) -> WebDriver:
     """
@@ -134,11 +607,14 @@ def class_driver(browser_config) -> WebDriver:
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
-    Hook to capture test results and take screenshots on failure.
+    Hook to capture test results and collect failure artifacts.
     """
     outcome = yield
     report = outcome.get_result()
     
+    # Expose phase reports to fixtures (e.g. to evict pooled drivers on failure)
+    setattr(item, f"rep_{report.when}", report)
+    
     # Only capture on test failure
     if report.when == "call" and report.failed:
         driver = None
@@ -150,20 +626,40 @@ def pytest_runtest_makereport(item, call):
             driver = item.funcargs["class_driver"]
         
         if driver:
-            # Take screenshot
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_name = f"{item.name}_{timestamp}.png"
-            screenshot_path = os.path.join("reports/screenshots", screenshot_name)
+            collector = FailureArtifactCollector(
+                directory=TestConfig.artifact_dir,
+                budget=item.config.getoption("--artifact-budget"),
+            )
+            artifacts = collector.collect(driver)
             
-            try:
-                driver.save_screenshot(screenshot_path)
-                logger.info(f"Screenshot saved: {screenshot_path}")
-                
-                # Attach to pytest-html report
+            if artifacts.screenshot:
+                # Written in the background, attached to pytest-html report
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                screenshot_path = screenshot_service().save(
+                    artifacts.screenshot, f"{item.name}_{timestamp}.png", TestConfig.screenshot_dir
+                )
+                logger.info(f"Screenshot captured: {screenshot_path}")
                 if hasattr(report, 'extra'):
                     report.extra.append(pytest.html.extras.image(screenshot_path))
+            
+            try:
+                bundle_path = collector.write_bundle(item.nodeid, artifacts, {
+                    "nodeid": item.nodeid,
+                    "error": report.longrepr.reprcrash.message
+                    if hasattr(report.longrepr, "reprcrash") else str(report.longrepr),
+                })
+                logger.info(
+                    f"Failure artifacts saved in {artifacts.elapsed:.1f}s: {bundle_path} "
+                    f"({', '.join(f'{name}: {status}' for name, status in sorted(artifacts.status.items()))})"
+                )
             except Exception as e:
-                logger.error(f"Failed to take screenshot: {e}")
+                logger.error(f"Failed to write failure artifacts: {e}")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session, exitstatus):
+    """Write pending screenshots before reports are generated."""
+    screenshot_service().flush()
 
 
 # Markers for filtering tests
@@ -175,3 +671,5 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "safari: Safari browser tests")
     config.addinivalue_line("markers", "smoke: Smoke tests")
     config.addinivalue_line("markers", "regression: Regression tests")
+    config.addinivalue_line("markers", "performance: Web performance budget tests")
+    config.addinivalue_line("markers", "network(profile): Throttle the driver with a NETWORK_PROFILES profile")
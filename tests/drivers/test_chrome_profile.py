@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from config.config import BrowserConfig
+from drivers import chrome_profile
+from drivers.chrome_profile import META_FILE, ChromeProfileManager, copy_tree
+from drivers.file_lock import file_lock
+
+
+def fake_warm(path, size=1024):
+    os.makedirs(os.path.join(path, "Default", "Cache"))
+    with open(os.path.join(path, "Default", "Cache", "data_1"), "wb") as f:
+        f.write(b"x" * size)
+    with open(os.path.join(path, "SingletonLock"), "w") as f:
+        f.write("host-123")
+
+
+class FakeDriver:
+    pass
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return ChromeProfileManager(root=str(tmp_path), max_size_mb=1)
+
+
+class TestChromeProfileManager:
+
+    def test_template_built_once(self, manager):
+        config = BrowserConfig(device_name="iPhone SE")
+        builds = []
+
+        def warm(path):
+            builds.append(path)
+            fake_warm(path)
+
+        first = manager.ensure_template(config, "https://m.twitch.tv/", warm)
+        second = manager.ensure_template(config, "https://m.twitch.tv/", warm)
+
+        assert first == second and len(builds) == 1
+        assert os.path.exists(os.path.join(first, META_FILE))
+        assert not os.path.exists(os.path.join(first, "SingletonLock"))
+        assert manager.template_path(BrowserConfig(device_name="Pixel 7"), "https://m.twitch.tv/") != first
+
+    def test_expired_template_rebuilt(self, manager):
+        manager.max_age_hours = 0
+        builds = []
+
+        def warm(path):
+            builds.append(path)
+            fake_warm(path)
+
+        manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", warm)
+        manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", warm)
+
+        assert len(builds) == 2
+
+    def test_oversized_or_failed_template_unused(self, manager):
+        assert manager.ensure_template(BrowserConfig(), "https://a/", lambda p: fake_warm(p, size=2 * 1048576)) is None
+
+        def broken(path):
+            raise RuntimeError("chrome crashed")
+
+        assert manager.ensure_template(BrowserConfig(), "https://b/", broken) is None
+        assert [name for name in os.listdir(manager.root) if ".building-" in name] == []
+
+    def test_failed_build_not_retried_until_marker_expires(self, manager):
+        builds = []
+
+        def broken(path):
+            builds.append(path)
+            raise RuntimeError("chrome crashed")
+
+        manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", broken)
+        assert manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", fake_warm) is None
+        assert len(builds) == 1
+
+        manager.retry_after_minutes = 0
+        template = manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", fake_warm)
+        assert template is not None
+        assert not os.path.exists(template + ".failed")
+
+    def test_clone_waits_for_rebuild(self, manager):
+        template = manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", fake_warm)
+        copies = []
+
+        with file_lock(template + ".lock"):
+            thread = threading.Thread(target=lambda: copies.append(manager.clone(template)))
+            thread.start()
+            time.sleep(0.2)
+            assert copies == []
+        thread.join(timeout=10)
+
+        assert os.path.exists(os.path.join(copies[0], "Default", "Cache", "data_1"))
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="msvcrt has no shared locks")
+    def test_clones_share_the_template_lock(self, manager):
+        template = manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", fake_warm)
+
+        with file_lock(template + ".lock", shared=True):
+            copy = manager.clone(template)
+            with file_lock(template + ".lock", blocking=False) as rebuild:
+                assert not rebuild
+
+        assert os.path.exists(os.path.join(copy, "Default", "Cache", "data_1"))
+
+    def test_full_copy_not_reported_as_reflink(self, manager, tmp_path, monkeypatch):
+        template = manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", fake_warm)
+        commands = []
+
+        def cp(command, **kwargs):
+            commands.append(command)
+            raise subprocess.CalledProcessError(1, command, stderr=b"Operation not supported")
+
+        monkeypatch.setattr(chrome_profile.subprocess, "run", cp)
+        monkeypatch.setattr(chrome_profile.sys, "platform", "linux")
+
+        assert copy_tree(template, str(tmp_path / "copy")) == "copy"
+        assert "--reflink=always" in commands[0]
+        assert os.path.exists(tmp_path / "copy" / "Default" / "Cache" / "data_1")
+
+    def test_copies_are_independent_and_released(self, manager):
+        template = manager.ensure_template(BrowserConfig(), "https://m.twitch.tv/", fake_warm)
+        driver = FakeDriver()
+
+        copy = manager.clone(template)
+        manager.attach(driver, copy)
+        with open(os.path.join(copy, "Default", "Cache", "data_1"), "wb") as f:
+            f.write(b"changed")
+
+        with open(os.path.join(template, "Default", "Cache", "data_1"), "rb") as f:
+            assert f.read() == b"x" * 1024
+        manager.release_for(driver)
+        assert not os.path.exists(copy)
+
+    def test_sweep_removes_copies_of_dead_processes(self, manager):
+        os.makedirs(os.path.join(manager.clones_dir, "gw0-999999999-deadbeef"))
+        own = os.path.join(manager.clones_dir, f"gw1-{os.getpid()}-cafebabe")
+        os.makedirs(own)
+
+        assert manager.sweep() == 1
+        assert os.listdir(manager.clones_dir) == [os.path.basename(own)]
@@ -0,0 +1,57 @@
+import json
+import os
+import stat
+
+import pytest
+
+from drivers import chromedriver_resolver
+from drivers.chromedriver_resolver import ChromeDriverResolver
+
+
+def make_executable(path, version_line):
+    path.write_text(f"#!/bin/sh\necho '{version_line}'\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+@pytest.fixture
+def fake_chrome(tmp_path, monkeypatch):
+    chrome = make_executable(tmp_path / "chrome", "Google Chrome 120.0.6099.109")
+    monkeypatch.setenv("CHROME_BINARY", chrome)
+    monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+    monkeypatch.setenv("WDM_LOCAL_PATH", str(tmp_path / "wdm"))
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    chromedriver_resolver.detect_chrome_major_version.cache_clear()
+    yield chrome
+    chromedriver_resolver.detect_chrome_major_version.cache_clear()
+
+
+class TestChromeDriverResolver:
+
+    def test_detects_major_version(self, fake_chrome):
+        assert chromedriver_resolver.detect_chrome_major_version() == "120"
+
+    def test_finds_matching_local_driver_and_indexes_it(self, fake_chrome, tmp_path):
+        (tmp_path / "bin").mkdir()
+        driver = make_executable(tmp_path / "bin" / "chromedriver", "ChromeDriver 120.0.6099.109 (abc)")
+        resolver = ChromeDriverResolver(cache_dir=str(tmp_path / "cache"), offline=True)
+
+        assert resolver.resolve() == driver
+        with open(resolver.index_path) as f:
+            assert json.load(f) == {"120": driver}
+
+    def test_uses_index_without_scanning(self, fake_chrome, tmp_path, monkeypatch):
+        driver = make_executable(tmp_path / "indexed-chromedriver", "ChromeDriver 120.0.1.2")
+        resolver = ChromeDriverResolver(cache_dir=str(tmp_path / "cache"), offline=True)
+        os.makedirs(resolver.cache_dir)
+        with open(resolver.index_path, "w") as f:
+            json.dump({"120": driver}, f)
+        monkeypatch.setattr(ChromeDriverResolver, "_find_local", lambda self, major: pytest.fail("scanned"))
+
+        assert resolver.resolve() == driver
+
+    def test_offline_without_driver_raises(self, fake_chrome, tmp_path):
+        resolver = ChromeDriverResolver(cache_dir=str(tmp_path / "cache"), offline=True)
+
+        with pytest.raises(FileNotFoundError):
+            resolver.resolve()
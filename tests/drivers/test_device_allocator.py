@@ -0,0 +1,52 @@
+from drivers.device_allocator import DeviceAllocator, worker_index
+
+DEVICES = ["Medium_Phone_API_35", "Small_Phone_API_35"]
+
+
+class TestDeviceAllocator:
+
+    def test_worker_index(self):
+        assert worker_index("gw3") == 3
+        assert worker_index("master") == 0
+
+    def test_workers_get_distinct_devices_and_ports(self, tmp_path):
+        first = DeviceAllocator(DEVICES, lock_dir=str(tmp_path))
+        second = DeviceAllocator(DEVICES, lock_dir=str(tmp_path))
+
+        a = first.allocate("gw0")
+        b = second.allocate("gw1")
+
+        assert a.exclusive and b.exclusive
+        assert a.device_name != b.device_name
+        assert a.serial != b.serial
+        assert a.ports["systemPort"] != b.ports["systemPort"]
+        assert a.ports["chromedriverPort"] != b.ports["chromedriverPort"]
+        assert a.ports["mjpegServerPort"] != b.ports["mjpegServerPort"]
+
+    def test_locked_device_is_skipped(self, tmp_path):
+        first = DeviceAllocator(DEVICES, lock_dir=str(tmp_path))
+        second = DeviceAllocator(DEVICES, lock_dir=str(tmp_path))
+
+        a = first.allocate("gw0")
+        b = second.allocate("gw2")  # starts at the same device as gw0
+
+        assert b.exclusive
+        assert b.device_name != a.device_name
+
+    def test_shares_device_when_all_are_busy(self, tmp_path):
+        allocators = [DeviceAllocator(DEVICES[:1], lock_dir=str(tmp_path)) for _ in range(2)]
+
+        allocators[0].allocate("gw0")
+        shared = allocators[1].allocate("gw1")
+
+        assert not shared.exclusive
+        assert shared.device_name == DEVICES[0]
+
+    def test_release_frees_device(self, tmp_path):
+        first = DeviceAllocator(DEVICES[:1], lock_dir=str(tmp_path))
+        second = DeviceAllocator(DEVICES[:1], lock_dir=str(tmp_path))
+
+        first.allocate("gw0")
+        first.release()
+
+        assert second.allocate("gw1").exclusive
@@ -0,0 +1,151 @@
+import pytest
+
+from config.config import BrowserConfig
+from drivers.driver_pool import DriverPool
+from drivers.session_state import add_document_script, has_document_script, track_origin
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.current = handle
+
+
+class FakeDriver:
+    """Minimal stand-in for a WebDriver session."""
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.current = "main"
+        self.switch_to = FakeSwitchTo(self)
+        self.cookies_cleared = 0
+        self.url = None
+        self.alive = True
+        self.quit_called = False
+        self.calls = []
+
+    @property
+    def current_window_handle(self):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        return self.current
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def execute_script(self, script, *args):
+        return "https://m.twitch.tv" if self.url and self.url.startswith("https://m.twitch.tv") else None
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+        self.calls.append(("delete_all_cookies", self.url))
+
+    def get(self, url):
+        self.url = url
+        self.calls.append(("get", url))
+
+
+class FakeCdpDriver(FakeDriver):
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+        if cmd == "Page.getNavigationHistory":
+            return {"entries": [{"url": "about:blank"}, {"url": "https://id.twitch.tv/login"}]}
+        return {"identifier": str(len(self.calls))}
+
+
+@pytest.fixture
+def pool():
+    created = []
+
+    def factory(config):
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    def quit_func(driver):
+        driver.quit_called = True
+
+    pool = DriverPool(BrowserConfig(), max_uses=2, factory=factory, quit_func=quit_func)
+    pool.created_drivers = created
+    return pool
+
+
+class TestDriverPool:
+
+    def test_reuses_and_resets_driver(self, pool):
+        driver = pool.acquire()
+        driver.window_handles.append("popup")
+        pool.release(driver)
+
+        assert pool.acquire() is driver
+        assert driver.window_handles == ["main"]
+        assert driver.cookies_cleared == 1
+        assert driver.url == "about:blank"
+        assert pool.created == 1 and pool.reused == 1
+
+    def test_evicts_after_max_uses(self, pool):
+        driver = pool.acquire()
+        pool.release(driver)
+        pool.release(pool.acquire())
+
+        assert driver.quit_called
+        assert pool.acquire() is not driver
+
+    def test_evicts_on_failure(self, pool):
+        driver = pool.acquire()
+        pool.release(driver, discard=True)
+
+        assert driver.quit_called
+        assert pool.evicted == 1
+
+    def test_replaces_unhealthy_idle_driver(self, pool):
+        driver = pool.acquire()
+        pool.release(driver)
+        driver.alive = False
+
+        assert pool.acquire() is not driver
+        assert driver.quit_called
+
+    def test_close_quits_all_drivers(self, pool):
+        busy = pool.acquire()
+        idle = pool.acquire()
+        pool.release(idle)
+        pool.close()
+
+        assert busy.quit_called and idle.quit_called
+
+
+class TestResetDriver:
+
+    def test_clears_every_visited_origin(self):
+        driver = FakeDriver()
+        track_origin(driver, "https://m.twitch.tv/directory")
+        track_origin(driver, "https://id.twitch.tv/login")
+        driver.get("https://m.twitch.tv/directory")
+        driver.calls = []
+
+        assert DriverPool.reset_driver(driver)
+
+        assert driver.calls == [
+            ("delete_all_cookies", "https://m.twitch.tv/directory"),
+            ("get", "https://id.twitch.tv/robots.txt"),
+            ("delete_all_cookies", "https://id.twitch.tv/robots.txt"),
+            ("get", "about:blank"),
+        ]
+
+    def test_chrome_cleared_through_cdp(self):
+        driver = FakeCdpDriver()
+        track_origin(driver, "https://m.twitch.tv/")
+        add_document_script(driver, "web_vitals", "observe()")
+        driver.calls = []
+
+        assert DriverPool.reset_driver(driver)
+
+        assert ("Page.removeScriptToEvaluateOnNewDocument", {"identifier": "1"}) in driver.calls
+        assert ("Network.clearBrowserCookies", {}) in driver.calls
+        cleared = [params["origin"] for cmd, params in driver.calls if cmd == "Storage.clearDataForOrigin"]
+        assert cleared == ["https://id.twitch.tv", "https://m.twitch.tv"]
+        assert not has_document_script(driver, "web_vitals")
+        assert driver.calls[-1] == ("get", "about:blank")
@@ -0,0 +1,65 @@
+import threading
+
+from config.config import BrowserConfig
+from drivers.driver_prefetch import PrefetchingDriverProvider
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_called = threading.Event()
+
+
+def make_provider(depth=1, fail_first=False):
+    created = []
+
+    def factory(config):
+        if fail_first and not created:
+            created.append(None)
+            raise RuntimeError("session not created")
+        driver = FakeDriver(len(created))
+        created.append(driver)
+        return driver
+
+    provider = PrefetchingDriverProvider(
+        BrowserConfig(), depth=depth, factory=factory,
+        quit_func=lambda driver: driver.quit_called.set(),
+    )
+    return provider, created
+
+
+class TestPrefetchingDriverProvider:
+
+    def test_prefetches_next_driver(self):
+        provider, created = make_provider(depth=2)
+
+        first = provider.acquire()
+        provider._pending[-1].result()
+
+        assert len([d for d in created if d is not first]) == 2
+        provider.close()
+
+    def test_release_quits_in_background(self):
+        provider, _ = make_provider()
+
+        driver = provider.acquire()
+        provider.release(driver)
+
+        assert driver.quit_called.wait(timeout=5)
+        provider.close()
+
+    def test_close_quits_unused_prefetched_drivers(self):
+        provider, created = make_provider(depth=1)
+
+        used = provider.acquire()
+        provider._pending[-1].result()
+        provider.close()
+
+        unused = [d for d in created if d is not used]
+        assert unused and all(d.quit_called.is_set() for d in unused)
+
+    def test_failed_prefetch_falls_back_to_direct_creation(self):
+        provider, _ = make_provider(fail_first=True)
+
+        assert isinstance(provider.acquire(), FakeDriver)
+        provider.close()
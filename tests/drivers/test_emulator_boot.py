@@ -0,0 +1,125 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from drivers.emulator_boot import EmulatorBootManager
+
+FAKE_ADB = textwrap.dedent('''\
+    #!{python}
+    """Fake adb backed by a state directory (one file per running emulator)."""
+    import os, sys, time
+
+    state = os.environ["FAKE_ADB_STATE"]
+    args = sys.argv[1:]
+    serial = None
+    if args[:1] == ["-s"]:
+        serial, args = args[1], args[2:]
+
+    def polls(serial):
+        path = os.path.join(state, serial + ".polls")
+        count = int(open(path).read()) if os.path.exists(path) else 0
+        open(path, "w").write(str(count + 1))
+        return count
+
+    if args == ["devices"]:
+        print("List of devices attached")
+        for name in sorted(os.listdir(state)):
+            if name.startswith("emulator-") and "." not in name:
+                print(name + "\\tdevice")
+    elif args == ["wait-for-device"]:
+        while not os.path.exists(os.path.join(state, serial)):
+            time.sleep(0.01)
+    elif args == ["emu", "kill"]:
+        os.remove(os.path.join(state, serial))
+        print("OK: killing emulator, bye bye")
+    elif args[:2] == ["emu", "avd"]:
+        print(open(os.path.join(state, serial)).read())
+        print("OK")
+    elif args[:1] == ["shell"]:
+        count = polls(serial)
+        print("1" if count >= 2 else "")
+        if os.environ.get("FAKE_BOOTANIM_MISSING"):
+            print("")
+        else:
+            print("stopped" if count >= 3 else "running")
+''')
+
+FAKE_EMULATOR = textwrap.dedent('''\
+    #!{python}
+    import os, sys, time
+    args = sys.argv[1:]
+    avd = args[args.index("-avd") + 1]
+    port = args[args.index("-port") + 1]
+    state = os.environ["FAKE_ADB_STATE"]
+    open(os.path.join(state, "emulator-" + port), "w").write(avd)
+    if os.environ.get("FAKE_EMULATOR_STAY"):
+        open(os.path.join(state, "emulator-" + port + ".pid"), "w").write(str(os.getpid()))
+        time.sleep(60)
+''')
+
+
+def write_script(path, source):
+    path.write_text(source.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    state = tmp_path / "state"
+    state.mkdir()
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    write_script(bin_dir / "adb", FAKE_ADB)
+    emulator = write_script(bin_dir / "emulator", FAKE_EMULATOR)
+    monkeypatch.setenv("FAKE_ADB_STATE", str(state))
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+    manager = EmulatorBootManager(emulator=emulator, poll_interval=0.01)
+    manager.state_dir = state
+    return manager
+
+
+class TestEmulatorBootManager:
+
+    def test_maps_avd_names_to_serials(self, manager):
+        (manager.state_dir / "emulator-5556").write_text("Pixel_API_35")
+
+        assert manager.running_emulators() == {"Pixel_API_35": "emulator-5556"}
+
+    def test_boot_reports_serial_and_phases(self, manager):
+        result = manager.boot("Medium_Phone_API_35", timeout=10)
+
+        assert result.serial == "emulator-5554"
+        assert not result.already_running
+        assert list(result.phases) == ["launch", "adb_online", "boot_completed", "boot_animation"]
+        assert manager.running_emulators() == {"Medium_Phone_API_35": "emulator-5554"}
+
+    def test_boot_reuses_running_emulator(self, manager):
+        (manager.state_dir / "emulator-5554").write_text("Medium_Phone_API_35")
+
+        result = manager.boot("Medium_Phone_API_35", timeout=10)
+
+        assert result.already_running
+        assert result.serial == "emulator-5554"
+
+    def test_boot_many_uses_distinct_serials(self, manager):
+        results = manager.boot_many(["Small_Phone_API_35", "Medium_Phone_API_35"], timeout=10)
+
+        serials = {result.serial for result in results.values()}
+        assert len(serials) == 2
+        assert set(manager.running_emulators()) == {"Small_Phone_API_35", "Medium_Phone_API_35"}
+
+    def test_missing_bootanim_is_not_finished_and_emulator_stopped(self, manager, monkeypatch):
+        monkeypatch.setenv("FAKE_BOOTANIM_MISSING", "1")
+        monkeypatch.setenv("FAKE_EMULATOR_STAY", "1")
+
+        with pytest.raises(TimeoutError):
+            manager.boot("Medium_Phone_API_35", timeout=1)
+
+        assert manager.running_emulators() == {}
+        pid = int((manager.state_dir / "emulator-5554.pid").read_text())
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
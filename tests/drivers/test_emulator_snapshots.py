@@ -0,0 +1,159 @@
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from drivers.emulator_boot import BootResult
+from drivers.emulator_snapshots import SnapshotManager
+from drivers.file_lock import file_lock
+
+AVD = "Medium_Phone_API_35"
+
+FAKE_ADB = textwrap.dedent('''\
+    #!{python}
+    """Fake adb: logs commands, saves snapshots into the AVD directory, reports the Chrome version."""
+    import os, sys
+
+    state = os.environ["FAKE_ADB_STATE"]
+    args = sys.argv[3:]  # drop -s <serial>
+    with open(os.path.join(state, "adb.log"), "a") as f:
+        f.write(" ".join(args) + "\\n")
+    if args[:4] == ["emu", "avd", "snapshot", "save"]:
+        if os.path.exists(os.path.join(state, "fail_save")):
+            print("KO: snapshot save failed")
+        else:
+            os.makedirs(os.path.join(os.environ["FAKE_AVD_DIR"], "snapshots", args[4]), exist_ok=True)
+            print("OK")
+    elif args[:3] == ["shell", "dumpsys", "package"]:
+        print("    versionName=" + open(os.path.join(state, "chrome_version")).read())
+''')
+
+
+class FakeBootManager:
+    """Records boots instead of starting emulators."""
+
+    def __init__(self, adb, on_boot=None):
+        self.adb = adb
+        self.boots = []
+        self.running = False
+        self.on_boot = on_boot
+
+    def boot(self, avd_name, timeout=180, emulator_args=(), port=None):
+        self.boots.append(tuple(emulator_args))
+        if self.on_boot:
+            self.on_boot()
+        return BootResult(avd_name, "emulator-5554", already_running=self.running)
+
+
+@pytest.fixture
+def device(tmp_path, monkeypatch):
+    """An AVD on disk and a fake adb for its emulator."""
+    state = tmp_path / "state"
+    state.mkdir()
+    (state / "chrome_version").write_text("130.0.6723.58")
+    avd_dir = tmp_path / "avd" / f"{AVD}.avd"
+    avd_dir.mkdir(parents=True)
+    (avd_dir / "config.ini").write_text("hw.lcd.density=420\n")
+    (tmp_path / "avd" / f"{AVD}.ini").write_text(f"path={avd_dir}\n")
+    adb = tmp_path / "adb"
+    adb.write_text(FAKE_ADB.format(python=sys.executable))
+    adb.chmod(adb.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("ANDROID_AVD_HOME", str(tmp_path / "avd"))
+    monkeypatch.setenv("FAKE_ADB_STATE", str(state))
+    monkeypatch.setenv("FAKE_AVD_DIR", str(avd_dir))
+    device.state, device.avd_dir, device.adb = state, avd_dir, str(adb)
+    return device
+
+
+@pytest.fixture
+def manager(device, tmp_path):
+    return SnapshotManager(FakeBootManager(device.adb), cache_dir=str(tmp_path / "cache"))
+
+
+def adb_log(device):
+    path = device.state / "adb.log"
+    return path.read_text().splitlines() if path.exists() else []
+
+
+class TestSnapshotManager:
+
+    def test_cold_boot_saves_snapshot_then_warm_boots(self, manager, device):
+        manager.boot(AVD)
+
+        assert manager.boot_manager.boots == [("-no-snapshot-load",)]
+        assert "emu avd snapshot save chrome_ready" in adb_log(device)
+        with open(manager._metadata_path(AVD)) as f:
+            assert json.load(f)["chrome"] == "130.0.6723.58"
+
+        (device.state / "adb.log").unlink()
+        manager.boot(AVD)
+
+        assert manager.boot_manager.boots[-1] == ("-snapshot", "chrome_ready", "-no-snapshot-save")
+        assert adb_log(device) == ["shell dumpsys package com.android.chrome"]
+
+    def test_chrome_update_refreshes_snapshot(self, manager, device):
+        manager.boot(AVD)
+        (device.state / "chrome_version").write_text("131.0.6778.39")
+
+        manager.boot(AVD)
+
+        assert adb_log(device).count("emu avd snapshot save chrome_ready") == 2
+        with open(manager._metadata_path(AVD)) as f:
+            assert json.load(f)["chrome"] == "131.0.6778.39"
+
+    def test_failed_save_falls_back_to_cold_boot(self, manager, device):
+        (device.state / "fail_save").touch()
+        manager.boot(AVD)
+        (device.state / "fail_save").unlink()
+
+        manager.boot(AVD)
+
+        assert manager.boot_manager.boots == [("-no-snapshot-load",), ("-no-snapshot-load",)]
+        assert manager.is_valid(AVD)
+
+    def test_image_change_invalidates_snapshot(self, manager, device):
+        manager.boot(AVD)
+        (device.avd_dir / "config.ini").write_text("hw.lcd.density=440\n")
+
+        manager.boot(AVD)
+
+        assert manager.boot_manager.boots[-1] == ("-no-snapshot-load",)
+
+    def test_running_emulator_not_snapshotted(self, manager, device):
+        manager.boot_manager.running = True
+
+        manager.boot(AVD)
+
+        assert adb_log(device) == []
+        assert not manager.is_valid(AVD)
+
+    def test_lock_not_held_while_booting(self, manager, device):
+        acquired = []
+
+        def try_lock():
+            with file_lock(manager._lock_path(AVD), blocking=False) as locked:
+                acquired.append(locked)
+
+        manager.boot_manager.on_boot = try_lock
+        manager.boot(AVD)
+        manager.boot(AVD)
+
+        assert acquired == [True, True]
+
+    def test_snapshot_save_waits_for_lock(self, manager, device):
+        done = []
+
+        with file_lock(manager._lock_path(AVD)):
+            thread = threading.Thread(target=lambda: done.append(manager.create_snapshot(AVD, "emulator-5554")))
+            thread.start()
+            time.sleep(0.5)
+            assert "emu avd snapshot save chrome_ready" not in adb_log(device)
+        thread.join(timeout=10)
+
+        assert done and manager.is_valid(AVD)
+        assert os.path.isdir(device.avd_dir / "snapshots" / "chrome_ready")
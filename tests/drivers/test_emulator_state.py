@@ -0,0 +1,122 @@
+import os
+import stat
+
+import pytest
+
+from config.config import BrowserConfig
+from drivers.driver_factory import DriverFactory
+from drivers.emulator_state import SnapshotResetSession
+
+
+class FakeDriver:
+    """Appium session on emulator-5554."""
+
+    def __init__(self):
+        self.capabilities = {"deviceUDID": "emulator-5554"}
+        self.alive = True
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        return "about:blank"
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    """A fake `adb` logging its arguments; `snapshot` fails when adb/fail_snapshot exists."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "adb.log"
+    fail = tmp_path / "fail_snapshot"
+    script = bin_dir / "adb"
+    script.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" >> "{log}"\n'
+        f'case "$*" in *snapshot*) if [ -e "{fail}" ]; then echo KO; exit 1; fi; echo OK ;; esac\n'
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    fake_adb.log, fake_adb.fail = log, fail
+    return fake_adb
+
+
+@pytest.fixture
+def session(fake_adb, monkeypatch):
+    """SnapshotResetSession whose DriverFactory hands out FakeDrivers, logged next to adb calls."""
+    def create_driver(config):
+        with open(fake_adb.log, "a") as f:
+            f.write("create\n")
+        return FakeDriver()
+
+    def quit_driver(driver):
+        with open(fake_adb.log, "a") as f:
+            f.write("quit\n")
+
+    monkeypatch.setattr(DriverFactory, "create_driver", staticmethod(create_driver))
+    monkeypatch.setattr(DriverFactory, "quit_driver", staticmethod(quit_driver))
+    return SnapshotResetSession(BrowserConfig(device_name="Pixel 7", platform="Android"))
+
+
+def events(fake_adb):
+    return fake_adb.log.read_text().splitlines()
+
+
+class TestSnapshotResetSession:
+
+    def test_snapshot_restored_under_live_session(self, session, fake_adb):
+        driver = session.acquire()
+
+        session.reset()
+
+        assert session.acquire() is driver
+        assert events(fake_adb) == [
+            "create",
+            "-s emulator-5554 emu avd snapshot save test_baseline",
+            "-s emulator-5554 emu avd snapshot load test_baseline",
+            "-s emulator-5554 wait-for-device",
+        ]
+
+    def test_session_recreated_if_lost_in_restore(self, session, fake_adb):
+        session.acquire().alive = False
+
+        session.reset()
+
+        assert events(fake_adb)[-4:] == [
+            "-s emulator-5554 wait-for-device", "quit", "create",
+            "-s emulator-5554 emu avd snapshot save test_baseline",
+        ]
+        assert session.acquire().alive
+
+    def test_fallback_quits_before_clearing_chrome(self, session, fake_adb):
+        fake_adb.fail.touch()
+        driver = session.acquire()
+
+        session.reset()
+
+        assert session.acquire() is not driver
+        # No snapshot load and no new baseline once snapshots failed
+        assert events(fake_adb) == [
+            "create",
+            "-s emulator-5554 emu avd snapshot save test_baseline",
+            "quit",
+            "-s emulator-5554 shell pm clear com.android.chrome",
+            "create",
+        ]
+
+    def test_failed_load_falls_back_to_new_session(self, session, fake_adb):
+        session.acquire()
+        fake_adb.fail.touch()
+
+        session.reset()
+        session.reset()
+
+        assert events(fake_adb)[2:] == [
+            "-s emulator-5554 emu avd snapshot load test_baseline",
+            "quit",
+            "-s emulator-5554 shell pm clear com.android.chrome",
+            "create",
+            "quit",
+            "-s emulator-5554 shell pm clear com.android.chrome",
+            "create",
+        ]
@@ -0,0 +1,53 @@
+import json
+import time
+import zipfile
+
+from drivers.failure_artifacts import FailureArtifactCollector
+
+
+class FakeDriver:
+    capabilities = {"platformName": "chrome"}
+    current_url = "https://m.twitch.tv/directory"
+
+    def __init__(self, source_delay=0.0):
+        self.source_delay = source_delay
+
+    def get_screenshot_as_png(self):
+        return b"png"
+
+    @property
+    def page_source(self):
+        time.sleep(self.source_delay)
+        return "<html></html>"
+
+    def get_log(self, log_type):
+        raise RuntimeError("log type not supported")
+
+
+class TestFailureArtifactCollector:
+
+    def test_collects_and_bundles(self, tmp_path):
+        collector = FailureArtifactCollector(str(tmp_path), budget=5)
+        artifacts = collector.collect(FakeDriver())
+
+        assert artifacts.screenshot == b"png"
+        assert artifacts.files["url.txt"] == b"https://m.twitch.tv/directory"
+        assert artifacts.status["console.log"].startswith("error: RuntimeError")
+
+        path = collector.write_bundle("tests/test_x.py::test_y", artifacts, {"nodeid": "x"})
+        with zipfile.ZipFile(path) as bundle:
+            assert sorted(bundle.namelist()) == [
+                "manifest.json", "page_source.html", "screenshot.png", "url.txt"
+            ]
+            manifest = json.loads(bundle.read("manifest.json"))
+        assert manifest["nodeid"] == "x"
+        assert manifest["artifacts"]["screenshot.png"]["status"] == "ok"
+
+    def test_slow_artifacts_are_abandoned(self, tmp_path):
+        collector = FailureArtifactCollector(str(tmp_path), budget=0.2)
+        start = time.monotonic()
+        artifacts = collector.collect(FakeDriver(source_delay=2))
+
+        assert time.monotonic() - start < 1
+        assert artifacts.status["page_source.html"] == "timed out"
+        assert artifacts.screenshot == b"png"
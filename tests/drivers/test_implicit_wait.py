@@ -0,0 +1,77 @@
+import gc
+
+from drivers.implicit_wait import ImplicitWaitManager
+
+
+class FakeDriver:
+    def __init__(self):
+        self.calls = []
+
+    def implicitly_wait(self, seconds):
+        self.calls.append(seconds)
+
+
+class TestImplicitWaitManager:
+
+    def test_for_driver_returns_same_manager(self):
+        driver = FakeDriver()
+        assert ImplicitWaitManager.for_driver(driver) is ImplicitWaitManager.for_driver(driver)
+
+    def test_suspension_zeroes_and_restores(self):
+        driver = FakeDriver()
+        manager = ImplicitWaitManager.for_driver(driver)
+        manager.set(10)
+        with manager.suspended():
+            assert driver.calls == [10, 0]
+        assert driver.calls == [10, 0, 10]
+
+    def test_nested_suspensions_share_one_toggle(self):
+        driver = FakeDriver()
+        manager = ImplicitWaitManager.for_driver(driver)
+        manager.set(10)
+        with manager.suspended():
+            with manager.suspended():
+                pass
+            assert driver.calls == [10, 0]
+        assert driver.calls == [10, 0, 10]
+
+    def test_no_commands_when_already_zero(self):
+        driver = FakeDriver()
+        manager = ImplicitWaitManager.for_driver(driver)
+        manager.set(0)
+        with manager.suspended():
+            pass
+        assert driver.calls == [0]
+
+    def test_set_during_suspension_applies_on_exit(self):
+        driver = FakeDriver()
+        manager = ImplicitWaitManager.for_driver(driver)
+        manager.set(10)
+        with manager.suspended():
+            manager.set(5)
+            assert driver.calls == [10, 0]
+        assert driver.calls == [10, 0, 5]
+
+    def test_registry_does_not_keep_drivers_alive(self):
+        driver = FakeDriver()
+        ImplicitWaitManager.for_driver(driver).set(10)
+        count = len(ImplicitWaitManager._managers)
+
+        del driver
+        gc.collect()
+
+        assert len(ImplicitWaitManager._managers) == count - 1
+
+    def test_new_session_without_implicit_wait_sends_nothing(self):
+        driver = FakeDriver()
+        manager = ImplicitWaitManager.for_new_session(driver, 0)
+        with manager.suspended():
+            pass
+        assert driver.calls == []
+
+    def test_new_session_with_implicit_wait_keeps_toggle(self):
+        driver = FakeDriver()
+        manager = ImplicitWaitManager.for_new_session(driver, 10)
+        with manager.suspended():
+            pass
+        assert driver.calls == [10, 0, 10]
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def imported_after(statement):
+    code = f"{statement}; import sys; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+
+    def test_driver_factory_does_not_load_backends(self):
+        modules = imported_after("import drivers.driver_factory")
+
+        assert "appium" not in modules
+        assert "webdriver_manager" not in modules
+        assert "selenium.webdriver.chrome.service" not in modules
+        assert "selenium.webdriver.safari.service" not in modules
+
+    def test_import_benchmark_passes(self):
+        result = subprocess.run(
+            [sys.executable, "tools/import_benchmark.py", "--top", "5"],
+            capture_output=True, text=True, cwd=PROJECT_ROOT
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from config.config import BrowserConfig
+from drivers.lean_mode import blocked_patterns, collect_stats, lean_arguments, lean_prefs
+
+
+def log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class TestLeanMode:
+
+    def test_patterns_per_category(self):
+        config = BrowserConfig(lean_mode=True, lean_block=("ads",), lean_extra_patterns=("*cdn.example*",))
+
+        patterns = blocked_patterns(config)
+
+        assert set(patterns) == {"ads", "custom"}
+        assert "*doubleclick.net*" in patterns["ads"]
+
+    def test_unknown_category_rejected(self):
+        with pytest.raises(ValueError, match="Unknown lean mode categories"):
+            blocked_patterns(BrowserConfig(lean_block=("fonts",)))
+
+    def test_images_and_media_switches(self):
+        config = BrowserConfig(lean_block=("media", "images"))
+
+        assert lean_prefs(config) == {"profile.managed_default_content_settings.images": 2}
+        assert "--autoplay-policy=user-gesture-required" in lean_arguments(config)
+        assert lean_prefs(BrowserConfig()) == {}
+
+    def test_stats_from_performance_log(self):
+        patterns = blocked_patterns(BrowserConfig(lean_block=("ads", "media")))
+        entries = [
+            log_entry("Network.requestWillBeSent", requestId="1", request={"url": "https://m.twitch.tv/"}),
+            log_entry("Network.loadingFinished", requestId="1", encodedDataLength=20_000),
+            log_entry("Network.requestWillBeSent", requestId="2",
+                      request={"url": "https://securepubads.g.doubleclick.net/tag.js"}),
+            log_entry("Network.loadingFailed", requestId="2", blockedReason="inspector"),
+            log_entry("Network.requestWillBeSent", requestId="3",
+                      request={"url": "https://video-edge-1.abc.ttvnw.net/v1/segment/x.ts"}),
+            log_entry("Network.loadingFailed", requestId="3", blockedReason="inspector"),
+            log_entry("Network.loadingFailed", requestId="4", errorText="net::ERR_ABORTED"),
+            {"message": "not json"},
+        ]
+
+        stats = collect_stats(entries, patterns)
+
+        assert stats.requests == 1
+        assert stats.bytes_transferred == 20_000
+        assert stats.blocked == {"ads": 1, "media": 1}
+        assert stats.bytes_avoided == (30 + 500) * 1024
+        assert stats.summary().startswith("2 requests blocked (ads: 1, media: 1)")
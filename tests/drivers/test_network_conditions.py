@@ -0,0 +1,118 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import importlib.util
+import os
+import shutil
+import threading
+
+import pytest
+
+from drivers.chromedriver_resolver import detect_chrome_major_version
+from drivers.network_conditions import apply_network_profile, network_conditions, resolve_profile
+
+PAYLOAD = b"<html><body>" + b"x" * 50_000 + b"</body></html>"
+
+
+class FakeCdpDriver:
+    def __init__(self, reject_packet_loss=False):
+        self.reject_packet_loss = reject_packet_loss
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.reject_packet_loss and "packetLoss" in params:
+            raise RuntimeError("invalid parameters")
+        self.commands.append((cmd, params))
+
+
+class TestNetworkProfiles:
+
+    def test_resolve_profile(self):
+        assert resolve_profile("iPhone SE", "preset") == "fast3g"
+        assert resolve_profile("Unknown device", "preset") is None
+        assert resolve_profile("iPhone SE", "slow3g") == "slow3g"
+        assert resolve_profile("iPhone SE", "none") is None
+        with pytest.raises(ValueError, match="Unknown network profile"):
+            resolve_profile("iPhone SE", "5g")
+
+    def test_cdp_parameters(self):
+        params = network_conditions({"latency_ms": 400, "download_kbps": 400, "upload_kbps": 200})
+
+        assert params == {
+            "offline": False, "latency": 400,
+            "downloadThroughput": 50_000, "uploadThroughput": 25_000,
+        }
+
+    def test_apply_throttles_network_and_cpu(self):
+        driver = FakeCdpDriver()
+
+        assert apply_network_profile(driver, "slow3g")
+        assert [cmd for cmd, _ in driver.commands] == [
+            "Network.enable", "Network.emulateNetworkConditions", "Emulation.setCPUThrottlingRate"
+        ]
+        assert driver.commands[-1][1] == {"rate": 4}
+
+    def test_packet_loss_dropped_when_unsupported(self):
+        driver = FakeCdpDriver(reject_packet_loss=True)
+
+        assert apply_network_profile(driver, "flaky")
+        assert driver.commands[1][1]["latency"] == 300
+
+    def test_no_cdp_no_throttling(self):
+        assert not apply_network_profile(object(), "slow3g")
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PayloadHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def chrome_available() -> bool:
+    """Local Chrome is installed and a chromedriver is on hand or can be fetched."""
+    if detect_chrome_major_version() is None:
+        return False
+    return bool(
+        os.getenv("CHROMEDRIVER_PATH") or shutil.which("chromedriver")
+        or importlib.util.find_spec("webdriver_manager")
+    )
+
+
+@pytest.mark.chrome
+@pytest.mark.browser_emulation
+@pytest.mark.network("slow3g")
+@pytest.mark.skipif(not chrome_available(), reason="Chrome or chromedriver is not available")
+class TestThrottledLocalServer:
+
+    def test_slow3g_delays_local_page(self, driver, browser_config, network_profile, local_server):
+        if browser_config.browser_name != "chrome" or browser_config.use_real_device:
+            pytest.skip("Throttling needs Chrome DevTools")
+        from pages.base_page import BasePage
+
+        page = BasePage(driver)
+        page.navigate_to(local_server)
+        timing = page.wait_for_page_load()
+
+        assert network_profile == "slow3g"
+        assert timing is not None, "Navigation timing not available"
+        assert timing.complete
+        # 400ms latency before the first byte, ~50KB at 400kbps for the body
+        assert timing.ttfb >= 350
+        assert timing.load >= 1000
@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium import webdriver
+
+from config.config import BrowserConfig
+from drivers.remote_connection import TunedPoolManager, dispatch_batch, tune_connection
+
+
+class StubWebDriverHandler(BaseHTTPRequestHandler):
+    """Minimal W3C endpoint: new session, URL and title, each after a fixed delay."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.reply({"sessionId": "stub", "capabilities": {"browserName": "chrome"}})
+
+    def do_GET(self):
+        self.server.encodings.append(self.headers.get("Accept-Encoding"))
+        time.sleep(self.server.delay)
+        value = "https://m.twitch.tv/" if self.path.endswith("/url") else "Twitch"
+        self.reply(value)
+
+    def do_DELETE(self):
+        self.reply(None)
+
+    def reply(self, value):
+        body = json.dumps({"value": value}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWebDriverHandler)
+    server.daemon_threads = True
+    server.connections, server.encodings, server.delay = 0, [], 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def driver(server):
+    driver = webdriver.Remote(
+        command_executor=f"http://127.0.0.1:{server.server_port}", options=webdriver.ChromeOptions()
+    )
+    try:
+        yield driver
+    finally:
+        driver.quit()
+
+
+class TestTuneConnection:
+
+    def test_commands_reuse_one_connection(self, server, driver):
+        assert tune_connection(driver, BrowserConfig(compress_transport=True))
+        server.connections = 0
+
+        for _ in range(5):
+            assert driver.current_url == "https://m.twitch.tv/"
+
+        assert isinstance(driver.command_executor._conn, TunedPoolManager)
+        assert server.connections == 1
+        assert set(server.encodings) == {"gzip, deflate"}
+
+    def test_proxied_connection_left_unchanged(self):
+        class Executor:
+            _conn = None
+
+        class Driver:
+            command_executor = Executor()
+
+        assert not tune_connection(Driver(), BrowserConfig())
+
+
+class TestDispatchBatch:
+
+    def test_results_in_command_order(self, server, driver):
+        tune_connection(driver, BrowserConfig())
+        server.delay = 0.2
+
+        start = time.monotonic()
+        results = dispatch_batch(driver, [lambda d: d.current_url, lambda d: d.title] * 2)
+
+        assert results == ["https://m.twitch.tv/", "Twitch"] * 2
+        # Sent concurrently: about one delay instead of four
+        assert time.monotonic() - start < 0.6
+
+    def test_first_error_raised(self):
+        def fail(driver):
+            raise ValueError("no such element")
+
+        with pytest.raises(ValueError, match="no such element"):
+            dispatch_batch(object(), [lambda d: 1, fail, lambda d: 3])
+
+    def test_empty_and_single(self):
+        assert dispatch_batch(object(), []) == []
+        assert dispatch_batch(object(), [lambda d: threading.current_thread()]) == [threading.current_thread()]
@@ -0,0 +1,179 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import http.client
+import shutil
+import ssl
+import threading
+import time
+
+import pytest
+
+from config.config import BrowserConfig
+from drivers import replay_proxy
+from drivers.replay_archive import ReplayArchive, request_key
+from drivers.replay_proxy import RECORD, REPLAY, ReplayProxy
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Answers with the request path and a per-server hit counter."""
+
+    def do_GET(self):
+        self.server.hits += 1
+        body = f"{self.path} #{self.server.hits}".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    server.hits = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def get_via(proxy, url):
+    connection = http.client.HTTPConnection(proxy.host, proxy.port, timeout=10)
+    try:
+        connection.request("GET", url)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+class TestReplayArchive:
+
+    def test_request_key_normalization(self):
+        assert request_key("get", "https://M.Twitch.tv?b=2&a=1&_=123", ignored_params=("_",)) == \
+            "GET https://m.twitch.tv/?a=1&b=2"
+        assert request_key("POST", "https://gql.twitch.tv/gql", b'{"q":1}') != \
+            request_key("POST", "https://gql.twitch.tv/gql", b'{"q":2}')
+
+    def test_round_trip_repeats_in_order(self, tmp_path):
+        recorder = ReplayArchive(str(tmp_path), writer="gw0")
+        recorder.add("GET https://a/", 200, "OK", [("Content-Type", "text/html"), ("Content-Length", "5")], b"first")
+        recorder.add("GET https://a/", 200, "OK", [("Content-Type", "text/html")], b"second")
+        recorder.add("GET https://b/", 204, "No Content", [], b"")
+        recorder.close()
+
+        archive = ReplayArchive(str(tmp_path)).load()
+        try:
+            assert len(archive) == 2
+            first = archive.lookup("GET https://a/")
+            assert bytes(first.body) == b"first"
+            assert first.headers == [("Content-Type", "text/html")]
+            assert bytes(archive.lookup("GET https://a/").body) == b"second"
+            assert bytes(archive.lookup("GET https://a/").body) == b"second"
+            assert archive.lookup("GET https://b/").status == 204
+            assert archive.lookup("GET https://c/") is None
+        finally:
+            archive.close()
+
+    def test_parallel_recorders_merge(self, tmp_path):
+        for writer, url in (("gw0", "https://a/"), ("gw1", "https://b/")):
+            archive = ReplayArchive(str(tmp_path), writer=writer)
+            archive.add(f"GET {url}", 200, "OK", [], writer.encode())
+            archive.close()
+
+        archive = ReplayArchive(str(tmp_path)).load()
+        try:
+            assert bytes(archive.lookup("GET https://a/").body) == b"gw0"
+            assert bytes(archive.lookup("GET https://b/").body) == b"gw1"
+        finally:
+            archive.close()
+
+
+class TestReplayProxy:
+
+    def test_record_then_replay_offline(self, origin, tmp_path):
+        base = f"http://127.0.0.1:{origin.server_port}"
+        recorder = ReplayProxy(ReplayArchive(str(tmp_path)), mode=RECORD,
+                               ignored_params=("t",), intercept_https=False).start()
+        try:
+            assert get_via(recorder, f"{base}/page?t=1")[2] == b"/page?t=1 #1"
+        finally:
+            recorder.stop()
+        assert recorder.recorded == 1
+
+        origin.shutdown()
+        replayer = ReplayProxy(ReplayArchive(str(tmp_path)), mode=REPLAY,
+                               ignored_params=("t",), intercept_https=False).start()
+        try:
+            status, _, body = get_via(replayer, f"{base}/page?t=2")
+            missed_status, missed_headers, _ = get_via(replayer, f"{base}/other")
+        finally:
+            replayer.stop()
+
+        assert (status, body) == (200, b"/page?t=1 #1")
+        assert missed_status == 404 and missed_headers["X-Replay-Miss"] == "1"
+        assert (replayer.hits, replayer.misses) == (1, 1)
+
+    def test_replay_latency(self, tmp_path):
+        archive = ReplayArchive(str(tmp_path))
+        archive.add(request_key("GET", "http://example.test/"), 200, "OK", [], b"ok")
+        archive.close()
+        proxy = ReplayProxy(ReplayArchive(str(tmp_path)), mode=REPLAY, latency_ms=200,
+                            intercept_https=False).start()
+        try:
+            started = time.monotonic()
+            assert get_via(proxy, "http://example.test/")[2] == b"ok"
+            assert time.monotonic() - started >= 0.2
+        finally:
+            proxy.stop()
+
+    @pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl is needed for the certificate")
+    def test_https_through_connect_tunnel(self, tmp_path, monkeypatch):
+        certificate = replay_proxy.ensure_certificate
+        monkeypatch.setattr(replay_proxy, "ensure_certificate", lambda: certificate(str(tmp_path / "cert")))
+        archive = ReplayArchive(str(tmp_path / "archive"))
+        archive.add(request_key("GET", "https://m.twitch.tv/directory"), 200, "OK", [], b"directory")
+        archive.add(request_key("GET", "https://m.twitch.tv:8443/"), 200, "OK", [], b"other port")
+        archive.close()
+        proxy = ReplayProxy(ReplayArchive(str(tmp_path / "archive")), mode=REPLAY).start()
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        try:
+            bodies = []
+            for port, path in ((443, "/directory"), (443, "/directory"), (8443, "/")):
+                connection = http.client.HTTPSConnection(proxy.host, proxy.port, timeout=10, context=context)
+                connection.set_tunnel("m.twitch.tv", port)
+                try:
+                    connection.request("GET", path)
+                    bodies.append(connection.getresponse().read())
+                finally:
+                    connection.close()
+        finally:
+            proxy.stop()
+
+        assert bodies == [b"directory", b"directory", b"other port"]
+        assert proxy.hits == 3
+
+    def test_stop_saves_process_wide_recording(self, origin, tmp_path, monkeypatch):
+        def no_certificate():
+            raise RuntimeError("HTTPS not needed")
+
+        monkeypatch.setattr(replay_proxy, "ensure_certificate", no_certificate)
+        config = BrowserConfig(replay_mode=RECORD, replay_archive=str(tmp_path))
+        url = f"http://127.0.0.1:{origin.server_port}/page"
+        get_via(replay_proxy.replay_proxy(config), url)
+
+        replay_proxy.stop_replay_proxy()
+        replay_proxy.stop_replay_proxy()
+
+        archive = ReplayArchive(str(tmp_path)).load()
+        try:
+            assert bytes(archive.lookup(request_key("GET", url)).body) == b"/page #1"
+        finally:
+            archive.close()
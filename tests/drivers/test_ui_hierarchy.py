@@ -0,0 +1,115 @@
+import os
+import re
+import stat
+
+import pytest
+
+from drivers.ui_hierarchy import TapCache, UiAutomatorEngine, parse_hierarchy
+
+DUMP = (
+    b"<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    b'<hierarchy rotation="0">'
+    b'<node index="0" text="" resource-id="com.android.chrome:id/compositor_view_holder" '
+    b'class="android.widget.FrameLayout" content-desc="" bounds="[0,0][1080,2400]">'
+    b'<node index="0" text="Open the Twitch app?" resource-id="" class="android.widget.TextView" '
+    b'content-desc="" bounds="[60,1500][1020,1580]" />'
+    b'<node index="1" text="Keep using web" resource-id="" class="android.widget.Button" '
+    b'content-desc="" bounds="[100,2000][500,2100]" />'
+    b'<node index="2" text="" resource-id="" class="android.widget.Button" '
+    b'content-desc="Close &quot;popup&quot;" bounds="[980,1400][1060,1480]" />'
+    b"</node></hierarchy>"
+)
+
+KEEP_USING_WEB = re.compile(r"[Kk]eep.*web")
+
+
+def write_script(path, body):
+    path.write_text("#!/bin/sh\n" + body)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture
+def fake_device(tmp_path, monkeypatch):
+    """A fake `adb` running a local shell with uiautomator, input and wm stand-ins."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    screen = tmp_path / "screen.xml"
+    screen.write_bytes(DUMP)
+    taps = tmp_path / "taps.log"
+    write_script(bin_dir / "adb", 'exec sh\n')
+    write_script(bin_dir / "uiautomator", f'cp "{screen}" "$2"\n')
+    write_script(bin_dir / "input", f'echo "$@" >> "{taps}"\n')
+    write_script(bin_dir / "wm", 'echo "Physical size: 1080x2400"\n')
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    engine = UiAutomatorEngine(cache=TapCache(str(tmp_path / "cache.json")),
+                               dump_path=str(tmp_path / "dump.xml"))
+    engine.screen, engine.taps = screen, taps
+    try:
+        yield engine
+    finally:
+        engine.close()
+
+
+class TestUiHierarchy:
+
+    def test_parse_in_chunks(self):
+        hierarchy = parse_hierarchy(DUMP[i:i + 37] for i in range(0, len(DUMP), 37))
+
+        assert len(hierarchy) == 4
+        assert hierarchy.find("Keep using web").center == (300, 2050)
+        assert hierarchy.find(KEEP_USING_WEB).class_name == "android.widget.Button"
+        assert hierarchy.find('Close "popup"').bounds == (980, 1400, 1060, 1480)
+        assert hierarchy.find(resource_id="com.android.chrome:id/compositor_view_holder").bounds[2] == 1080
+        assert hierarchy.find("Keep using app") is None
+
+    def test_trailing_output_ignored(self):
+        hierarchy = parse_hierarchy([DUMP, b"UI hierchary dumped to: /dev/tty\n"])
+
+        assert len(hierarchy) == 4
+
+    def test_invalid_dump(self):
+        with pytest.raises(ValueError, match="Invalid UI dump"):
+            parse_hierarchy([b"ERROR: could not get idle state."])
+
+
+class TestUiAutomatorEngine:
+
+    def test_find_and_tap_then_cached_single_round_trip(self, fake_device):
+        assert fake_device.find_and_tap(KEEP_USING_WEB).text == "Keep using web"
+        # wm size, dump, tap over a single shell process
+        assert fake_device.round_trips == 3
+
+        fake_device.round_trips = 0
+        assert fake_device.find_and_tap(KEEP_USING_WEB).center == (300, 2050)
+        assert fake_device.round_trips == 1
+        assert fake_device.taps.read_text().splitlines() == ["tap 300 2050", "tap 300 2050"]
+
+    def test_cached_target_gone(self, fake_device):
+        fake_device.find_and_tap(KEEP_USING_WEB)
+        fake_device.screen.write_bytes(DUMP.replace(b"Keep using web", b"Continue"))
+        fake_device.round_trips = 0
+
+        assert fake_device.find_and_tap(KEEP_USING_WEB) is None
+        assert fake_device.round_trips == 1
+        assert len(fake_device.taps.read_text().splitlines()) == 1
+
+    def test_cache_shared_across_engines(self, fake_device, tmp_path):
+        fake_device.find_and_tap("Keep using web")
+
+        cache = TapCache(str(tmp_path / "cache.json"))
+        assert cache.get("1080x2400", '["Keep using web", null]').bounds == (100, 2000, 500, 2100)
+
+    def test_cached_content_desc_node_gone(self, fake_device):
+        assert fake_device.find_and_tap('Close "popup"').center == (1020, 1440)
+        fake_device.screen.write_bytes(DUMP.replace(b'content-desc="Close &quot;popup&quot;"', b'content-desc=""'))
+
+        assert fake_device.find_and_tap('Close "popup"') is None
+        assert fake_device.taps.read_text().splitlines() == ["tap 1020 1440"]
+
+    def test_cached_node_moved(self, fake_device):
+        fake_device.find_and_tap(KEEP_USING_WEB)
+        fake_device.screen.write_bytes(DUMP.replace(b"[100,2000][500,2100]", b"[100,1800][500,1900]"))
+
+        assert fake_device.find_and_tap(KEEP_USING_WEB).center == (300, 1850)
+        assert fake_device.taps.read_text().splitlines() == ["tap 300 2050", "tap 300 1850"]
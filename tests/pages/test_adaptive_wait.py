@@ -0,0 +1,83 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+
+from pages.adaptive_wait import CLICKABLE, AdaptiveWait, LocatorLatencyStore
+
+LOCATOR = (By.CSS_SELECTOR, "h1")
+
+
+class TestAdaptiveWait:
+
+    def test_returns_first_truthy_value(self):
+        calls = []
+
+        def condition(driver):
+            calls.append(driver)
+            if len(calls) < 3:
+                raise NoSuchElementException("not yet")
+            return "element"
+
+        wait = AdaptiveWait("driver", timeout=2, initial_poll=0.01)
+        assert wait.until(condition) == "element"
+        assert wait.polls == 3
+
+    def test_times_out(self):
+        wait = AdaptiveWait("driver", timeout=0.1, initial_poll=0.01, max_poll=0.02)
+        with pytest.raises(TimeoutException):
+            wait.until(lambda driver: False, "never")
+        assert wait.polls > 2
+
+
+class TestLocatorLatencyStore:
+
+    def test_no_suggestion_without_enough_samples(self, tmp_path):
+        store = LocatorLatencyStore(str(tmp_path / "latency.json"), min_samples=5)
+        for _ in range(4):
+            store.record(LOCATOR, 0.2)
+        assert store.p99(LOCATOR) is None
+        assert store.suggested_timeout(LOCATOR, default=10) == 10
+
+    def test_suggestion_from_p99(self, tmp_path):
+        store = LocatorLatencyStore(str(tmp_path / "latency.json"), min_samples=5)
+        for seconds in (0.1, 0.2, 0.3, 0.4, 1.5):
+            store.record(LOCATOR, seconds)
+        assert store.p99(LOCATOR) == 1.5
+        assert store.suggested_timeout(LOCATOR, default=10, margin=2.0) == 3.0
+        assert store.suggested_timeout(LOCATOR, default=2, margin=2.0) == 2
+
+    def test_flush_merges_across_stores(self, tmp_path):
+        path = str(tmp_path / "latency.json")
+        first = LocatorLatencyStore(path)
+        second = LocatorLatencyStore(path)
+        first.record(LOCATOR, 0.1)
+        second.record(LOCATOR, 0.2)
+        second.record(LOCATOR, None)
+        first.flush()
+        second.flush()
+
+        reloaded = LocatorLatencyStore(path)
+        assert reloaded.samples(LOCATOR) == [0.1, 0.2]
+        assert reloaded._data["css selector=h1"]["timeouts"] == 1
+
+    def test_recent_timeout_falls_back_to_default(self, tmp_path):
+        store = LocatorLatencyStore(str(tmp_path / "latency.json"), min_samples=5, recent_window=3)
+        for _ in range(5):
+            store.record(LOCATOR, 0.5)
+        store.record(LOCATOR, None)
+        assert store.recent_timeouts(LOCATOR) == 1
+        assert store.suggested_timeout(LOCATOR, default=10) == 10
+
+        for _ in range(3):
+            store.record(LOCATOR, 0.5)
+        assert store.recent_timeouts(LOCATOR) == 0
+        assert store.suggested_timeout(LOCATOR, default=10) == 1.0
+
+    def test_conditions_recorded_separately(self, tmp_path):
+        store = LocatorLatencyStore(str(tmp_path / "latency.json"), min_samples=1)
+        store.record(LOCATOR, 0.1)
+        store.record(LOCATOR, 2.0, CLICKABLE)
+
+        assert store.samples(LOCATOR) == [0.1]
+        assert store.samples(LOCATOR, CLICKABLE) == [2.0]
+        assert set(store.suggestions(default=10)) == {"css selector=h1", "clickable:css selector=h1"}
@@ -0,0 +1,59 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage
+from pages.dom_query import BULK_QUERY_SCRIPT, DomQuery, to_js_locator
+
+
+class RecordingDriver:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.result
+
+
+class TestDomQuery:
+
+    @pytest.mark.parametrize("locator, expected", [
+        ((By.CSS_SELECTOR, "a.card"), ("css", "a.card")),
+        ((By.XPATH, "//div"), ("xpath", "//div")),
+        ((By.ID, "main"), ("css", '[id="main"]')),
+        ((By.CLASS_NAME, "tw-link"), ("css", ".tw-link")),
+        ((By.LINK_TEXT, "Browse"), ("xpath", '//a[normalize-space(.)="Browse"]')),
+    ])
+    def test_to_js_locator(self, locator, expected):
+        assert to_js_locator(locator) == expected
+
+    def test_bulk_query_uses_one_round_trip(self):
+        driver = RecordingDriver({
+            "cards": [
+                {"attributes": {}, "text": "Game 1", "href": "/v/1", "visible": True,
+                 "rect": {"x": 0, "y": 0, "width": 10, "height": 10}},
+                {"attributes": {}, "text": "Game 2", "href": "/v/2", "visible": False,
+                 "rect": {"x": 0, "y": 20, "width": 0, "height": 0}},
+            ],
+            "title": [{"attributes": {"lang": "en"}, "text": "Search"}],
+        })
+        page = BasePage(driver)
+
+        results = page.bulk_query({
+            "cards": (By.CSS_SELECTOR, "[data-a-target='search-result-video']"),
+            "title": DomQuery((By.TAG_NAME, "h1"), properties=("text",), attributes=("lang",), first=True),
+        })
+
+        assert len(driver.calls) == 1
+        script, (payload,) = driver.calls[0]
+        assert script == BULK_QUERY_SCRIPT
+        assert [query["name"] for query in payload] == ["cards", "title"]
+        assert [card.text for card in results["cards"]] == ["Game 1", "Game 2"]
+        assert results["cards"][1].visible is False
+        assert results["title"][0].attributes == {"lang": "en"}
+
+    def test_unsupported_property_is_rejected(self):
+        page = BasePage(RecordingDriver({}))
+
+        with pytest.raises(ValueError):
+            page.bulk_query({"x": DomQuery((By.ID, "x"), properties=("color",))})
@@ -0,0 +1,111 @@
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage
+
+LOCATOR = (By.CSS_SELECTOR, "h1")
+
+
+class FakeElement:
+    def __init__(self, driver, text):
+        self.driver = driver
+        self._text = text
+        self.stale = False
+
+    def _command(self):
+        self.driver.commands += 1
+        if self.stale:
+            raise StaleElementReferenceException("stale")
+
+    @property
+    def text(self):
+        self._command()
+        return self._text
+
+    def is_enabled(self):
+        self._command()
+        return True
+
+    def click(self):
+        self._command()
+
+
+class FakeDriver:
+    """Returns a new element for every lookup and counts lookups and driver commands."""
+
+    def __init__(self):
+        self.lookups = 0
+        self.commands = 0
+        self.elements = []
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        self.commands += 1
+        element = FakeElement(self, f"title {self.lookups}")
+        self.elements.append(element)
+        return element
+
+    def get(self, url):
+        pass
+
+
+class TestElementCache:
+
+    def test_repeated_lookups_hit_cache(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+
+        assert page.get_text(LOCATOR) == "title 1"
+        assert page.get_text(LOCATOR) == "title 1"
+
+        assert driver.lookups == 1
+        assert page.cache_stats()["hits"] == 1
+        assert page.cache_stats()["misses"] == 1
+
+    def test_cache_hit_costs_only_the_action(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page.get_text(LOCATOR)
+        driver.commands = 0
+
+        page.get_text(LOCATOR)
+        page.click(LOCATOR)
+
+        assert driver.commands == 2
+
+    def test_stale_element_is_refound(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page.get_text(LOCATOR)
+        driver.elements[0].stale = True
+
+        assert page.get_text(LOCATOR) == "title 2"
+        assert page.cache_stats()["invalidations"] == 1
+
+    def test_stale_element_not_returned_by_find_element(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page.find_element(LOCATOR)
+        driver.elements[0].stale = True  # e.g. driver.get() outside the page object
+
+        assert page.find_element(LOCATOR) is driver.elements[1]
+        assert page.cache_stats()["misses"] == 2
+
+    def test_navigation_clears_cache(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page.get_text(LOCATOR)
+
+        page.navigate_to("https://m.twitch.tv/")
+        page.get_text(LOCATOR)
+
+        assert driver.lookups == 2
+
+    def test_cache_can_be_bypassed(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page.find_element(LOCATOR)
+
+        page.find_element(LOCATOR, use_cache=False)
+
+        assert driver.lookups == 2
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from selenium.common.exceptions import TimeoutException
+
+from pages.base_page import BasePage
+from pages.navigation_timing import NavigationTiming
+
+
+class FakeDriver:
+    """Answers async scripts with a finished page load; script timeout of 10s."""
+
+    def __init__(self, error=None):
+        self.timeouts = SimpleNamespace(script=10)
+        self.error = error
+        self.script_args = []
+
+    def execute_async_script(self, script, *args):
+        self.script_args.append(args)
+        if self.error:
+            raise self.error
+        return {"complete": True, "url": "https://m.twitch.tv/", "load": 1200, "waited": 300}
+
+
+class TestNavigationTiming:
+
+    def test_from_script(self):
+        timing = NavigationTiming.from_script({
+            "complete": True, "url": "https://m.twitch.tv/", "type": "navigate",
+            "dns": 12.5, "connect": 30, "ttfb": 180, "response": 20,
+            "domContentLoaded": 650, "load": 1200, "transferSize": 51234, "waited": 300,
+        })
+
+        assert timing.complete
+        assert timing.ttfb == 180
+        assert timing.dom_content_loaded == 650
+        assert timing.transfer_size == 51234
+        assert timing.summary() == "DNS 12ms, TTFB 180ms, DOMContentLoaded 650ms, load 1200ms"
+
+    def test_incomplete_load_is_flagged(self):
+        timing = NavigationTiming.from_script({"complete": False, "url": "https://m.twitch.tv/"})
+
+        assert not timing.complete
+        assert timing.summary().endswith("(load event not fired)")
+
+
+class TestWaitForPageLoad:
+
+    def test_wait_bounded_below_script_timeout(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+
+        assert page.wait_for_page_load().complete
+        page.wait_for_page_load(timeout=5)
+
+        assert driver.script_args == [(9000,), (5000,)]
+
+    def test_none_when_driver_gives_up(self):
+        assert BasePage(FakeDriver(TimeoutException())).wait_for_page_load() is None
@@ -0,0 +1,54 @@
+from pages.base_page import BasePage
+from pages.wait_scripts import NETWORK_TRACKER_SCRIPT
+
+
+class FakeDriver:
+    current_url = "data:,"
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+    def execute_script(self, script, *args):
+        self.calls.append(("execute_script", script))
+
+
+class FakeCdpDriver(FakeDriver):
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+        return {"identifier": "1"}
+
+
+class TestNetworkTracker:
+
+    def test_registered_once_per_session_on_navigation(self):
+        driver = FakeCdpDriver()
+        BasePage(driver).navigate_to("https://m.twitch.tv/")
+
+        BasePage(driver).navigate_to("https://m.twitch.tv/directory")
+
+        assert driver.calls == [
+            ("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_SCRIPT}),
+            ("get", "https://m.twitch.tv/"),
+            ("get", "https://m.twitch.tv/directory"),
+        ]
+
+    def test_install_reuses_registration(self):
+        driver = FakeCdpDriver()
+        page = BasePage(driver)
+        page.navigate_to("https://m.twitch.tv/")
+
+        assert page.install_network_tracker()
+        assert [call[0] for call in driver.calls] == [
+            "Page.addScriptToEvaluateOnNewDocument", "get", "execute_script"
+        ]
+
+    def test_current_document_only_without_cdp(self):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page.navigate_to("https://m.twitch.tv/")
+
+        assert not page.install_network_tracker()
+        assert driver.calls == [("get", "https://m.twitch.tv/"), ("execute_script", NETWORK_TRACKER_SCRIPT)]
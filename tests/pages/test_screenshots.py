@@ -0,0 +1,52 @@
+import os
+
+from pages.screenshots import ScreenshotService
+
+
+class FakeDriver:
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def get_screenshot_as_png(self):
+        return self.frames.pop(0)
+
+
+class FakeElement:
+    screenshot_as_png = b"element"
+
+
+class TestScreenshotService:
+
+    def test_writes_in_background(self, tmp_path):
+        service = ScreenshotService(str(tmp_path))
+        path = service.capture(FakeDriver([b"frame"]), "page.png")
+        service.flush()
+
+        assert path == os.path.join(str(tmp_path), "page.png")
+        with open(path, "rb") as f:
+            assert f.read() == b"frame"
+        service.close()
+
+    def test_identical_frames_are_linked(self, tmp_path):
+        service = ScreenshotService(str(tmp_path))
+        driver = FakeDriver([b"same", b"same", b"other"])
+
+        first = service.capture(driver, "one")
+        second = service.capture(driver, "two")
+        service.capture(driver, "three")
+        service.close()
+
+        assert second == os.path.join(str(tmp_path), "two.png")
+        assert service.captured == 2 and service.skipped == 1
+        assert sorted(os.listdir(tmp_path)) == ["one.png", "three.png", "two.png"]
+        assert os.path.samefile(first, second)
+        with open(second, "rb") as f:
+            assert f.read() == b"same"
+
+    def test_element_capture(self, tmp_path):
+        service = ScreenshotService(str(tmp_path))
+        path = service.capture(FakeElement(), "element")
+        service.close()
+
+        with open(path, "rb") as f:
+            assert f.read() == b"element"
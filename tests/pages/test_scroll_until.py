@@ -0,0 +1,69 @@
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage
+
+LOCATOR = (By.CSS_SELECTOR, "button.tw-link")
+
+
+class FakeElement:
+    def is_enabled(self):
+        return True
+
+
+ELEMENT = FakeElement()
+
+
+class FakeScrollDriver:
+    """Web driver whose target comes into view after `found_after` scroll scripts."""
+
+    def __init__(self, found_after=3, end_after=None):
+        self.found_after = found_after
+        self.end_after = end_after
+        self.scripts = 0
+        self.steps = []
+        self.size_calls = 0
+
+    def execute_script(self, script, using, value, step):
+        self.scripts += 1
+        self.steps.append(step)
+        found = self.scripts >= self.found_after
+        at_end = self.end_after is not None and self.scripts >= self.end_after
+        return {"found": found, "element": ELEMENT if found else None,
+                "scrolled": True, "atEnd": at_end}
+
+    def get_window_size(self):
+        self.size_calls += 1
+        return {"width": 400, "height": 800}
+
+
+class TestScrollUntil:
+
+    def test_stops_once_in_view(self):
+        driver = FakeScrollDriver(found_after=3)
+        page = BasePage(driver)
+
+        assert page.scroll_until(LOCATOR, max_scrolls=10) is ELEMENT
+        assert driver.scripts == 3
+        assert page.find_element(LOCATOR) is ELEMENT
+
+    def test_gives_up_after_max_scrolls(self):
+        driver = FakeScrollDriver(found_after=100)
+        page = BasePage(driver)
+
+        assert page.scroll_until(LOCATOR, max_scrolls=4) is None
+        assert driver.steps == [0.8, 0.8, 0.8, 0.8, 0]
+
+    def test_stops_at_end_of_page(self):
+        driver = FakeScrollDriver(found_after=100, end_after=2)
+        page = BasePage(driver)
+
+        assert page.scroll_until(LOCATOR, max_scrolls=10, direction="up") is None
+        assert driver.scripts == 3
+        assert driver.steps[0] == -0.8
+
+    def test_window_size_cached_per_driver(self):
+        driver = FakeScrollDriver()
+        BasePage(driver).window_size()
+        BasePage(driver).window_size()
+
+        assert driver.size_calls == 1
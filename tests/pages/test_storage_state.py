@@ -0,0 +1,64 @@
+import json
+import os
+import time
+
+from pages.storage_state import StorageState, StorageStateStore, origin_of
+
+COOKIES = [
+    {"name": "session", "value": "abc", "domain": ".twitch.tv", "path": "/", "secure": True,
+     "httpOnly": True, "sameSite": "Lax", "expiry": int(time.time()) + 3600},
+    {"name": "old", "value": "x", "domain": ".twitch.tv", "path": "/", "expiry": 1},
+    {"name": "browser_session", "value": "y", "path": "/"},
+]
+
+
+def twitch_state(**kwargs):
+    return StorageState(
+        origin="https://m.twitch.tv", cookies=COOKIES,
+        local_storage={"upsell_dismissed": "true"}, session_storage={"visited": "1"}, **kwargs
+    )
+
+
+class TestStorageState:
+
+    def test_origin_of(self):
+        assert origin_of("https://M.Twitch.tv/directory?x=1") == "https://m.twitch.tv"
+
+    def test_expired_cookies_dropped(self):
+        assert [cookie["name"] for cookie in twitch_state().live_cookies()] == ["session", "browser_session"]
+
+    def test_cdp_cookie_parameters(self):
+        session, browser_session = twitch_state().cdp_cookies()
+
+        assert session == {
+            "name": "session", "value": "abc", "domain": ".twitch.tv", "path": "/", "secure": True,
+            "httpOnly": True, "sameSite": "Lax", "expires": COOKIES[0]["expiry"],
+        }
+        assert browser_session["url"] == "https://m.twitch.tv"
+
+    def test_seed_script_is_origin_bound(self):
+        script = twitch_state().seed_script()
+
+        assert 'location.origin !== "https://m.twitch.tv"' in script
+        assert json.dumps({"upsell_dismissed": "true"}) in script
+
+
+class TestStorageStateStore:
+
+    def test_saved_per_device_and_origin(self, tmp_path):
+        store = StorageStateStore("Pixel 7", path=str(tmp_path))
+        store.save(twitch_state())
+
+        state = store.load("https://m.twitch.tv/directory")
+
+        assert state.local_storage == {"upsell_dismissed": "true"}
+        assert state.cookies == COOKIES
+        assert StorageStateStore("iPhone SE", path=str(tmp_path)).load("https://m.twitch.tv/") is None
+        assert store.load("https://www.twitch.tv/") is None
+
+    def test_expired_state_deleted(self, tmp_path):
+        store = StorageStateStore("Pixel 7", path=str(tmp_path), max_age_hours=1)
+        store.save(twitch_state(saved_at=time.time() - 7200))
+
+        assert store.load("https://m.twitch.tv/") is None
+        assert [name for name in os.listdir(tmp_path) if name.endswith(".json")] == []
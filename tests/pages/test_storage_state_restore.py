@@ -0,0 +1,180 @@
+import time
+
+import pytest
+
+from drivers import ui_hierarchy
+from drivers.ui_hierarchy import UiNode
+from pages.base_page import BasePage
+from pages.storage_state import StorageState, StorageStateStore
+from pages.twitch_page import TwitchPage
+
+URL = "https://m.twitch.tv/directory"
+STATE = StorageState(
+    origin="https://m.twitch.tv",
+    cookies=[
+        {"name": "session", "value": "abc", "domain": ".twitch.tv", "path": "/", "expiry": int(time.time()) + 3600},
+        {"name": "old", "value": "x", "domain": ".twitch.tv", "path": "/", "expiry": 1},
+    ],
+    local_storage={"upsell_dismissed": "true"},
+)
+
+
+class FakeDriver:
+    """Records navigation, cookies and scripts; the page starts blank."""
+
+    def __init__(self):
+        self.current_url = "data:,"
+        self.calls = []
+
+    def get(self, url):
+        self.calls.append(("get", url))
+        self.current_url = url
+
+    def add_cookie(self, cookie):
+        self.calls.append(("add_cookie", cookie["name"]))
+
+    def execute_script(self, script, *args):
+        self.calls.append(("execute_script", args))
+        return {"origin": "https://m.twitch.tv", "local": {"upsell_dismissed": "true"}, "session": {}}
+
+    def get_cookies(self):
+        return STATE.cookies[:1]
+
+    def implicitly_wait(self, seconds):
+        pass
+
+
+class FakeCdpDriver(FakeDriver):
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+        return {"identifier": str(len(self.calls))}
+
+
+class FakeEngine:
+    def __init__(self, node=None):
+        self.node = node
+        self.timeouts = []
+
+    def find_and_tap(self, text=None, resource_id=None, timeout=0):
+        self.timeouts.append(timeout)
+        return self.node
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StorageStateStore("Pixel 7", path=str(tmp_path))
+    store.save(STATE)
+    BasePage.storage_states = store
+    try:
+        yield store
+    finally:
+        BasePage.storage_states = None
+
+
+def commands(driver):
+    return [call[0] for call in driver.calls]
+
+
+class TestRestoreStorageState:
+
+    def test_restored_through_cdp_without_extra_navigation(self, store):
+        driver = FakeCdpDriver()
+        page = BasePage(driver)
+
+        page.navigate_to(URL)
+
+        # Storage seeding script, then the network tracker
+        assert commands(driver) == [
+            "Network.enable", "Network.setCookies", "Page.addScriptToEvaluateOnNewDocument",
+            "Page.addScriptToEvaluateOnNewDocument", "get"
+        ]
+        assert [cookie["name"] for cookie in driver.calls[1][1]["cookies"]] == ["session"]
+        assert page.storage_state_restored()
+
+    def test_restored_once_per_session(self, store):
+        driver = FakeCdpDriver()
+        page = BasePage(driver)
+        page.navigate_to(URL)
+
+        page.navigate_to("https://m.twitch.tv/search?term=x")
+
+        assert commands(driver).count("Network.setCookies") == 1
+
+    def test_restored_again_after_reset(self, store):
+        driver = FakeCdpDriver()
+        page = BasePage(driver)
+        page.navigate_to(URL)
+        driver.get("about:blank")  # DriverPool.reset_driver
+
+        page.navigate_to(URL)
+
+        assert commands(driver).count("Network.setCookies") == 2
+        assert "Page.removeScriptToEvaluateOnNewDocument" in commands(driver)
+
+    def test_restored_through_same_origin_document(self, store):
+        driver = FakeDriver()
+        page = BasePage(driver)
+
+        page.navigate_to(URL)
+
+        assert driver.calls == [
+            ("get", "https://m.twitch.tv/robots.txt"),
+            ("add_cookie", "session"),
+            ("execute_script", ({"upsell_dismissed": "true"}, {})),
+            ("get", URL),
+        ]
+
+    def test_nothing_restored_without_store(self):
+        driver = FakeCdpDriver()
+
+        BasePage(driver).navigate_to(URL)
+
+        # Only the network tracker
+        assert commands(driver) == ["Page.addScriptToEvaluateOnNewDocument", "get"]
+
+    def test_save_storage_state(self, store, tmp_path):
+        driver = FakeDriver()
+        driver.current_url = URL
+        store.delete(URL)
+
+        BasePage(driver).save_storage_state()
+
+        assert store.load(URL).local_storage == {"upsell_dismissed": "true"}
+
+
+class TestPopupWithStorageState:
+
+    def test_restored_state_checks_popup_once(self, store, monkeypatch):
+        engine = FakeEngine()
+        monkeypatch.setattr(ui_hierarchy.UiAutomatorEngine, "for_device", classmethod(lambda cls, serial: engine))
+        page = TwitchPage(FakeCdpDriver())
+        page.navigate_to(URL)
+
+        page.dismiss_popup_adb(wait_time=3)
+
+        assert engine.timeouts == [0]
+
+    def test_popup_still_shown_is_dismissed(self, store, monkeypatch):
+        engine = FakeEngine(UiNode("Keep using web", "", "", "android.widget.Button", (100, 2000, 500, 2100)))
+        monkeypatch.setattr(ui_hierarchy.UiAutomatorEngine, "for_device", classmethod(lambda cls, serial: engine))
+        page = TwitchPage(FakeCdpDriver())
+        page.navigate_to(URL)
+        saved = []
+        monkeypatch.setattr(page, "wait_for_dom_stable", lambda **kwargs: True)
+        monkeypatch.setattr(page, "save_storage_state", lambda: saved.append(True))
+
+        page.dismiss_popup_adb(wait_time=3)
+
+        assert engine.timeouts == [0] and saved == [True]
+
+    def test_no_settle_wait_without_store(self, monkeypatch):
+        engine = FakeEngine(UiNode("Keep using web", "", "", "android.widget.Button", (100, 2000, 500, 2100)))
+        monkeypatch.setattr(ui_hierarchy.UiAutomatorEngine, "for_device", classmethod(lambda cls, serial: engine))
+        driver = FakeCdpDriver()
+        driver.current_url = URL
+        page = TwitchPage(driver)
+        monkeypatch.setattr(page, "wait_for_dom_stable", lambda **kwargs: pytest.fail("waited"))
+
+        page.dismiss_popup_adb(wait_time=3)
+
+        assert engine.timeouts == [3]
@@ -0,0 +1,65 @@
+import gc
+
+import pytest
+
+from pages.web_vitals import PerformanceBudget, WebVitals, WebVitalsCollector
+
+
+class FakeDriver:
+    def __init__(self, results):
+        self.results = list(results)
+
+    def execute_script(self, script):
+        if "return Object.assign" in script:
+            return self.results.pop(0)
+        return None
+
+
+class TestWebVitals:
+
+    def test_budget_for_device_preset(self):
+        assert PerformanceBudget.for_device("iPhone SE").lcp == 3000
+        assert PerformanceBudget.for_device("Unknown device").lcp == 2500
+
+    def test_violations_report_metric_and_excess(self):
+        driver = FakeDriver([
+            {"url": "https://m.twitch.tv/", "lcp": 3100, "fcp": 900, "cls": 0.02, "inp": None},
+        ])
+        collector = WebVitalsCollector(driver, PerformanceBudget(lcp=2500, fcp=1800, cls=0.1))
+        collector.harvest("landing")
+
+        violations = collector.violations()
+        assert len(violations) == 1
+        assert str(violations[0]) == "landing: LCP 3100ms exceeds budget 2500ms by 600ms (24%)"
+        with pytest.raises(AssertionError, match="LCP 3100ms exceeds"):
+            collector.assert_budget()
+
+    def test_latest_step_per_document_is_reported(self):
+        driver = FakeDriver([
+            {"url": "https://m.twitch.tv/", "cls": 0.15},
+            {"url": "https://m.twitch.tv/", "cls": 0.3},
+        ])
+        collector = WebVitalsCollector(driver, PerformanceBudget(cls=0.1))
+        collector.harvest("landing")
+        collector.harvest("browse")
+
+        violations = collector.violations()
+        assert [(v.step, v.value) for v in violations] == [("browse", 0.3)]
+        assert str(violations[0]).startswith("browse: CLS 0.300 exceeds budget 0.100 by 0.200")
+
+    def test_missing_metrics_pass(self):
+        vitals = WebVitals.from_script({"url": "https://m.twitch.tv/"})
+        collector = WebVitalsCollector(FakeDriver([]), PerformanceBudget(lcp=1))
+        collector.steps.append(("safari", vitals))
+
+        assert collector.violations() == []
+
+    def test_registry_does_not_keep_drivers_alive(self):
+        driver = FakeDriver([])
+        WebVitalsCollector.enable(driver)
+        count = len(WebVitalsCollector._collectors)
+
+        del driver
+        gc.collect()
+
+        assert len(WebVitalsCollector._collectors) == count - 1
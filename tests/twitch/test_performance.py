@@ -0,0 +1,33 @@
+import pytest
+from pages.twitch_page import TwitchPage
+
+
+@pytest.mark.performance
+@pytest.mark.chrome
+class TestTwitchPerformance:
+    """Core Web Vitals budgets for the Twitch mobile flows."""
+
+    def setup_method(self):
+        self.landing_url = 'https://m.twitch.tv/'
+
+    def test_landing_and_browse_within_budget(self, driver, web_vitals):
+        """
+        Landing page and Browse navigation stay within the device's budget.
+
+        Run with:
+        pytest tests/twitch/test_performance.py -v -s --device "Pixel 6"
+        """
+        page = TwitchPage(driver)
+
+        page.navigate_to(self.landing_url)
+        timing = page.wait_for_page_load()
+        page.wait_until_quiet(timeout=3)
+        page.mark_step("landing")
+
+        page.click_browse()
+        page.wait_until_quiet(timeout=3)
+        page.mark_step("browse loaded")
+
+        print(f"\nNavigation: {timing.summary() if timing else 'n/a'}")
+        print(web_vitals.report())
+        web_vitals.assert_budget()
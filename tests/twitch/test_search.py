@@ -24,14 +24,15 @@ class TestTwitchSearchAndScroll:
         print("Test: Search StarCraft II (Step-by-Step)")
         print("="*70)
         
-        # Navigate
-        driver.get(self.landing_url)
-        print(f"✓ Navigated to: {driver.current_url}")
-        
         # Create page object
         # Step 1: go to twitch
         page = TwitchPage(driver)
         
+        # Navigate
+        page.navigate_to(self.landing_url)  # Restores a saved storage state
+        page.wait_for_page_load()
+        print(f"✓ Navigated to: {driver.current_url}")
+        
         # Dismiss popup
         print("\n Dismissing popup...")
         page.dismiss_popup_adb()
@@ -39,55 +40,45 @@ class TestTwitchSearchAndScroll:
         # Step 2: Click Browse
         print("\n1  Clicking Browse button...")
         page.click_browse()
-        page.wait(2)
+        page.wait_until_quiet(timeout=3)
         
         # Step 3: Search
         print("2️⃣  Searching for StarCraft II...")
         page.search_and_submit("StarCraft II")
         
         print("3️⃣  Waiting for results...")
-        page.wait(2)
+        page.wait_until_quiet(timeout=3)
         
-        # Step 4: Scroll down first time
-        print("4️⃣  Scrolling down (1/2)...")
-        page.swipe_up()
-        page.wait(1)
+        # Find the first streamer card/link - it's a button containing streamer info
+        # The structure has a button with class containing "tw-link" and contains a h2 element
+        streamer = (By.CSS_SELECTOR, "button.tw-link")
         
-        # Scroll down second time
-        print("   Scrolling down (2/2)...")
-        page.swipe_up()
-        page.wait(1)
+        # Step 4: Scroll down until the first streamer is in view
+        print("4️⃣  Scrolling to the first streamer...")
+        assert page.scroll_until(streamer, max_scrolls=5), "No streamer found in search results"
 
         # Step 5: Select the first streamer
         print("5️⃣  Clicking on first streamer...")
-        # Find the first streamer card/link - it's a button containing streamer info
-        # The structure has a button with class containing "tw-link" and contains a h2 element
         # Use click_with_retry to handle any overlays or interception issues
-        page.click_with_retry((By.CSS_SELECTOR, "button.tw-link"))
+        page.click_with_retry(streamer)
         
         # Wait for video page to load
         print("6️⃣  Waiting for streamer page to load...")
-        page.wait(3)  # Initial wait for navigation
+        # The player streams continuously, so wait for the DOM rather than the network
+        page.wait_for_dom_stable(quiet_ms=500, timeout=5)
         
         # Wait for video player or channel content to appear (indicates page loaded)
-        try:
-            # Wait for video player element or channel page content
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            wait = WebDriverWait(driver, 15)
-            
-            # Wait for either video player or channel header to be present
-            wait.until(
-                lambda d: d.find_elements(By.CSS_SELECTOR, "video") or 
-                         d.find_elements(By.CSS_SELECTOR, "[data-a-target='video-player']") or
-                         d.find_elements(By.CSS_SELECTOR, "h1") or
-                         d.find_elements(By.TAG_NAME, "video")
-            )
-            print("✓ Streamer page loaded")
-        except Exception as e:
-            print(f"⚠️  Timeout waiting for page elements, continuing anyway: {e}")
+        loaded = page.wait_for_any([
+            (By.CSS_SELECTOR, "video"),
+            (By.CSS_SELECTOR, "[data-a-target='video-player']"),
+            (By.CSS_SELECTOR, "h1"),
+        ], timeout=15)
+        if loaded:
+            print(f"✓ Streamer page loaded ({loaded[1]})")
+        else:
+            print("⚠️  Timeout waiting for page elements, continuing anyway")
         
-        page.wait(5)  # Additional wait for full rendering
+        page.wait_for_dom_stable(quiet_ms=500, timeout=10)  # Full rendering
         
         # Get streamer info
         print(f"✓ Current URL: {driver.current_url}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Bulk DOM query benchmark.
+
+Compares reading text, href, rect and visibility of every Twitch video
+search result (TwitchPage.VIDEO_CARDS) element by element against a single
+BasePage.bulk_query call.
+
+Usage:
+    python tools/bulk_query_benchmark.py --headless
+    python tools/bulk_query_benchmark.py --use-real-device --platform Android \\
+        --device Medium_Phone_API_35
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import BrowserConfig  # noqa: E402
+from drivers.driver_factory import DriverFactory  # noqa: E402
+from pages.twitch_page import TwitchPage  # noqa: E402
+
+
+def per_element(page: TwitchPage) -> list:
+    """One WebDriver command per element per property."""
+    cards = page.driver.find_elements(*page.VIDEO_CARDS)
+    return [
+        {
+            "text": card.text,
+            "href": card.get_attribute("href"),
+            "rect": card.rect,
+            "visible": card.is_displayed(),
+        }
+        for card in cards
+    ]
+
+
+def timed(func, page: TwitchPage, rounds: int):
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func(page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-element and bulk DOM queries")
+    parser.add_argument("--browser", default="chrome")
+    parser.add_argument("--device", default="iPhone 14 Pro")
+    parser.add_argument("--platform", default="iOS")
+    parser.add_argument("--use-real-device", action="store_true")
+    parser.add_argument("--appium-server", default="http://localhost:4723")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--query", default="StarCraft II")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    config = BrowserConfig(
+        browser_name=args.browser,
+        device_name=args.device,
+        platform=args.platform,
+        headless=args.headless,
+        use_real_device=args.use_real_device,
+        appium_server_url=args.appium_server,
+    )
+    driver = DriverFactory.create_driver(config)
+    try:
+        page = TwitchPage(driver)
+        page.navigate_to(f"https://m.twitch.tv/search?term={quote(args.query)}&type=videos")
+        page.find_elements(page.VIDEO_CARDS, timeout=20)
+
+        slow_ms, slow = timed(per_element, page, args.rounds)
+        fast_ms, fast = timed(lambda p: p.get_video_cards(), page, args.rounds)
+    finally:
+        DriverFactory.quit_driver(driver)
+
+    print(f"\n⏱️  Reading {len(fast)} video cards (median of {args.rounds} rounds)\n")
+    print(f"  per-element: {slow_ms:8.1f} ms  ({len(slow)} cards, {len(slow) * 4 + 1} commands)")
+    print(f"  bulk query:  {fast_ms:8.1f} ms  ({len(fast)} cards, 1 command)")
+    if fast_ms:
+        print(f"\n✅ Bulk query is {slow_ms / fast_ms:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
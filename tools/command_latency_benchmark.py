@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-command latency benchmark for WebDriver/Appium sessions.
+
+Creates one driver with Selenium's default connection and one with the tuned
+keep-alive pool, times a series of cheap commands on each, then compares
+sequential commands with a grouped dispatch_batch() call.
+
+Usage:
+    python tools/command_latency_benchmark.py
+    python tools/command_latency_benchmark.py --use-real-device --platform Android \\
+        --device Medium_Phone_API_35 --commands 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import BrowserConfig  # noqa: E402
+from drivers import remote_connection  # noqa: E402
+from drivers.driver_factory import DriverFactory  # noqa: E402
+from drivers.remote_connection import dispatch_batch  # noqa: E402
+
+
+def time_commands(driver, count: int) -> list:
+    """Time `count` sequential cheap commands, returning milliseconds per command."""
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        driver.current_url
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def time_batches(driver, count: int, batch_size: int) -> float:
+    """Return milliseconds per command when dispatched in batches."""
+    commands = [lambda d: d.current_url] * batch_size
+    batches = max(count // batch_size, 1)
+    start = time.perf_counter()
+    for _ in range(batches):
+        dispatch_batch(driver, commands)
+    return (time.perf_counter() - start) * 1000 / (batches * batch_size)
+
+
+def run(config: BrowserConfig, count: int, batch_size: int, tuned: bool) -> dict:
+    original = remote_connection.tune_connection
+    if not tuned:
+        remote_connection.tune_connection = lambda driver, config: False
+    try:
+        driver = DriverFactory.create_driver(config)
+    finally:
+        remote_connection.tune_connection = original
+
+    try:
+        driver.get("about:blank")
+        time_commands(driver, 3)  # warm up
+        sequential = time_commands(driver, count)
+        batched = time_batches(driver, count, batch_size)
+    finally:
+        DriverFactory.quit_driver(driver)
+
+    return {
+        "median": statistics.median(sequential),
+        "p95": sorted(sequential)[int(len(sequential) * 0.95) - 1],
+        "batched": batched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-command latency")
+    parser.add_argument("--browser", default="chrome")
+    parser.add_argument("--device", default="iPhone 14 Pro")
+    parser.add_argument("--platform", default="iOS")
+    parser.add_argument("--use-real-device", action="store_true")
+    parser.add_argument("--appium-server", default="http://localhost:4723")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--compress-transport", action="store_true")
+    parser.add_argument("--commands", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=4)
+    args = parser.parse_args()
+
+    config = BrowserConfig(
+        browser_name=args.browser,
+        device_name=args.device,
+        platform=args.platform,
+        headless=args.headless,
+        use_real_device=args.use_real_device,
+        appium_server_url=args.appium_server,
+        compress_transport=args.compress_transport,
+        connection_pool_size=max(args.batch_size, 1),
+    )
+
+    default = run(config, args.commands, args.batch_size, tuned=False)
+    tuned = run(config, args.commands, args.batch_size, tuned=True)
+
+    print(f"\n⏱️  Per-command latency over {args.commands} commands (ms)\n")
+    print(f"  {'':22}{'median':>10}{'p95':>10}{'batched':>10}")
+    for name, result in (("default connection", default), ("tuned connection", tuned)):
+        print(f"  {name:22}{result['median']:10.2f}{result['p95']:10.2f}{result['batched']:10.2f}")
+
+    reduction = (1 - tuned["batched"] / default["median"]) * 100 if default["median"] else 0
+    print(f"\n✅ Tuned + batched vs default sequential: {reduction:.0f}% less time per command")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Worker startup import benchmark.
+
+Runs `python -X importtime` on the modules every xdist worker imports and
+reports the slowest imports, so regressions in collection/startup time are
+easy to spot.
+
+Usage:
+    python tools/import_benchmark.py
+    python tools/import_benchmark.py --budget-ms 400 --forbid appium webdriver_manager
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules loaded by every worker before the first test runs
+WORKER_MODULES = ["config.config", "drivers.driver_factory", "pages.twitch_page"]
+
+# Backends that must only be imported once create_driver selects them
+LAZY_BACKENDS = ["appium", "webdriver_manager"]
+
+
+def measure_imports(modules: List[str]) -> Tuple[Dict[str, int], float]:
+    """
+    Import modules in a fresh interpreter under -X importtime.
+
+    Args:
+        modules: Module names to import
+
+    Returns:
+        Tuple of ({module: cumulative microseconds}, total milliseconds)
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{result.stderr}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        cumulative[name.strip()] = int(cumulative_us.strip())
+
+    total_ms = sum(cumulative.get(module, 0) for module in modules) / 1000
+    return cumulative, total_ms
+
+
+def loaded_packages(cumulative: Dict[str, int]) -> List[str]:
+    """Top-level packages that were imported."""
+    return sorted({name.split(".")[0] for name in cumulative})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker startup import time")
+    parser.add_argument("--modules", nargs="+", default=WORKER_MODULES,
+                        help="Modules imported by a worker")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail if total import time exceeds this budget")
+    parser.add_argument("--forbid", nargs="*", default=LAZY_BACKENDS,
+                        help="Packages that must not be imported at startup")
+    parser.add_argument("--top", type=int, default=15,
+                        help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    cumulative, total_ms = measure_imports(args.modules)
+
+    print(f"\n⏱️  Worker startup imports: {total_ms:.1f} ms\n")
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [package for package in args.forbid if package in loaded_packages(cumulative)]
+    if eager:
+        print(f"\n❌ Imported eagerly: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\n❌ Over budget: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        failed = True
+
+    if not failed:
+        print("\n✅ Import benchmark passed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()